@@ -1,9 +1,16 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite:///./credential.db"
+from app import sql_trace, tracing
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./credential.db")
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+if sql_trace.enabled():
+    sql_trace.install_engine(engine)
+if tracing.enabled():
+    tracing.install_engine(engine)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Optional
+
+# Formats seen in OCR output and the Excel loads, e.g. "31-Jan-26", "3/1/2026",
+# "2026-01-31T00:00:00", "Jan 31, 2026". Two-digit years follow strptime's pivot
+# (00-68 -> 20xx), which fits expiration dates.
+_DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+    "%m/%d/%y",
+    "%m-%d-%Y",
+    "%m-%d-%y",
+    "%Y/%m/%d",
+    "%d-%b-%y",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%b %d %Y",
+    "%B %d %Y",
+    "%Y%m%d",
+)
+
+_ISO_PREFIX = re.compile(r"^(\d{4}-\d{2}-\d{2})[T ]")
+# Numeric layouts parsed without strptime: (pattern, year group, month group, day group)
+_NUMERIC = (
+    (re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$"), 1, 2, 3),
+    (re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$"), 3, 1, 2),
+    (re.compile(r"^(\d{4})(\d{2})(\d{2})$"), 1, 2, 3),
+)
+_EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def normalize_date(value: Any) -> Optional[date]:
+    """Parse a free-text date into a ``date``; ``None`` when it is blank or unrecognised."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)):
+        return _from_excel_serial(value)
+    return _parse_text(" ".join(str(value).split()))
+
+
+@lru_cache(maxsize=8192)
+def _parse_text(text: str) -> Optional[date]:
+    # Cached: bulk loads repeat the same few thousand dates, and a strptime miss is slow
+    if not text:
+        return None
+    m = _ISO_PREFIX.match(text)
+    if m:
+        text = m.group(1)
+    if text.isdigit() and len(text) == 5:
+        return _from_excel_serial(int(text))
+    for pattern, y, mo, d in _NUMERIC:
+        m = pattern.match(text)
+        if m:
+            try:
+                return date(int(m.group(y)), int(m.group(mo)), int(m.group(d)))
+            except ValueError:
+                return None  # e.g. LEIE's "00000000" placeholder
+    text = text.replace(".", "")
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _from_excel_serial(serial: float) -> Optional[date]:
+    """Excel stores dates as days since 1899-12-30; only accept a plausible range (1927-2173)."""
+    if not 10000 <= serial <= 100000:
+        return None
+    return _EXCEL_EPOCH + timedelta(days=int(serial))
@@ -0,0 +1,92 @@
+from typing import Any, Dict, List, Optional
+
+from .date_normalizer import normalize_date
+
+# Registry of extracted fields promoted out of the JSON columns into the indexed
+# document_fields table. Each entry names the document types it applies to, the
+# JSON column to read, candidate key paths (first non-empty wins) and the value type:
+#   "date" -> value_date (plus the raw text), for range queries
+#   "text" -> value_text, trimmed and upper-cased, for equality filters
+PROMOTED_FIELDS: Dict[str, Dict[str, Any]] = {
+    "license_expiration_date": {
+        "file_types": ("license_board",),
+        "source": "ocr_output",
+        "paths": (("LicenseBoard_Extracted_Expiration_Date",),),
+        "type": "date",
+    },
+    "license_status": {
+        "file_types": ("license_board",),
+        "source": "ocr_output",
+        "paths": (("LicenseBoard_Extracted_Primary_Status",),),
+        "type": "text",
+    },
+    "abms_status": {
+        "file_types": ("board_certification",),
+        "source": "ocr_output",
+        "paths": (("abms_status",), ("status",)),
+        "type": "text",
+    },
+    "abms_reverification_date": {
+        "file_types": ("board_certification",),
+        "source": "ocr_output",
+        "paths": (("abms_reverification_date",), ("reverification_date",)),
+        "type": "date",
+    },
+    "abms_end_date": {
+        "file_types": ("board_certification",),
+        "source": "ocr_output",
+        "paths": (("abms_end_date",), ("end_date",)),
+        "type": "date",
+    },
+    "sanction_status": {
+        "file_types": ("sanctions",),
+        "source": "verification_data",
+        "paths": (("sanction", "status"),),
+        "type": "text",
+    },
+    "dea_expiration_date": {
+        "file_types": ("dea",),
+        "source": "ocr_output",
+        "paths": (("Expiration Date",),),
+        "type": "date",
+    },
+    "malpractice_expiration_date": {
+        "file_types": ("malpractice_insurance",),
+        "source": "ocr_output",
+        "paths": (("Policy Expiration Date",),),
+        "type": "date",
+    },
+}
+
+# Columns whose changes require re-extracting a document's promoted fields
+SOURCE_COLUMNS = ("form_id", "file_type") + tuple(sorted({f["source"] for f in PROMOTED_FIELDS.values()}))
+
+def _dig(data: Any, path) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def extract_fields(file_type: Optional[str], sources: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Promoted field rows for one document; ``sources`` maps JSON column name to its decoded value."""
+    ft = (file_type or "").lower()
+    rows = []
+    for name, spec in PROMOTED_FIELDS.items():
+        if ft not in spec["file_types"]:
+            continue
+        data = sources.get(spec["source"])
+        raw = None
+        for path in spec["paths"]:
+            raw = _dig(data, path)
+            if raw not in (None, ""):
+                break
+        if raw in (None, ""):
+            continue
+        text = str(raw).strip()
+        if spec["type"] == "date":
+            rows.append({"field": name, "value_text": text, "value_date": normalize_date(raw)})
+        else:
+            rows.append({"field": name, "value_text": text.upper(), "value_date": None})
+    return rows
@@ -0,0 +1,74 @@
+import sys
+from typing import Any, Optional, Union
+
+import orjson
+from sqlalchemy.types import Text, TypeDecorator
+
+_warned_legacy = False
+
+
+class JSONString(str):
+    """A string *value* for a JSONText column, stored as a JSON string.
+
+    A plain ``str`` is rejected on write because it cannot be told apart from serialized
+    JSON or a stale ``str(dict)`` repr. String values read from a JSONText column come
+    back as this type, so they can be written back unchanged.
+    """
+
+
+class JSONText(TypeDecorator):
+    """Text column holding strict JSON, encoded/decoded with orjson.
+
+    Assign Python values (dicts, lists, numbers, ``JSONString``); they are stored as the
+    canonical orjson encoding. Plain ``str``/``bytes`` raise ``ValueError``: wrap
+    pre-serialized JSON text in ``json_value(text)``. Reads return the parsed value, so
+    callers never parse these columns themselves.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, (str, bytes)) and not isinstance(value, JSONString):
+            preview = value[:80] if isinstance(value, str) else value[:80].decode("utf-8", "replace")
+            raise ValueError(
+                f"JSONText got raw text {preview!r}; assign the value, json_value(text) for "
+                "serialized JSON, or JSONString(s) for a string value"
+            )
+        return orjson.dumps(value).decode("utf-8")
+
+    def process_result_value(self, value: Optional[str], dialect) -> Any:
+        return decode_json(value)
+
+
+def json_value(text: Union[str, bytes]) -> Any:
+    """Parse pre-serialized JSON text into the value to assign to a JSONText column.
+
+    Raises ``ValueError`` for text that is not strict JSON (e.g. ``str(dict)`` reprs).
+    """
+    try:
+        value = orjson.loads(text)
+    except orjson.JSONDecodeError as e:
+        preview = text[:80] if isinstance(text, str) else text[:80].decode("utf-8", "replace")
+        raise ValueError(f"Expected strict JSON, got {preview!r}") from e
+    return JSONString(value) if isinstance(value, str) else value
+
+
+def decode_json(value: Any) -> Any:
+    """Parse stored JSON text. Text that is not strict JSON yet (not canonicalized by
+    scripts/migrate_20261019_canonicalize_json_columns.py) is returned as a JSONString,
+    with a warning the first time, and is stored as a JSON string if written back."""
+    global _warned_legacy
+    if value is None:
+        return None
+    try:
+        parsed = orjson.loads(value)
+    except orjson.JSONDecodeError:
+        if not _warned_legacy:
+            _warned_legacy = True
+            print("Warning: JSON column holds text that is not strict JSON; "
+                  "run scripts/migrate_20261019_canonicalize_json_columns.py", file=sys.stderr)
+        return JSONString(value)
+    return JSONString(parsed) if isinstance(parsed, str) else parsed
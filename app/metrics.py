@@ -0,0 +1,251 @@
+"""In-process metrics, exposed in Prometheus text format at GET /metrics.
+
+Recorded per route template (e.g. /api/applications/{app_id}):
+- request count by status, latency histogram, in-flight gauge (MetricsMiddleware)
+- SQL statements and time spent in them (SQLAlchemy cursor events, install_sql_metrics)
+- LLM calls, latency and tokens by operation/model (llm_call)
+
+Everything lives in this process behind one lock per metric, so no exporter or agent is
+needed; scrape /metrics or curl it. Counters reset on restart.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from app.tracing import span
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+UNMATCHED_ROUTE = "<unmatched>"  # 404s etc.; raw paths would make label values unbounded
+NO_REQUEST_ROUTE = "<background>"  # SQL run outside a request (workers, scheduler, startup)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, Any] = {}
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in sorted(items)]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # per-bucket counts (last slot is +Inf), sum
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(counts), total) for k, (counts, total) in self._values.items()]
+        lines = self.header()
+        for key, counts, total in sorted(items):
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {running}")
+        return lines
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed, by route template.", ("route",))
+DB_SECONDS = Counter("db_statement_seconds_total", "Time spent executing SQL statements, by route template.", ("route",))
+DB_PER_REQUEST = Histogram("http_request_db_statements", "SQL statements per HTTP request.", ("route",),
+                           buckets=STATEMENT_BUCKETS)
+LLM_REQUESTS = Counter("llm_requests_total", "LLM API calls.", ("operation", "model", "outcome"))
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "LLM API call latency.", ("operation", "model"),
+                        buckets=LLM_BUCKETS)
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens used, from the API's usage block.", ("operation", "model", "kind"))
+
+REGISTRY = [HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT, DB_STATEMENTS, DB_SECONDS, DB_PER_REQUEST,
+            LLM_REQUESTS, LLM_LATENCY, LLM_TOKENS]
+
+# [statements, seconds] of the request being served; None outside requests
+_request_sql: ContextVar[Optional[list]] = ContextVar("request_sql", default=None)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware (no BaseHTTPMiddleware), so streaming responses are not buffered."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        sql = [0, 0.0]
+        token = _request_sql.set(sql)
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            _request_sql.reset(token)
+            route = route_template(scope)
+            method = scope.get("method", "")
+            HTTP_REQUESTS.inc(method, route, str(status["code"]))
+            HTTP_LATENCY.observe(elapsed, method, route)
+            DB_PER_REQUEST.observe(sql[0], route)
+            if sql[0]:
+                DB_STATEMENTS.inc(route, amount=sql[0])
+                DB_SECONDS.inc(route, amount=sql[1])
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_statement(time.perf_counter() - conn.info["metrics_started"].pop())
+
+
+def _handle_error(context):
+    # after_cursor_execute does not fire for a failed statement; pop its start here so the
+    # pooled connection's stack stays balanced and the time is still counted
+    started = context.connection.info.get("metrics_started") if context.connection is not None else None
+    if started:
+        _record_statement(time.perf_counter() - started.pop())
+
+
+def _record_statement(elapsed: float) -> None:
+    sql = _request_sql.get()
+    if sql is None:
+        DB_STATEMENTS.inc(NO_REQUEST_ROUTE)
+        DB_SECONDS.inc(NO_REQUEST_ROUTE, amount=elapsed)
+    else:
+        sql[0] += 1
+        sql[1] += elapsed
+
+
+def install_sql_metrics(engine) -> None:
+    """Count statements and their execution time on ``engine``, attributed to the current request's route."""
+    if event.contains(engine, "before_cursor_execute", _before_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class _LLMCall:
+    __slots__ = ("response",)
+
+    def __init__(self):
+        self.response = None
+
+
+@contextmanager
+def llm_call(operation: str, model: str) -> Iterator[_LLMCall]:
+    """Time one LLM API call; set ``.response`` on the yielded object to record its token usage.
+
+        with llm_call("extract_json", "gpt-4o-mini") as call:
+            call.response = client.chat.completions.create(...)
+    """
+    call = _LLMCall()
+    with span(f"llm.{operation}", **{"llm.model": model}) as llm_span:
+        started = time.perf_counter()
+        try:
+            yield call
+        except Exception:
+            LLM_REQUESTS.inc(operation, model, "error")
+            LLM_LATENCY.observe(time.perf_counter() - started, operation, model)
+            raise
+        LLM_REQUESTS.inc(operation, model, "ok")
+        LLM_LATENCY.observe(time.perf_counter() - started, operation, model)
+        usage = getattr(call.response, "usage", None)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            LLM_TOKENS.inc(operation, model, "prompt", amount=prompt_tokens)
+            LLM_TOKENS.inc(operation, model, "completion", amount=completion_tokens)
+            llm_span.set_attribute("llm.prompt_tokens", prompt_tokens)
+            llm_span.set_attribute("llm.completion_tokens", completion_tokens)
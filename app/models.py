@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime, Date, LargeBinary
+from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime, Date, LargeBinary, Index, Float
+from sqlalchemy import DDL, event, inspect
 from sqlalchemy.orm import declarative_mixin
 from .database import Base
+from .json_text import JSONText, decode_json
+from .document_fields import SOURCE_COLUMNS, extract_fields
 from datetime import datetime
 
 
@@ -44,6 +47,7 @@ class FormData(Base):
 class UploadedDocument(Base):
     """Renamed from form_file_uploads. Holds uploaded documents plus OCR/LLM outputs."""
     __tablename__ = "uploaded_documents"  # migration will rename old table
+    __table_args__ = (Index("ix_uploaded_documents_form_status", "form_id", "status"),)
 
     id = Column(Integer, primary_key=True, index=True)
     form_id = Column(String, ForeignKey("form_data.form_id"))
@@ -51,12 +55,28 @@ class UploadedDocument(Base):
     file_extension = Column(String)
     file_type = Column(String)  # logical category (e.g., DL, NPI, CV, board_certification)
     status = Column(String)  # New, In Progress, Approved, Replaced, etc.
-    ocr_output = Column(String)  # raw OCR JSON/text
-    pdf_match = Column(String)   # pdf structural match output
-    json_match = Column(String)  # field-level match results
+    ocr_output = Column(JSONText)  # raw OCR JSON
+    pdf_match = Column(JSONText)   # pdf structural match output
+    json_match = Column(JSONText)  # field-level match results
     llm_extraction = Column(Text)  # future: structured extraction JSON
     llm_summary = Column(Text)     # future: summarization of document
-    verification_data = Column(Text)  # structured verification / matching results
+    verification_data = Column(JSONText)  # structured verification / matching results
+    blob_sha256 = Column(String, ForeignKey("file_blobs.sha256"), index=True)  # shared content blob, if stored
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # also kept by triggers
+
+
+# Raw-SQL writers (scripts) bypass the ORM defaults above, so SQLite triggers stamp
+# updated_at whenever a write leaves it unset/unchanged. Same format as SQLAlchemy's
+# DateTime so the values compare correctly. Existing databases get these from
+# scripts/migrate_20261019_add_credential_expirations.py.
+_TOUCH_SQL = "UPDATE uploaded_documents SET updated_at = strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now') || '000' WHERE id = NEW.id;"
+for _ddl in (
+    "CREATE TRIGGER IF NOT EXISTS trg_uploaded_documents_touch_insert AFTER INSERT ON uploaded_documents "
+    f"WHEN NEW.updated_at IS NULL BEGIN {_TOUCH_SQL} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_uploaded_documents_touch_update AFTER UPDATE ON uploaded_documents "
+    f"WHEN NEW.updated_at IS OLD.updated_at BEGIN {_TOUCH_SQL} END",
+):
+    event.listen(UploadedDocument.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
 
 
 class Application(Base):
@@ -89,6 +109,7 @@ class Application(Base):
 
 class EmailRecord(Base):
     __tablename__ = "email_records"
+    __table_args__ = (Index("ix_email_records_application_status", "application_id", "status"),)
 
     id = Column(String, primary_key=True, index=True)  # UUID stored as string
     application_id = Column(String, nullable=False)
@@ -114,5 +135,274 @@ class SavedFile(Base):
     filename = Column(String, nullable=False)
     file_type = Column(String, nullable=False)
     attribute = Column(String, nullable=True)
-    file_data = Column(LargeBinary, nullable=False)  # Store file content as BLOB
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    file_data = Column(LargeBinary, nullable=True)  # Inline content from older imports; new rows use blob_sha256
+    blob_sha256 = Column(String, ForeignKey("file_blobs.sha256"), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class FileBlob(Base):
+    """Content-addressed file stored once under uploads/blobs; ref_count = documents and saved files pointing at it."""
+    __tablename__ = "file_blobs"
+
+    sha256 = Column(String, primary_key=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class UploadSession(Base):
+    """Resumable chunked upload. Chunks are appended to a partial file until the session is finalized."""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True, index=True)  # UUID stored as string
+    form_id = Column(String, index=True)
+    file_type = Column(String)
+    filename = Column(String)  # original client filename
+    total_size = Column(Integer, nullable=False)
+    received_bytes = Column(Integer, default=0)
+    checksum = Column(String)  # optional sha256 hex digest supplied by the client
+    status = Column(String, default="OPEN")  # OPEN, FINALIZING, COMPLETED, ABORTED, EXPIRED
+    uploaded_document_id = Column(Integer, ForeignKey("uploaded_documents.id"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
+class ProcessingJob(Base):
+    """Durable OCR/matching queue entry for an uploaded document. Lower lane numbers are served first."""
+    __tablename__ = "processing_jobs"
+    __table_args__ = (Index("ix_processing_jobs_claim", "status", "lane", "id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    uploaded_document_id = Column(Integer, ForeignKey("uploaded_documents.id"), index=True)
+    form_id = Column(String)
+    application_id = Column(String)
+    lane = Column(Integer, nullable=False)  # 0 expedited, 1 new submissions, 2 script backfills
+    source = Column(String)  # upload, batch_upload, resumable_upload, backfill
+    status = Column(String, default="QUEUED")  # QUEUED, RUNNING, DONE, SKIPPED, FAILED
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    enqueued_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    trace_id = Column(String)  # trace of the request that queued the job (app/tracing.py)
+
+
+class ApplicationIssue(Base):
+    """AI issue derived from a processed document's json_match; rebuilt whenever the document is (re)processed."""
+    __tablename__ = "application_issues"
+    __table_args__ = (Index("ix_application_issues_app_severity", "application_id", "severity"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    application_id = Column(String)
+    form_id = Column(String, index=True)
+    uploaded_document_id = Column(Integer, ForeignKey("uploaded_documents.id"), index=True)
+    file_type = Column(String)
+    field = Column(String)
+    issue = Column(Text)
+    severity = Column(String)  # HIGH, MEDIUM, LOW
+    confidence = Column(Float)
+    value = Column(Text)
+    reasoning = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CurrentDocument(Base):
+    """Live UploadedDocument for each (form_id, file_type). Replacement history stays in uploaded_documents."""
+    __tablename__ = "current_documents"
+
+    form_id = Column(String, primary_key=True)
+    file_type = Column(String, primary_key=True)
+    uploaded_document_id = Column(Integer, ForeignKey("uploaded_documents.id"), nullable=False, unique=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class DocumentField(Base):
+    """Promoted OCR/verification value (registry: app/document_fields.PROMOTED_FIELDS), kept in sync on
+    write: by the ORM listeners below, and by refresh_document_fields for raw-SQL writers."""
+    __tablename__ = "document_fields"
+    __table_args__ = (
+        Index("ix_document_fields_field_date", "field", "value_date"),
+        Index("ix_document_fields_field_text", "field", "value_text"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    uploaded_document_id = Column(Integer, ForeignKey("uploaded_documents.id"), nullable=False, index=True)
+    form_id = Column(String)
+    file_type = Column(String)
+    field = Column(String, nullable=False)
+    value_text = Column(String)
+    value_date = Column(Date)
+
+
+def document_field_rows(doc: UploadedDocument) -> list:
+    """document_fields rows for ``doc``, from the values assigned to its JSON columns."""
+    sources = {col: getattr(doc, col) for col in SOURCE_COLUMNS}
+    return [
+        dict(r, uploaded_document_id=doc.id, form_id=doc.form_id, file_type=doc.file_type)
+        for r in extract_fields(doc.file_type, sources)
+    ]
+
+
+REFRESH_CHUNK = 500  # ids per statement, under SQLite's bound-parameter limit
+
+
+def refresh_document_fields(cur, doc_ids) -> int:
+    """Rebuild the document_fields rows of ``doc_ids`` through a DB-API cursor.
+
+    For scripts that write uploaded_documents with raw SQL (sqlite3, or
+    ``connection.connection.cursor()`` of a SQLAlchemy connection), which the ORM
+    listeners below never see. Returns the number of field rows written; the caller commits.
+    """
+    ids = sorted({i for i in doc_ids if i is not None})
+    columns = ", ".join(SOURCE_COLUMNS)
+    written = 0
+    for i in range(0, len(ids), REFRESH_CHUNK):
+        chunk = ids[i:i + REFRESH_CHUNK]
+        marks = ", ".join("?" * len(chunk))
+        cur.execute(f"DELETE FROM document_fields WHERE uploaded_document_id IN ({marks})", chunk)
+        cur.execute(f"SELECT id, {columns} FROM uploaded_documents WHERE id IN ({marks})", chunk)
+        rows = []
+        for doc_id, *values in cur.fetchall():
+            sources = {
+                col: value if col in ("form_id", "file_type") else decode_json(value)
+                for col, value in zip(SOURCE_COLUMNS, values)
+            }
+            for r in extract_fields(sources["file_type"], sources):
+                value_date = r["value_date"].isoformat() if r["value_date"] else None
+                rows.append((doc_id, sources["form_id"], sources["file_type"], r["field"], r["value_text"], value_date))
+        if rows:
+            cur.executemany(
+                "INSERT INTO document_fields (uploaded_document_id, form_id, file_type, field, value_text, value_date) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            written += len(rows)
+    return written
+
+
+def _write_document_fields(connection, doc: UploadedDocument) -> None:
+    table = DocumentField.__table__
+    connection.execute(table.delete().where(table.c.uploaded_document_id == doc.id))
+    rows = document_field_rows(doc)
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+@event.listens_for(UploadedDocument, "after_insert")
+def _document_fields_after_insert(mapper, connection, target):
+    _write_document_fields(connection, target)
+
+
+@event.listens_for(UploadedDocument, "after_update")
+def _document_fields_after_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[col].history.has_changes() for col in SOURCE_COLUMNS):
+        _write_document_fields(connection, target)
+
+
+class CredentialExpiration(Base):
+    """Normalized expiration date of a current document's credential, maintained by
+    app/services/expiration_service.scan_expirations."""
+    __tablename__ = "credential_expirations"
+    __table_args__ = (Index("ix_credential_expirations_date", "expires_on", "credential"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    uploaded_document_id = Column(Integer, ForeignKey("uploaded_documents.id"), nullable=False, index=True)
+    form_id = Column(String, index=True)
+    file_type = Column(String)
+    credential = Column(String, nullable=False)  # license, board_certification, board_reverification, dea, malpractice
+    field = Column(String)
+    raw_value = Column(String)
+    expires_on = Column(Date, nullable=False)
+    scanned_at = Column(DateTime, default=datetime.utcnow)
+
+
+class JobState(Base):
+    """Last-run bookkeeping for incremental batch jobs."""
+    __tablename__ = "job_state"
+
+    name = Column(String, primary_key=True)
+    watermark = Column(DateTime)  # start time of the last successful run
+    last_started_at = Column(DateTime)
+    last_finished_at = Column(DateTime)
+    last_stats = Column(JSONText)
+
+
+class NpiRegistryEntry(Base):
+    """Local mirror of the NPPES NPI registry, loaded by scripts/ingest_npi_files.py."""
+    __tablename__ = "npi_registry"
+    __table_args__ = (Index("ix_npi_registry_name", "last_name", "first_name"),)
+
+    npi = Column(String, primary_key=True)
+    entity_type = Column(Integer)  # 1 individual, 2 organization
+    first_name = Column(String)
+    middle_name = Column(String)
+    last_name = Column(String)
+    credential = Column(String)
+    organization_name = Column(String)
+    primary_taxonomy = Column(String)
+    license_number = Column(String)
+    license_state = Column(String)
+    practice_state = Column(String)
+    practice_postal_code = Column(String)
+    enumeration_date = Column(Date)
+    last_update_date = Column(Date)
+    deactivation_date = Column(Date)
+    reactivation_date = Column(Date)
+
+
+class ExclusionRecord(Base):
+    """Entry from an exclusion list (OIG LEIE, SAM), replaced wholesale per source on each load
+    by scripts/screen_exclusions.py."""
+    __tablename__ = "exclusion_records"
+    __table_args__ = (Index("ix_exclusion_records_block", "name_key", "birth_year"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False, index=True)  # LEIE, SAM
+    first_name = Column(String)
+    middle_name = Column(String)
+    last_name = Column(String)
+    business_name = Column(String)
+    npi = Column(String, index=True)
+    dob = Column(Date)
+    birth_year = Column(Integer)
+    name_key = Column(String)  # soundex of the normalized last name, for blocking
+    state = Column(String)
+    exclusion_type = Column(String)
+    exclusion_date = Column(Date)
+    reinstatement_date = Column(Date)  # LEIE reinstatement / SAM termination
+    raw = Column(JSONText)
+    loaded_at = Column(DateTime, default=datetime.utcnow)
+
+
+class EntityMatch(Base):
+    """Latest resolution of a source row (NPI or normalized name) to a provider form,
+    written by app/services/entity_resolution.EntityResolver."""
+    __tablename__ = "entity_matches"
+    __table_args__ = (Index("ux_entity_matches_source_key", "source", "source_key", unique=True),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False)  # e.g. dea_excel, realign
+    source_key = Column(String, nullable=False)
+    form_id = Column(String, index=True)  # NULL when unmatched
+    application_id = Column(String)
+    method = Column(String, nullable=False)  # npi, name, fuzzy, unmatched
+    score = Column(Float)
+    candidates = Column(Integer)  # providers sharing the key; > 1 means ambiguous
+    matched_at = Column(DateTime, default=datetime.utcnow)
+
+
+class IngestionLedgerEntry(Base):
+    """Last ingested content of one source row (sheet/CSV row key), kept by
+    app/services/ingestion_ledger.Ledger so re-runs only write rows that changed."""
+    __tablename__ = "ingestion_ledger"
+    __table_args__ = (Index("ux_ingestion_ledger_row", "source", "sheet", "row_key", unique=True),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False)  # file name, e.g. Other_Attributes_Schema.xlsx
+    sheet = Column(String, nullable=False)  # sheet name; '' for CSV
+    row_key = Column(String, nullable=False)  # e.g. the row's NPI
+    content_hash = Column(String, nullable=False)  # sha256 of the written payload
+    form_id = Column(String, index=True)
+    uploaded_document_id = Column(Integer, ForeignKey("uploaded_documents.id"))
+    ingested_at = Column(DateTime, default=datetime.utcnow)
+    vanished_at = Column(DateTime)  # set when a run no longer finds the row
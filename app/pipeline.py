@@ -1,27 +1,36 @@
-import fitz  # PyMuPDF
 import json
-from PIL import Image
-from openai import OpenAI
 import base64
+from functools import lru_cache
 from io import BytesIO
-import os 
-import json
 import re
-from dotenv import load_dotenv
 from pathlib import Path
 
+from app.metrics import llm_call
+from app.tracing import traced
+
 env_path = Path(__file__).resolve().parent.parent / '.env'
-load_dotenv(dotenv_path=env_path)
 
 
 # ========== CONFIGURATION ==========
-os.environ["OPENAI_API_KEY"] =  os.getenv("OPENAI_API_KEY")
-client = OpenAI()
+# fitz, PIL and openai are imported on first use, and the client is built once per process.
+# Importing this module (the API, the worker) then costs nothing until a document is processed.
+@lru_cache(maxsize=1)
+def get_client():
+    from dotenv import load_dotenv
+    from openai import OpenAI
+
+    load_dotenv(dotenv_path=env_path)
+    return OpenAI()
+
 
 # --------------------------
 # Helper: Convert PDF to first page image
 # --------------------------
+@traced("pipeline.pdf_to_image")
 def pdf_to_image(pdf_path):
+    import fitz  # PyMuPDF
+    from PIL import Image
+
     doc = fitz.open(pdf_path)
     page = doc.load_page(0)
     pix = page.get_pixmap(dpi=300)
@@ -32,6 +41,7 @@ def pdf_to_image(pdf_path):
 # --------------------------
 # Helper: Convert Image to base64
 # --------------------------
+@traced("pipeline.image_to_base64")
 def image_to_base64(pil_img):
     buffered = BytesIO()
     pil_img.save(buffered, format="PNG")
@@ -62,6 +72,7 @@ def extract_json_block(llm_response: str) -> dict:
 # --------------------------
 # Step 1: OCR + Extract JSON via OpenAI Vision
 # --------------------------
+@traced("pipeline.extract_json")
 def extract_json_from_pdf(pdf_path, keys):
     img = pdf_to_image(pdf_path)
     b64 = image_to_base64(img)
@@ -73,23 +84,25 @@ Also for each key, give confidence score as 'key'_confident_score. Explaining ho
 Only return JSON. No explanation.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {
-                        "url": f"data:image/png;base64,{b64}",
-                        "detail": "high"
-                    }},
-                ]
-            }
-        ],
-        max_tokens=500,
-        temperature=0
-    )
+    with llm_call("extract_json", "gpt-4o-mini") as call:
+        call.response = get_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {"type": "image_url", "image_url": {
+                            "url": f"data:image/png;base64,{b64}",
+                            "detail": "high"
+                        }},
+                    ]
+                }
+            ],
+            max_tokens=500,
+            temperature=0
+        )
+    response = call.response
     
     try:
         json_block = extract_json_block(response.choices[0].message.content)
@@ -100,6 +113,7 @@ Only return JSON. No explanation.
 # --------------------------
 # Step 2: Compare PDFs Visually
 # --------------------------
+@traced("pipeline.compare_pdf_format")
 def compare_pdf_format_with_llm(reference_pdf_path, user_pdf_path, reference_json_keys):
     img_ref = pdf_to_image(reference_pdf_path)
     b64_ref = image_to_base64(img_ref)
@@ -136,18 +150,20 @@ def compare_pdf_format_with_llm(reference_pdf_path, user_pdf_path, reference_jso
         If False, validate again and return
         """
     print("Prompt for pdf comparision: ",prompt)
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "user", "content": [
-                {"type": "text", "text": prompt},
-                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{b64_ref}", "detail": "high"}},
-                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{b64_user}", "detail": "high"}},
-            ]}
-        ],
-        max_tokens=100,
-        temperature=1,
-    )
+    with llm_call("compare_pdf_format", "gpt-4o-mini") as call:
+        call.response = get_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "user", "content": [
+                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{b64_ref}", "detail": "high"}},
+                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{b64_user}", "detail": "high"}},
+                ]}
+            ],
+            max_tokens=100,
+            temperature=1,
+        )
+    response = call.response
 
     try:
         json_block = extract_json_block(response.choices[0].message.content)
@@ -159,6 +175,7 @@ def compare_pdf_format_with_llm(reference_pdf_path, user_pdf_path, reference_jso
 # --------------------------
 # Step 3: Compare OCR JSON vs User Provided JSON
 # --------------------------
+@traced("pipeline.compare_jsons")
 def compare_jsons(extracted, provided): 
     result = {}
     # keys_list = list(set(extracted.keys()).union(provided.keys()))
@@ -178,6 +195,7 @@ def compare_jsons(extracted, provided):
 # --------------------------
 # Wrapper Pipeline
 # --------------------------
+@traced("pipeline.run")
 def run_pipeline(reference_json_keys, reference_pdf_path, user_pdf_path, user_provided_json):
     print("Extracting fields from user PDF using GPT-4o-mini Vision...")
     extracted_json = extract_json_from_pdf(user_pdf_path, reference_json_keys)
@@ -1,16 +1,19 @@
 from fastapi import APIRouter, HTTPException, Depends
-from rich import status
 from sqlalchemy import desc 
 from sqlalchemy.orm import Session
 from app.schemas import ApplicationCreate, ApplicationResponse
 from app.models import Application
 from typing import List
 from datetime import datetime
-import json
-from app.models import FormData, UploadedDocument, EmailRecord, ApplicationEvent
+from app.models import FormData, UploadedDocument, EmailRecord, ApplicationEvent, ApplicationIssue, CurrentDocument, DocumentField, CredentialExpiration, IngestionLedgerEntry
 from app.utils import get_db, compute_progress
 import uuid
 from app.services.report_service import ReportService
+from app.services.blob_store import release_blob
+from app.services.issue_service import get_application_issues
+from app.services.npi_registry import npi_issues
+from app.services.upload_service import current_documents_query
+from app.services.status_counts import document_status_counts, email_status_counts
 
 router = APIRouter(prefix="/api/applications", tags=["Applications"])
 # Committee review endpoints now live under the main router with correct paths
@@ -114,70 +117,11 @@ def get_ai_issues(app_id: str, db: Session = Depends(get_db)):
     if not form_data:
         raise HTTPException(status_code=404, detail="Form data not found")
 
-    # Get related file upload with OCR data
-    file_upload = db.query(UploadedDocument).filter_by(form_id=application.form_id).first()
-    if not file_upload:
-        raise HTTPException(status_code=404, detail="OCR/Match data not found")
-
-    issues = []
-
-    # ---------- 1. Parse JSON match ----------
-    if file_upload.json_match:
-        try:
-            json_match_data = json.loads(file_upload.json_match)
-            for field, data in json_match_data.items():
-                if not data.get("match"):
-                    issues.append({
-                        "field": field.upper(),
-                        "issue": f"{field.upper()} field mismatch.",
-                        "confidence": float(data.get("extracted_confident_score", 0)),
-                        "value": data.get("extracted"),
-                        "reasoning": f"Extracted value '{data.get('extracted')}' does not match provided value '{data.get('provided')}'."
-                    })
-        except Exception:
-            raise HTTPException(status_code=500, detail="Error parsing json_match")
-
-    # # ---------- 2. Parse PDF Match ----------
-    # if file_upload.pdf_match:
-    #     try:
-    #         pdf_data = json.loads(file_upload.pdf_match)
-    #         if not pdf_data.get("match"):
-    #             issues.append({
-    #                 "field": "PDF Document",
-    #                 "issue": "PDF and extracted layout mismatch.",
-    #                 "confidence": float(pdf_data.get("confidance_score", 0)),
-    #                 "value": "",
-    #                 "reasoning": pdf_data.get("reason")
-    #             })
-    #     except Exception:
-    #         raise HTTPException(status_code=500, detail="Error parsing pdf_match")
-
-    # ---------- 3. Add mock/derived logic issues ----------
-    # Example hardcoded issues — you can replace this with ML/validation logic later
-    if form_data.npi == "0987654321":
-        issues.append({
-            "field": "NPI",
-            "issue": "NPI number not found in national registry.",
-            "confidence": 0.82,
-            "value": form_data.npi,
-            "reasoning": "The NPI provided did not return a valid result from the NPPES NPI Registry. This could be a typo or an inactive NPI."
-        })
+    # Document issues are precomputed by the processing worker (see issue_service)
+    issues = get_application_issues(db, application.id)
 
-    issues.append({
-        "field": "Address",
-        "issue": "ZIP code and City mismatch.",
-        "confidence": 0.95,
-        "value": form_data.address,
-        "reasoning": "(1) The ZIP code 958818 (provided in Address) does not match with the address in Driving License. However, the zip code is not valid for the California state. \n (2) The city 'Hometown' does not match with the city 'Anytown' in the Driving License."
-    })
-
-    issues.append({
-        "field": "CV/Resume",
-        "issue": "Gap in employment history (3 months).",
-        "confidence": 0.65,
-        "value": "Missing: Jan 2020 - Mar 2020",
-        "reasoning": "A 3-month gap was detected between two listed employment periods. This may require clarification from the provider."
-    })
+    # Provider NPI checked against the local NPPES mirror (scripts/ingest_npi_files.py)
+    issues.extend(npi_issues(db, form_data))
 
     return {"issues": issues}
 
@@ -194,29 +138,20 @@ def get_ai_summary(app_id: str, db: Session = Depends(get_db)):
     if not form_data:
         raise HTTPException(status_code=404, detail="Form data not found")
 
-    # Get related file uploads with OCR data
-    file_uploads = db.query(UploadedDocument).filter_by(form_id=application.form_id).all()
-    if not file_uploads:
+    # Status counts come straight from GROUP BYs; no document/email rows are loaded
+    doc_counts = document_status_counts(db, application.form_id)
+    total_docs = sum(doc_counts.values())
+    if not total_docs:
         raise HTTPException(status_code=404, detail="OCR/Match data not found")
-    
-    emails = db.query(EmailRecord).filter_by(application_id=application.id).all()
-
-    # Example logic: count verified, approved, in progress, etc.
-    total_docs = len(file_uploads)
-    approved_docs = sum(1 for f in file_uploads if f.status == "APPROVED")
-    in_progress_docs = sum(1 for f in file_uploads if f.status == "New" or f.status == "In Progress")
 
+    approved_docs = doc_counts.get("APPROVED", 0)
+    in_progress_docs = doc_counts.get("New", 0) + doc_counts.get("In Progress", 0)
     pending_docs = total_docs - approved_docs - in_progress_docs
 
-    # Placeholder email logic (adjust with your actual email model/status)
-    if emails:
-        emails_sent = len([e for e in emails if e.status == "SENT"])
-        draft_emails = len([e for e in emails if e.status == "DRAFT"])
-        pending_emails = len([e for e in emails if e.status == "PENDING"])
-    else:
-        emails_sent = 1
-        draft_emails = 1
-        pending_emails = 6
+    email_counts = email_status_counts(db, application.id)
+    emails_sent = email_counts.get("SENT", 0)
+    draft_emails = email_counts.get("DRAFT", 0)
+    pending_emails = email_counts.get("PENDING", 0)
 
     return {
         "providerName": form_data.provider_name,
@@ -310,49 +245,19 @@ def get_application_by_id(app_id: str, db: Session = Depends(get_db)):
         }
 
     docs = []
-    uploads = db.query(UploadedDocument).filter(UploadedDocument.form_id == application.form_id, UploadedDocument.status != "Replaced").all()
+    uploads = current_documents_query(db, application.form_id).all()
     for u in uploads:
         docs.append({
             "id": u.id,
             "type": u.file_type,
             "filename": u.filename,
             "status": u.status,
-            "ocrData": u.ocr_output and json.loads(u.ocr_output) if u.ocr_output else {},
-            "jsonMatch": u.json_match and json.loads(u.json_match) if u.json_match else {},
+            "ocrData": u.ocr_output or {},
+            "jsonMatch": u.json_match or {},
         })
 
-    # AI issues reuse logic from separate endpoint (light duplication to avoid extra call)
-    issues = []
-    first_doc = uploads[0] if uploads else None
-    if first_doc and first_doc.json_match:
-        try:
-            json_match_data = json.loads(first_doc.json_match)
-            for field, data in json_match_data.items():
-                if not data.get("match"):
-                    issues.append({
-                        "field": field.upper(),
-                        "issue": f"{field.upper()} field mismatch.",
-                        "confidence": float(data.get("extracted_confident_score", 0)),
-                        "value": data.get("extracted"),
-                        "reasoning": f"Extracted value '{data.get('extracted')}' does not match provided value '{data.get('provided')}'."
-                    })
-        except Exception:
-            pass
-
-    # Add two demo issues if list empty (placeholder until ML pipeline integrated)
-    if not issues:
-        issues.append({
-            "field": "DEA CERTIFICATE",
-            "issue": "Missing Schedule II authorization",
-            "confidence": 0.88,
-            "value": "DEA Certificate ID: 1234567890, Authorized Schedules: III, IV, V",
-            "reasoning": "Schedule II not explicitly listed for this specialty."})
-        issues.append({
-            "field": "CV/RESUME",
-            "issue": "Gap in employment history (3 months)",
-            "confidence": 0.65,
-            "value": "Missing: Jan 2020 - Mar 2020",
-            "reasoning": "Detected temporal gap requiring clarification."})
+    # AI issues precomputed per document by the processing worker
+    issues = get_application_issues(db, application.id)
 
     # Timeline events
     events = []
@@ -365,9 +270,8 @@ def get_application_by_id(app_id: str, db: Session = Depends(get_db)):
             "createdAt": ev.created_at.isoformat() if ev.created_at else None
         })
 
-    # Email summary placeholders
-    emails = db.query(EmailRecord).filter_by(application_id=application.id).all()
-    emails_sent = len([e for e in emails if e.status == "SENT"])
+    # Email summary
+    emails_sent = email_status_counts(db, application.id).get("SENT", 0)
 
     return {
         "id": application.id,
@@ -400,9 +304,25 @@ def get_application_by_id(app_id: str, db: Session = Depends(get_db)):
 
 @router.delete("/{app_id}")
 def delete_application(app_id: str, db: Session = Depends(get_db)):
+    # Form-scoped rows hang off the application's form_id, not its id
+    application = db.query(Application).filter(Application.id == app_id).first()
+    form_id = application.form_id if application and application.form_id else app_id
     # Delete related records
-    db.query(FormData).filter(FormData.form_id == app_id).delete()
-    db.query(UploadedDocument).filter(UploadedDocument.form_id == app_id).delete()
+    db.query(FormData).filter(FormData.form_id == form_id).delete()
+    blob_refs = [
+        sha for (sha,) in db.query(UploadedDocument.blob_sha256)
+        .filter(UploadedDocument.form_id == form_id, UploadedDocument.blob_sha256.isnot(None))
+    ]
+    db.query(ApplicationIssue).filter(
+        (ApplicationIssue.form_id == form_id) | (ApplicationIssue.application_id == app_id)
+    ).delete(synchronize_session=False)
+    db.query(CurrentDocument).filter(CurrentDocument.form_id == form_id).delete()
+    db.query(DocumentField).filter(DocumentField.form_id == form_id).delete()
+    db.query(CredentialExpiration).filter(CredentialExpiration.form_id == form_id).delete()
+    db.query(IngestionLedgerEntry).filter(IngestionLedgerEntry.form_id == form_id).delete()
+    db.query(UploadedDocument).filter(UploadedDocument.form_id == form_id).delete()
+    for sha in blob_refs:
+        release_blob(db, sha)
     db.query(EmailRecord).filter(EmailRecord.application_id == app_id).delete()
     db.query(ApplicationEvent).filter(ApplicationEvent.application_id == app_id).delete()
     # Delete application
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Query, HTTPException
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from ..models import UploadedDocument, Application
+from ..models import Application, CurrentDocument
 from ..database import SessionLocal
+from ..services.blob_store import blob_path
+from ..services.upload_service import current_documents_query
 import os
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
@@ -17,19 +19,18 @@ async def download_document(id: str = Query(...), type: str = Query(...)):
             raise HTTPException(status_code=404, detail="Application not found")
 
         file_upload = (
-            db.query(UploadedDocument)
-            .filter(
-                UploadedDocument.status != 'Replaced',
-                UploadedDocument.form_id == application.form_id,
-                UploadedDocument.file_type == type
-            )
+            current_documents_query(db, application.form_id)
+            .filter(CurrentDocument.file_type == type)
             .first()
         )
         if not file_upload:
             raise HTTPException(status_code=404, detail="Document not found")
 
         filename_without_ext = ".".join(file_upload.filename.split(".")[:-1])
-        file_path = os.path.join(DOWNLOAD_DIR, f"{filename_without_ext}__{application.form_id}.pdf")
+        if file_upload.blob_sha256:
+            file_path = blob_path(file_upload.blob_sha256)
+        else:
+            file_path = os.path.join(DOWNLOAD_DIR, f"{filename_without_ext}__{application.form_id}.pdf")
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail="File not found on disk")
 
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..utils import get_db
+from ..models import Application, CredentialExpiration
+from ..services.expiration_service import CREDENTIALS, last_scan
+
+# Expiry calendar over credential_expirations, refreshed nightly by
+# scripts/run_expiration_scan.py.
+router = APIRouter(prefix="/api/expirations", tags=["Expirations"])
+
+
+@router.get("/calendar")
+def get_expiration_calendar(
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    credential: Optional[List[str]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Credentials expiring between ``start`` (default today) and ``end`` (default start + 90 days).
+
+    ``days`` counts every expiration in the window per date; ``items`` is the requested page,
+    ordered by date.
+    """
+    start = start or date.today()
+    end = end or start + timedelta(days=90)
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if credential:
+        unknown = sorted(set(credential) - set(CREDENTIALS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown credential(s): {', '.join(unknown)}")
+
+    filters = [CredentialExpiration.expires_on >= start, CredentialExpiration.expires_on <= end]
+    if credential:
+        filters.append(CredentialExpiration.credential.in_(credential))
+
+    days = (
+        db.query(CredentialExpiration.expires_on, func.count(CredentialExpiration.id))
+        .filter(*filters)
+        .group_by(CredentialExpiration.expires_on)
+        .order_by(CredentialExpiration.expires_on)
+        .all()
+    )
+    rows = (
+        db.query(CredentialExpiration, Application)
+        .outerjoin(Application, Application.form_id == CredentialExpiration.form_id)
+        .filter(*filters)
+        .order_by(CredentialExpiration.expires_on, CredentialExpiration.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "total": sum(count for _, count in days),
+        "days": [{"date": d.isoformat(), "count": count} for d, count in days],
+        "items": [
+            {
+                "date": e.expires_on.isoformat(),
+                "credential": e.credential,
+                "rawValue": e.raw_value,
+                "documentId": e.uploaded_document_id,
+                "formId": e.form_id,
+                "fileType": e.file_type,
+                "applicationId": app.id if app else None,
+                "providerName": " ".join(p for p in (app.name, app.last_name) if p) if app else None,
+                "psvStatus": app.psv_status if app else None,
+            }
+            for e, app in rows
+        ],
+        "lastScan": last_scan(db),
+    }
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ..utils import get_db
+from ..services.entity_resolution import normalize_npi
+from ..services.npi_registry import entry_to_response, lookup_npi, npi_checksum_ok
+
+# Lookups against the local NPPES mirror (loaded by scripts/ingest_npi_files.py)
+router = APIRouter(prefix="/api/npi", tags=["NPI Registry"])
+
+
+@router.get("/{npi}")
+def get_npi(npi: str, db: Session = Depends(get_db)):
+    normalized = normalize_npi(npi)
+    if not npi_checksum_ok(normalized or ""):
+        raise HTTPException(status_code=400, detail="Not a valid 10-digit NPI")
+    entry = lookup_npi(db, normalized)
+    if not entry:
+        raise HTTPException(status_code=404, detail="NPI not found in registry")
+    return entry_to_response(entry)
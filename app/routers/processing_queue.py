@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from ..utils import get_db
+from ..services.processing_queue import lane_stats
+
+router = APIRouter(prefix="/api/processing-queue", tags=["Processing Queue"])
+
+
+@router.get("/stats")
+def get_processing_queue_stats(db: Session = Depends(get_db)):
+    """Per-lane queue depth and age of the oldest waiting document, in priority order."""
+    return {"lanes": lane_stats(db)}
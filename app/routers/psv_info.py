@@ -2,8 +2,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from ..utils import get_db
-from ..models import Application, FormData, UploadedDocument
-import json
+from ..services.upload_service import current_documents_query
+from ..models import Application, FormData
 
 router = APIRouter(prefix="/api", tags=["PSV Info"])
 
@@ -31,10 +31,7 @@ def get_psv_info(application_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Application not found")
     form = db.query(FormData).filter_by(form_id=app.form_id).first()
 
-    docs = db.query(UploadedDocument).filter(
-        UploadedDocument.form_id == app.form_id,
-        UploadedDocument.status != 'Replaced'
-    ).all()
+    docs = current_documents_query(db, app.form_id).all()
 
     provider_docs = []
     psv_docs = []
@@ -48,9 +45,9 @@ def get_psv_info(application_id: str, db: Session = Depends(get_db)):
             "type": d.file_type,
             "displayName": DISPLAY_NAME_OVERRIDES.get(d.file_type, d.file_type.replace('_', ' ').title()),
             "status": d.status,
-            "ocrOutput": json.loads(d.ocr_output) if d.ocr_output else {},
-            "verification": json.loads(d.verification_data) if d.verification_data else [],
-            "jsonMatch": json.loads(d.json_match) if d.json_match else {},
+            "ocrOutput": d.ocr_output or {},
+            "verification": d.verification_data or [],
+            "jsonMatch": d.json_match or {},
         }
         if d.file_type.upper() in PROVIDER_SUBMITTED_TYPES:
             provider_docs.append(item)
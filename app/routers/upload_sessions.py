@@ -0,0 +1,179 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models import UploadSession
+from ..schemas import UploadSessionCreate
+from ..services.upload_service import partial_path, record_upload
+from ..services.blob_store import add_blob_ref, hash_file, place_blob
+from ..services.processing_queue import enqueue_documents
+import os
+import uuid
+
+# Resumable alternative to /api/forms/upload-file for large packets:
+# create session -> PUT chunks at the current offset -> finalize.
+router = APIRouter(prefix="/api/forms/upload-sessions", tags=["Uploads"])
+
+
+def session_to_response(s: UploadSession) -> dict:
+    return {
+        "sessionId": s.id,
+        "formId": s.form_id,
+        "fileType": s.file_type,
+        "filename": s.filename,
+        "totalSize": s.total_size,
+        "offset": s.received_bytes or 0,
+        "status": s.status,
+        "fileId": s.uploaded_document_id,
+    }
+
+
+def _get_open_session(db: Session, session_id: str) -> UploadSession:
+    s = db.query(UploadSession).filter(UploadSession.id == session_id).first()
+    if not s:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    if s.status != "OPEN":
+        raise HTTPException(status_code=409, detail=f"Upload session is {s.status}")
+    return s
+
+
+@router.post("/")
+def create_upload_session(payload: UploadSessionCreate):
+    db: Session = SessionLocal()
+    try:
+        s = UploadSession(
+            id=str(uuid.uuid4()),
+            form_id=payload.form_id,
+            file_type=payload.file_type,
+            filename=payload.filename,
+            total_size=payload.total_size,
+            received_bytes=0,
+            checksum=(payload.checksum or "").lower() or None,
+            status="OPEN",
+        )
+        db.add(s)
+        open(partial_path(s.id), "wb").close()
+        db.commit()
+        db.refresh(s)
+        return session_to_response(s)
+    finally:
+        db.close()
+
+
+@router.get("/{session_id}")
+def get_upload_session(session_id: str):
+    db: Session = SessionLocal()
+    try:
+        s = db.query(UploadSession).filter(UploadSession.id == session_id).first()
+        if not s:
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        return session_to_response(s)
+    finally:
+        db.close()
+
+
+@router.put("/{session_id}")
+async def upload_chunk(session_id: str, request: Request, offset: int = Query(..., ge=0)):
+    db: Session = SessionLocal()
+    try:
+        s = _get_open_session(db, session_id)
+        received = s.received_bytes or 0
+        # Chunks must be sent in order; a client that lost track resumes from the returned offset.
+        if offset != received:
+            return JSONResponse(
+                {"detail": "Offset mismatch", "offset": received},
+                status_code=409,
+            )
+
+        path = partial_path(s.id)
+        written = 0
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(offset)
+            async for block in request.stream():
+                written += len(block)
+                if offset + written > s.total_size:
+                    f.truncate(offset)
+                    raise HTTPException(status_code=400, detail="Chunk exceeds declared totalSize")
+                f.write(block)
+            # Drop any bytes left over from an earlier interrupted attempt at this offset
+            f.truncate(offset + written)
+
+        s.received_bytes = offset + written
+        db.commit()
+        db.refresh(s)
+        return session_to_response(s)
+    finally:
+        db.close()
+
+
+@router.post("/{session_id}/finalize")
+def finalize_upload_session(session_id: str):
+    db: Session = SessionLocal()
+    try:
+        s = _get_open_session(db, session_id)
+        path = partial_path(s.id)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if (s.received_bytes or 0) != s.total_size or size != s.total_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Upload incomplete: {size} of {s.total_size} bytes received",
+            )
+
+        sha256, _ = hash_file(path)
+        if s.checksum and sha256 != s.checksum:
+            raise HTTPException(status_code=422, detail="Checksum mismatch")
+
+        # Claim the session so a concurrent finalize gets a 409 instead of racing on the partial file.
+        claimed = (
+            db.query(UploadSession)
+            .filter(UploadSession.id == s.id, UploadSession.status == "OPEN")
+            .update({UploadSession.status: "FINALIZING"}, synchronize_session=False)
+        )
+        db.commit()
+        if not claimed:
+            raise HTTPException(status_code=409, detail="Upload session is already being finalized")
+
+        # Copy rather than move: the partial file must survive until the commit, so a
+        # failed finalize leaves the session OPEN and retryable.
+        try:
+            place_blob(path, sha256, move=False)
+            add_blob_ref(db, sha256, size)
+            new_file_record = record_upload(db, s.form_id, s.file_type, s.filename, blob_sha256=sha256)
+            enqueue_documents(db, [new_file_record], source="resumable_upload")
+            s.uploaded_document_id = new_file_record.id
+            s.status = "COMPLETED"
+            db.commit()
+        except Exception:
+            db.rollback()
+            db.query(UploadSession).filter(
+                UploadSession.id == session_id, UploadSession.status == "FINALIZING"
+            ).update({UploadSession.status: "OPEN"}, synchronize_session=False)
+            db.commit()
+            raise
+        if os.path.exists(path):
+            os.remove(path)
+        db.refresh(new_file_record)
+
+        return {
+            "message": "File uploaded successfully",
+            "fileId": new_file_record.id,
+            "filename": s.filename,
+            "fileType": s.file_type,
+        }
+    finally:
+        db.close()
+
+
+@router.delete("/{session_id}")
+def abort_upload_session(session_id: str):
+    db: Session = SessionLocal()
+    try:
+        s = _get_open_session(db, session_id)
+        path = partial_path(s.id)
+        if os.path.exists(path):
+            os.remove(path)
+        s.status = "ABORTED"
+        db.commit()
+        return session_to_response(s)
+    finally:
+        db.close()
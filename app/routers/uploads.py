@@ -1,17 +1,16 @@
-from fastapi import APIRouter, UploadFile, File, Form, Query
-from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, Query, HTTPException
+from typing import List, Optional
 from sqlalchemy.orm import Session
-from ..models import UploadedDocument, FormData, Application, ApplicationEvent, SavedFile
+from ..models import UploadedDocument, CurrentDocument, Application, ApplicationEvent, SavedFile
 import base64
 from ..database import SessionLocal
+from ..services.upload_service import record_upload, record_uploads
+from ..services.blob_store import add_blob_ref, place_blob, saved_file_bytes, spool_upload
+from ..services.processing_queue import enqueue_documents
 import os
-import ast
-import json
 from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/api/forms", tags=["Uploads"])
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
 @router.post("/upload-file")
@@ -20,45 +19,15 @@ async def upload_file(
     fileType: str = Form(...),
     file: UploadFile = File(...)
 ):  
-    filename_without_ext = ".".join(file.filename.split(".")[:-1])
-    file_ext = file.filename.split(".")[-1]
-    new_filename = f"{filename_without_ext}__{formId}.{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, new_filename)
-
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+    tmp_path, sha256, size = await spool_upload(file)
 
     db: Session = SessionLocal()
 
     try:
-        # 1. Mark previous file as replaced, if exists
-        previous_record = db.query(UploadedDocument).filter(
-            UploadedDocument.form_id == formId,
-            UploadedDocument.file_type == fileType,
-            UploadedDocument.status != "Replaced"
-        ).first()  # optional: based on latest
-
-        if previous_record:
-            previous_record.status = "Replaced"
-            db.flush()
-
-        # 2. Insert new file record
-        new_file_record = UploadedDocument(
-            form_id=formId,
-            filename=file.filename,
-            file_extension=file_ext,
-            file_type=fileType,
-            status="New"
-        )
-        db.add(new_file_record)
-        db.flush()
-
-        # 3. Update reference in FormData
-        form = db.query(FormData).filter(FormData.form_id == formId).first()
-        if form:
-            field_name = f"{fileType}_upload_id"
-            setattr(form, field_name, new_file_record.id)
-
+        place_blob(tmp_path, sha256)
+        add_blob_ref(db, sha256, size)
+        new_file_record = record_upload(db, formId, fileType, file.filename, blob_sha256=sha256)
+        enqueue_documents(db, [new_file_record], source="upload")
         db.commit()
         db.refresh(new_file_record)
 
@@ -73,6 +42,54 @@ async def upload_file(
         db.close()
 
 
+@router.post("/upload-files")
+async def upload_files(
+    formId: str = Form(...),
+    fileTypes: List[str] = Form(...),
+    files: List[UploadFile] = File(...)
+):
+    """Upload a whole application's documents in one request; fileTypes[i] describes files[i]."""
+    if len(fileTypes) != len(files):
+        raise HTTPException(status_code=400, detail="fileTypes and files must have the same length")
+    if len(set(fileTypes)) != len(fileTypes):
+        raise HTTPException(status_code=400, detail="Each fileType may appear only once per batch")
+
+    # Stream every file to disk first so the DB transaction below stays short
+    spooled = []
+    try:
+        for file in files:
+            spooled.append(await spool_upload(file))
+    except Exception:
+        for tmp_path, _, _ in spooled:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+    db: Session = SessionLocal()
+
+    try:
+        items = []
+        for file_type, file, (tmp_path, sha256, size) in zip(fileTypes, files, spooled):
+            place_blob(tmp_path, sha256)
+            add_blob_ref(db, sha256, size)
+            items.append((file_type, file.filename, sha256))
+        new_records = record_uploads(db, formId, items)
+        enqueue_documents(db, new_records, source="batch_upload")
+        db.commit()
+
+        return {
+            "message": "Files uploaded successfully",
+            "formId": formId,
+            "files": [
+                {"fileId": rec.id, "filename": rec.filename, "fileType": rec.file_type}
+                for rec in new_records
+            ],
+        }
+
+    finally:
+        db.close()
+
+
 def get_progress(type, status):
     if status == "Approved":
         return 100
@@ -100,36 +117,54 @@ def get_progress(type, status):
         return 45
     
 
-def _parse_json_field(val: Optional[str]):
-    if not val:
-        return {}
-    # try JSON first, then Python literal
-    try:
-        return json.loads(val)
-    except Exception:
-        try:
-            return ast.literal_eval(val)
-        except Exception:
-            return {}
+def _parse_json_field(val):
+    # JSONText columns are decoded on load; only fill in the empty default
+    return {} if val is None or val == "" else val
+
+
+# Provider-facing document type for each alias (matched case-insensitively); any other
+# type is shown upper-cased
+PROVIDER_TYPE_ALIASES = {
+    "degree": "MEDICAL_TRAINING_CERTIFICATE",
+    "medical_training_certificate": "MEDICAL_TRAINING_CERTIFICATE",
+    "medical_training_cert": "MEDICAL_TRAINING_CERTIFICATE",
+    "mtc": "MEDICAL_TRAINING_CERTIFICATE",
+    "med_training": "MEDICAL_TRAINING_CERTIFICATE",
+    "cv": "CV",
+    "cv/resume": "CV",
+    "resume": "CV",
+    "dea": "DEA",
+    "coi": "COI",
+    "malpractice_insurance": "malpractice_insurance",
+}
 
 
 def _normalize_provider_type(ft: str) -> str:
     if not ft:
         return ""
     v = ft.strip()
-    lu = v.lower()
-    if lu in ("degree", "medical_training_certificate", "medical_training_cert", "mtc", "med_training"):
-        return "MEDICAL_TRAINING_CERTIFICATE"
-    if lu in ("cv", "cv/resume", "resume"):
-        return "CV"
-    if lu == "dea":
-        return "DEA"
-    if lu == "coi":
-        return "COI"
-    if lu == "malpractice_insurance":
-        return "malpractice_insurance"
-    # default: uppercase token
-    return v.upper()
+    return PROVIDER_TYPE_ALIASES.get(v.lower(), v.upper())
+
+
+def _latest_documents_by_type(db: Session, form_id: str, file_types=None) -> List[UploadedDocument]:
+    """Newest current document per normalized type.
+
+    current_documents holds one row per raw file_type, so the form's current documents
+    are read in one query and grouped with _normalize_provider_type here; there is no
+    SQL copy of the rules to drift, and the replacement history is never read.
+    """
+    query = (
+        db.query(UploadedDocument)
+        .join(CurrentDocument, CurrentDocument.uploaded_document_id == UploadedDocument.id)
+        .filter(CurrentDocument.form_id == form_id)
+    )
+    if file_types is not None:
+        query = query.filter(CurrentDocument.file_type.in_(file_types))
+    newest = {}
+    for doc in query.order_by(UploadedDocument.id.desc()):
+        newest.setdefault(_normalize_provider_type(doc.file_type), doc)
+    return list(newest.values())
+
 
 @router.get("/upload-info")
 async def get_upload_info(
@@ -152,16 +187,10 @@ async def get_upload_info(
         "DEA", "CV", "MEDICAL_TRAINING_CERTIFICATE", "malpractice_insurance",
         "dea", "cv", "degree", "cv/resume", "medical_training_certificate", "medical_training_cert", "malpractice_insurance"
     }
-    query = (
-        db.query(UploadedDocument)
-        .filter(UploadedDocument.form_id == formId)
-        .order_by(UploadedDocument.id.desc())
-    )
-    all_rows = query.all()
-
     # Filter to provider types if any match, else fallback to all for this form
-    provider_rows = [r for r in all_rows if (r.file_type or "") in provider_file_types_db]
-    rows = provider_rows if provider_rows else all_rows
+    rows = _latest_documents_by_type(db, formId, provider_file_types_db)
+    if not rows:
+        rows = _latest_documents_by_type(db, formId)
     # Gather recent comments/events for the application if appId given
     comments = []
     if appId:
@@ -359,20 +388,16 @@ async def get_upload_info_psv(
     npi_file_info = files.get("npi")
     if npi_file_info and npi_file_info["filename"]:
         db_file = db.query(SavedFile).filter(SavedFile.filename == npi_file_info["filename"]).first()
-        if db_file:
-            # Encode file data as base64 for safe transport
-            npi_file_info["file"] = base64.b64encode(db_file.file_data).decode("utf-8")
-        else:
-            npi_file_info["file"] = None
+        data = saved_file_bytes(db_file) if db_file else None
+        # Encode file data as base64 for safe transport
+        npi_file_info["file"] = base64.b64encode(data).decode("utf-8") if data else None
 
     for key in ["license_board", "board_certification"]:
         file_info = files.get(key)
         if file_info and file_info["filename"]:
             db_file = db.query(SavedFile).filter(SavedFile.filename == file_info["filename"]).first()
-            if db_file:
-                file_info["file"] = base64.b64encode(db_file.file_data).decode("utf-8")
-            else:
-                file_info["file"] = None
+            data = saved_file_bytes(db_file) if db_file else None
+            file_info["file"] = base64.b64encode(data).decode("utf-8") if data else None
 
     return {"formId": formId, "files": files}
 
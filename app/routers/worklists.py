@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from ..utils import get_db
+from ..models import Application, CurrentDocument, DocumentField
+from ..document_fields import PROMOTED_FIELDS
+
+# Filtered worklists over promoted document fields (see app/document_fields.py), e.g.
+#   /api/worklists/license_expiration_date?dueWithinDays=60
+#   /api/worklists/abms_status?excludeValue=ACTIVE
+router = APIRouter(prefix="/api/worklists", tags=["Worklists"])
+
+
+@router.get("/fields")
+def list_worklist_fields():
+    return {
+        "fields": [
+            {"name": name, "type": spec["type"], "fileTypes": list(spec["file_types"])}
+            for name, spec in PROMOTED_FIELDS.items()
+        ]
+    }
+
+
+@router.get("/{field}")
+def get_field_worklist(
+    field: str,
+    dueWithinDays: Optional[int] = Query(None, ge=0),
+    after: Optional[date] = Query(None),
+    before: Optional[date] = Query(None),
+    value: Optional[List[str]] = Query(None),
+    excludeValue: Optional[List[str]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Current documents whose promoted ``field`` matches the filters.
+
+    Date fields take ``dueWithinDays`` (includes already-past dates), ``after`` and ``before``;
+    text fields take ``value`` / ``excludeValue`` (case-insensitive, repeatable).
+    """
+    spec = PROMOTED_FIELDS.get(field)
+    if not spec:
+        raise HTTPException(status_code=404, detail=f"Unknown field '{field}'")
+
+    query = (
+        db.query(DocumentField, Application)
+        .join(CurrentDocument, CurrentDocument.uploaded_document_id == DocumentField.uploaded_document_id)
+        .outerjoin(Application, Application.form_id == DocumentField.form_id)
+        .filter(DocumentField.field == field)
+    )
+    if spec["type"] == "date":
+        if value or excludeValue:
+            raise HTTPException(status_code=400, detail=f"'{field}' is a date field; use dueWithinDays/after/before")
+        if dueWithinDays is not None:
+            horizon = date.today() + timedelta(days=dueWithinDays)
+            before = min(before, horizon) if before else horizon
+        query = query.filter(DocumentField.value_date.isnot(None))
+        if after:
+            query = query.filter(DocumentField.value_date >= after)
+        if before:
+            query = query.filter(DocumentField.value_date <= before)
+        order = (DocumentField.value_date, DocumentField.id)
+    else:
+        if dueWithinDays is not None or after or before:
+            raise HTTPException(status_code=400, detail=f"'{field}' is a text field; use value/excludeValue")
+        if value:
+            query = query.filter(DocumentField.value_text.in_([v.strip().upper() for v in value]))
+        if excludeValue:
+            query = query.filter(DocumentField.value_text.notin_([v.strip().upper() for v in excludeValue]))
+        order = (DocumentField.value_text, DocumentField.id)
+
+    total = query.count()
+    rows = query.order_by(*order).offset(offset).limit(limit).all()
+    return {
+        "field": field,
+        "type": spec["type"],
+        "total": total,
+        "items": [
+            {
+                "documentId": f.uploaded_document_id,
+                "formId": f.form_id,
+                "fileType": f.file_type,
+                "value": f.value_text,
+                "date": f.value_date.isoformat() if f.value_date else None,
+                "applicationId": app.id if app else None,
+                "providerName": " ".join(p for p in (app.name, app.last_name) if p) if app else None,
+                "psvStatus": app.psv_status if app else None,
+            }
+            for f, app in rows
+        ],
+    }
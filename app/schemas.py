@@ -50,4 +50,11 @@ class EmailCreate(BaseModel):
     subject: str
     body: str
     status: str
-    sent_at: datetime
\ No newline at end of file
+    sent_at: datetime
+
+class UploadSessionCreate(BaseModel):
+    form_id: str = Field(..., alias="formId")
+    file_type: str = Field(..., alias="fileType")
+    filename: str
+    total_size: int = Field(..., alias="totalSize", gt=0)
+    checksum: str | None = None  # optional sha256 hex digest of the whole file
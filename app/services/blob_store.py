@@ -0,0 +1,154 @@
+import hashlib
+import os
+import shutil
+import uuid
+from typing import BinaryIO, Optional, Tuple
+
+from fastapi import UploadFile
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.models import FileBlob, SavedFile, UploadedDocument
+from app.services.upload_service import UPLOAD_DIR, PARTIAL_DIR, stored_filename
+
+# Content-addressed storage: every distinct file is kept once under
+# uploads/blobs/<first two hex chars>/<sha256>. UploadedDocument.blob_sha256 is the
+# per-form reference and file_blobs.ref_count tracks how many documents point at a blob.
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+READ_BLOCK_SIZE = 1024 * 1024
+RELEASED_KEY = "released_blobs"  # Session.info: sha256s whose last reference this transaction dropped
+
+
+def blob_path(sha256: str, blob_dir: str = BLOB_DIR) -> str:
+    return os.path.join(blob_dir, sha256[:2], sha256)
+
+
+def hash_file(path: str) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b""):
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def place_blob(src_path: str, sha256: str, move: bool = True, blob_dir: str = BLOB_DIR) -> bool:
+    """Put ``src_path`` into the store under ``sha256``. Returns False if the content was already stored."""
+    dest = blob_path(sha256, blob_dir)
+    if os.path.exists(dest):
+        if move:
+            os.remove(src_path)
+        return False
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    if move:
+        os.replace(src_path, dest)
+    else:
+        tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+        shutil.copyfile(src_path, tmp)
+        os.replace(tmp, dest)
+    return True
+
+
+def add_blob_ref(db: Session, sha256: str, size: int) -> None:
+    stmt = insert(FileBlob).values(sha256=sha256, size=size, ref_count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FileBlob.sha256],
+        set_={"ref_count": FileBlob.ref_count + 1},
+    )
+    db.execute(stmt)
+
+
+def release_blob(db: Session, sha256: Optional[str]) -> None:
+    """Drop one reference; the blob row is deleted when no document points at it anymore.
+
+    The file itself is removed only after the caller's transaction commits, so a rollback
+    leaves the row, its references and the bytes together.
+    """
+    if not sha256:
+        return
+    db.execute(
+        update(FileBlob)
+        .where(FileBlob.sha256 == sha256)
+        .values(ref_count=FileBlob.ref_count - 1)
+    )
+    blob = db.query(FileBlob).filter(FileBlob.sha256 == sha256).first()
+    if blob and (blob.ref_count or 0) <= 0:
+        db.delete(blob)
+        db.info.setdefault(RELEASED_KEY, set()).add(sha256)
+
+
+@event.listens_for(Session, "after_commit")
+def _unlink_released_blobs(session: Session) -> None:
+    released = session.info.pop(RELEASED_KEY, None)
+    if not released:
+        return
+    # Another transaction may have stored the same content again since; its row keeps the file
+    with session.get_bind().connect() as conn:
+        live = set(conn.execute(select(FileBlob.sha256).where(FileBlob.sha256.in_(released))).scalars())
+    for sha256 in released - live:
+        path = blob_path(sha256)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_released_blobs(session: Session) -> None:
+    session.info.pop(RELEASED_KEY, None)
+
+
+def store_file(db: Session, src_path: str, move: bool = True) -> str:
+    """Hash ``src_path``, dedupe it into the store and take a reference. Returns the sha256."""
+    sha256, size = hash_file(src_path)
+    place_blob(src_path, sha256, move=move)
+    add_blob_ref(db, sha256, size)
+    return sha256
+
+
+def spool_stream(src: BinaryIO) -> Tuple[str, str, int]:
+    """Copy a readable binary stream (e.g. a zip entry) to a temp file while hashing it.
+    Returns (temp path, sha256, size)."""
+    tmp_path = os.path.join(PARTIAL_DIR, f"{uuid.uuid4()}.upload")
+    digest = hashlib.sha256()
+    size = 0
+    with open(tmp_path, "wb") as f:
+        for block in iter(lambda: src.read(READ_BLOCK_SIZE), b""):
+            digest.update(block)
+            size += len(block)
+            f.write(block)
+    return tmp_path, digest.hexdigest(), size
+
+
+async def spool_upload(file: UploadFile) -> Tuple[str, str, int]:
+    """Stream an UploadFile to a temp file while hashing it. Returns (temp path, sha256, size)."""
+    tmp_path = os.path.join(PARTIAL_DIR, f"{uuid.uuid4()}.upload")
+    digest = hashlib.sha256()
+    size = 0
+    with open(tmp_path, "wb") as f:
+        while True:
+            block = await file.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            size += len(block)
+            f.write(block)
+    return tmp_path, digest.hexdigest(), size
+
+
+def document_path(doc: UploadedDocument) -> str:
+    """Location of a document's bytes: the shared blob, or the legacy per-form copy."""
+    if doc.blob_sha256:
+        return blob_path(doc.blob_sha256)
+    return os.path.join(UPLOAD_DIR, stored_filename(doc.filename, doc.form_id))
+
+
+def saved_file_bytes(saved: SavedFile) -> Optional[bytes]:
+    """Content of a saved_files row: its blob, or the bytes stored inline by older imports."""
+    if saved.blob_sha256:
+        path = blob_path(saved.blob_sha256)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    return saved.file_data
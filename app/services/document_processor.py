@@ -0,0 +1,95 @@
+import os
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import FormData, ProcessingJob, UploadedDocument
+from app.pipeline import run_pipeline
+from app.services.blob_store import document_path
+from app.services.issue_service import refresh_document_issues
+from app.services.processing_queue import claim_next_job, fail_job, finish_job
+from app.tracing import span
+from app.utils import reference_keys_map
+
+FOLDER_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+REF_DIR = os.path.join(FOLDER_DIR, "ref_uploads")
+
+
+def _user_json(file_type: str, form: FormData) -> dict:
+    """Provider-supplied values the OCR output is matched against."""
+    if file_type == "dl":
+        return {
+            "fn": form.provider_name or "",
+            "ln": form.provider_last_name or "",
+            "dl": form.dl_number or "",
+            "dob": form.dob.strftime("%m/%d/%Y") if form.dob else "",
+        }
+    if file_type == "npi":
+        return {
+            "fn": form.provider_name or "",
+            "ln": form.provider_last_name or "",
+            "npi": form.npi or "",
+        }
+    if file_type == "degree":
+        return {
+            "degree": form.degree_type or "",
+            "college name": form.university or "",
+            "year": form.year or "",
+        }
+    return {}
+
+
+def process_job(db: Session, job: ProcessingJob) -> None:
+    """Run OCR + matching for one claimed job and record the outcome on the document and job."""
+    row: Optional[UploadedDocument] = db.query(UploadedDocument).filter(
+        UploadedDocument.id == job.uploaded_document_id
+    ).first()
+    if not row or row.status == "Replaced":
+        finish_job(db, job, status="SKIPPED", error="Document missing or replaced")
+        return
+    if row.file_type not in reference_keys_map:
+        finish_job(db, job, status="SKIPPED", error=f"No pipeline for file type {row.file_type}")
+        return
+    form = db.query(FormData).filter(FormData.form_id == row.form_id).first()
+    if not form:
+        finish_job(db, job, status="SKIPPED", error="Form not found")
+        return
+
+    row.status = "In Progress"
+    db.commit()
+
+    try:
+        reference_pdf_path_abs = os.path.join(REF_DIR, f"{row.file_type}.{row.file_extension}")
+        user_pdf_path_abs = os.path.join(FOLDER_DIR, document_path(row))
+        result = run_pipeline(
+            reference_keys_map[row.file_type],
+            reference_pdf_path_abs,
+            user_pdf_path_abs,
+            _user_json(row.file_type, form),
+        )
+        row.status = "Processed"
+        row.ocr_output = result["extracted_json"]
+        row.pdf_match = result["pdf_match"]
+        row.json_match = result["json_match"]
+        refresh_document_issues(db, row, application_id=job.application_id)
+        finish_job(db, job)
+    except Exception as e:
+        print("Pipeline error:", str(e))
+        db.rollback()
+        row.status = "Error"
+        fail_job(db, job, str(e))
+
+
+def run_next_job(db: Session) -> bool:
+    """Claim and process the highest-priority job. Returns False when the queue is empty."""
+    job = claim_next_job(db)
+    if not job:
+        return False
+    print(f"Processing job {job.id} (lane {job.lane}) for document {job.uploaded_document_id}")
+    # Continues the trace of the request that queued the job
+    with span("processing_job", trace_id=job.trace_id, **{
+        "job.id": job.id, "job.lane": job.lane, "job.attempts": job.attempts,
+        "document.id": job.uploaded_document_id,
+    }):
+        process_job(db, job)
+    return True
@@ -0,0 +1,417 @@
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.date_normalizer import normalize_date
+from app.models import Application, EntityMatch, FormData
+
+# Shared provider matching for the ingest scripts, realignment and exclusion screening.
+# Rows are resolved to a form_id by, in order:
+#   npi    exact normalized NPI
+#   name   exact normalized first+last name
+#   fuzzy  Jaro-Winkler on last/first name within the (Soundex(last), birth year) block
+METHOD_NPI = "npi"
+METHOD_NAME = "name"
+METHOD_FUZZY = "fuzzy"
+METHOD_UNMATCHED = "unmatched"
+
+# (last, first) Jaro-Winkler similarity a fuzzy match needs, with and without a matching DOB
+FUZZY_THRESHOLD = (0.96, 0.92)
+FUZZY_DOB_THRESHOLD = (0.92, 0.85)
+RESULT_BATCH = 5000
+
+_PREFIXES = {"DR", "MR", "MRS", "MS", "PROF"}
+_SUFFIXES = {"JR", "SR", "II", "III", "IV", "MD", "DO", "PHD", "DDS", "DPM", "NP", "PA", "RN"}
+_SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+
+# ---------- Keys ----------
+
+def normalize_npi(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    s = str(value).strip()
+    if not s:
+        return None
+    # Handle scientific notation like 1.23456789E9
+    try:
+        if "e" in s.lower():
+            num = float(s)
+            s = str(int(num))
+    except Exception:
+        pass
+    # Excel hands NPIs over as floats ("1234567893.0")
+    if s.endswith(".0"):
+        s = s[:-2]
+    # Remove non-digits and pad to 10 if needed
+    digits = "".join(ch for ch in s if ch.isdigit())
+    if not digits:
+        return None
+    if len(digits) == 9:
+        # Some sources miss a leading zero
+        digits = digits.zfill(10)
+    return digits
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """Upper-case ASCII letters only, with generational/degree suffixes dropped ("O'Brien Jr." -> "OBRIEN")."""
+    if not value:
+        return ""
+    text = unicodedata.normalize("NFKD", str(value)).encode("ascii", "ignore").decode("ascii").upper()
+    tokens = "".join(ch if ch.isalpha() else " " for ch in text).split()
+    return "".join(t for t in tokens if t not in _SUFFIXES)
+
+
+def split_full_name(value: Optional[str]) -> Tuple[str, str]:
+    """Normalized (first, last) from "First [Middle] Last" or "Last, First [Middle]"."""
+    if not value:
+        return "", ""
+    text = str(value)
+    if "," in text:
+        last, _, rest = text.partition(",")
+        first = rest.split()[0] if rest.split() else ""
+        return normalize_name(first), normalize_name(last)
+    parts = [p for p in text.split() if normalize_name(p)]
+    while len(parts) > 2 and normalize_name(parts[0]) in _PREFIXES:
+        parts = parts[1:]
+    if not parts:
+        return "", ""
+    if len(parts) == 1:
+        return "", normalize_name(parts[0])
+    return normalize_name(parts[0]), normalize_name(parts[-1])
+
+
+def soundex(name: str) -> str:
+    """American Soundex of an already-normalized name; '' for an empty name."""
+    if not name:
+        return ""
+    code = name[0]
+    last = _SOUNDEX_CODES.get(name[0], "")
+    for ch in name[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "HW":
+            last = digit
+    return code.ljust(4, "0")
+
+
+# ---------- Similarity ----------
+
+def jaro_winkler(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    a_flags = [False] * len(a)
+    b_flags = [False] * len(b)
+    matches = 0
+    for i, ch in enumerate(a):
+        for j in range(max(0, i - window), min(i + window + 1, len(b))):
+            if not b_flags[j] and b[j] == ch:
+                a_flags[i] = b_flags[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+    a_matched = [ch for ch, f in zip(a, a_flags) if f]
+    b_matched = [ch for ch, f in zip(b, b_flags) if f]
+    transpositions = sum(x != y for x, y in zip(a_matched, b_matched)) / 2
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def name_similarity(first_a: str, last_a: str, first_b: str, last_b: str) -> Tuple[float, float]:
+    """(last, first) Jaro-Winkler similarity of two normalized names."""
+    return jaro_winkler(last_a, last_b), jaro_winkler(first_a, first_b)
+
+
+def passes(sim: Tuple[float, float], threshold: Tuple[float, float]) -> bool:
+    return sim[0] >= threshold[0] and sim[1] >= threshold[1]
+
+
+def name_score(sim: Tuple[float, float]) -> float:
+    """Single score for reporting, weighting last name 0.6 and first name 0.4."""
+    return 0.6 * sim[0] + 0.4 * sim[1]
+
+
+# ---------- Provider index ----------
+
+class Provider:
+    __slots__ = ("form_id", "application_id", "first", "last", "npis", "dob")
+
+    def __init__(self, form_id: str, application_id: Optional[str], first: str, last: str, npis: set, dob: Optional[date]):
+        self.form_id = form_id
+        self.application_id = application_id
+        self.first = first
+        self.last = last
+        self.npis = npis
+        self.dob = dob
+
+
+class Match:
+    __slots__ = ("form_id", "application_id", "method", "score", "candidates")
+
+    def __init__(self, provider: Provider, method: str, score: float, candidates: int = 1):
+        self.form_id = provider.form_id
+        self.application_id = provider.application_id
+        self.method = method
+        self.score = round(score, 3)
+        self.candidates = candidates
+
+
+class ProviderIndex:
+    """In-memory blocking index over every provider (form_data joined with applications)."""
+
+    def __init__(self, providers: Iterable[Provider]):
+        self.providers: List[Provider] = []
+        self.by_npi: Dict[str, List[Provider]] = defaultdict(list)
+        self.by_name: Dict[Tuple[str, str], List[Provider]] = defaultdict(list)
+        self.by_block: Dict[Tuple[str, Optional[int]], List[Provider]] = defaultdict(list)
+        self.by_key: Dict[str, List[Provider]] = defaultdict(list)
+        for p in providers:
+            self.providers.append(p)
+            for npi in p.npis:
+                self.by_npi[npi].append(p)
+            if p.last:
+                self.by_name[(p.first, p.last)].append(p)
+                key = soundex(p.last)
+                self.by_block[(key, p.dob.year if p.dob else None)].append(p)
+                self.by_key[key].append(p)
+
+    @classmethod
+    def build(cls, db: Session) -> "ProviderIndex":
+        # Key columns only, streamed: full ORM rows would cost several KB per provider
+        apps: Dict[str, Any] = {}
+        app_rows = (
+            db.query(Application.id, Application.form_id, Application.name, Application.last_name, Application.npi)
+            .filter(Application.form_id.isnot(None))
+            .order_by(Application.create_dt)
+        )
+        for a in app_rows.yield_per(5000):
+            apps.setdefault(a.form_id, a)
+        providers = []
+        form_rows = (
+            db.query(FormData.form_id, FormData.provider_name, FormData.provider_last_name, FormData.npi, FormData.dob)
+            .filter(FormData.form_id.isnot(None))
+            .order_by(FormData.id)
+        )
+        for f in form_rows.yield_per(5000):
+            app = apps.pop(f.form_id, None)
+            providers.append(_provider(f.form_id, app, f.provider_name, f.provider_last_name, f.npi, f.dob))
+        # Applications whose form_data row is missing still resolve to their form_id
+        for form_id, app in apps.items():
+            providers.append(_provider(form_id, app, None, None, None, None))
+        return cls(providers)
+
+    def _pick(self, candidates: List[Provider], method: str, score: float) -> Match:
+        # Several forms for one provider: prefer one with an application, then the oldest
+        best = next((p for p in candidates if p.application_id), candidates[0])
+        return Match(best, method, score, len(candidates))
+
+    def resolve(
+        self,
+        npi: Optional[str] = None,
+        first: Optional[str] = None,
+        last: Optional[str] = None,
+        full_name: Optional[str] = None,
+        dob: Any = None,
+        fuzzy: bool = True,
+    ) -> Optional[Match]:
+        """Best provider for a source row, or None. Names may be raw; they are normalized here."""
+        npi = normalize_npi(npi)
+        if npi and npi in self.by_npi:
+            return self._pick(self.by_npi[npi], METHOD_NPI, 1.0)
+        first_n, last_n = normalize_name(first), normalize_name(last)
+        if full_name and not last_n:
+            first_n, last_n = split_full_name(full_name)
+        if not last_n:
+            return None
+        exact = self.by_name.get((first_n, last_n))
+        if exact:
+            return self._pick(exact, METHOD_NAME, 1.0)
+        if not fuzzy or not first_n:
+            return None
+        dob = normalize_date(dob)
+        pool = (
+            self.by_block.get((soundex(last_n), dob.year), []) + self.by_block.get((soundex(last_n), None), [])
+            if dob else self.by_key.get(soundex(last_n), [])
+        )
+        best: Optional[Tuple[float, Provider]] = None
+        for p in pool:
+            if not p.first or (dob and p.dob and dob != p.dob):
+                continue
+            sim = name_similarity(first_n, last_n, p.first, p.last)
+            threshold = FUZZY_DOB_THRESHOLD if dob and p.dob else FUZZY_THRESHOLD
+            if passes(sim, threshold) and (best is None or name_score(sim) > best[0]):
+                best = (name_score(sim), p)
+        return Match(best[1], METHOD_FUZZY, best[0]) if best else None
+
+    def matches(self, npi: Optional[str] = None, first: Optional[str] = None, last: Optional[str] = None, dob: Any = None) -> List[Match]:
+        """Every provider that is the same person: same NPI, same normalized name, or a fuzzy
+        name match confirmed by an identical DOB. Used to merge duplicate forms."""
+        found: Dict[str, Match] = {}
+        npi = normalize_npi(npi)
+        for p in self.by_npi.get(npi, []) if npi else []:
+            found[p.form_id] = Match(p, METHOD_NPI, 1.0)
+        first_n, last_n = normalize_name(first), normalize_name(last)
+        if not last_n:
+            return list(found.values())
+        for p in self.by_name.get((first_n, last_n), []):
+            found.setdefault(p.form_id, Match(p, METHOD_NAME, 1.0))
+        dob = normalize_date(dob)
+        if dob and first_n:
+            for p in self.by_block.get((soundex(last_n), dob.year), []):
+                if p.form_id in found or p.dob != dob or not p.first:
+                    continue
+                sim = name_similarity(first_n, last_n, p.first, p.last)
+                if passes(sim, FUZZY_DOB_THRESHOLD):
+                    found[p.form_id] = Match(p, METHOD_FUZZY, name_score(sim))
+        return list(found.values())
+
+
+def _provider(form_id, app, first, last, npi, dob) -> Provider:
+    first_n = normalize_name(first) or normalize_name(app.name if app else None)
+    last_n = normalize_name(last) or normalize_name(app.last_name if app else None)
+    # applications.name sometimes holds the full name
+    if first_n and last_n and first_n != last_n and first_n.endswith(last_n):
+        first_n = first_n[: -len(last_n)]
+    npis = {n for n in (normalize_npi(npi), normalize_npi(app.npi if app else None)) if n}
+    return Provider(form_id, app.id if app else None, first_n, last_n, npis, dob)
+
+
+_CACHE: Dict[str, Any] = {"fingerprint": None, "index": None}
+
+
+def _fingerprint(db: Session) -> tuple:
+    return (
+        tuple(db.query(func.count(FormData.id), func.max(FormData.id)).one())
+        + tuple(db.query(func.count(Application.id), func.max(Application.last_updt_dt), func.max(Application.create_dt)).one())
+    )
+
+
+def get_provider_index(db: Session, refresh: bool = False) -> ProviderIndex:
+    """Process-wide ProviderIndex, rebuilt only when form_data/applications have changed."""
+    fp = _fingerprint(db)
+    if refresh or _CACHE["index"] is None or _CACHE["fingerprint"] != fp:
+        _CACHE["index"] = ProviderIndex.build(db)
+        _CACHE["fingerprint"] = fp
+    return _CACHE["index"]
+
+
+# ---------- Resolver with persisted matches ----------
+
+class EntityResolver:
+    """Resolves one source's rows against the cached ProviderIndex, remembers each outcome
+    in entity_matches and prints a match-quality report.
+
+    Usage in an ingest script:
+        resolver = EntityResolver(db, "dea_excel")
+        form_id = resolver.form_id_for(npi=row_npi, full_name=row_name)
+        ...
+        resolver.finish()   # before db.commit()
+    """
+
+    def __init__(self, db: Session, source: str, fuzzy: bool = True):
+        self.db = db
+        self.source = source
+        self.fuzzy = fuzzy
+        self.index = get_provider_index(db)
+        # Outcomes are written every RESULT_BATCH keys; only counters stay in memory
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.seen: set = set()
+        self.methods: Counter = Counter()
+        self.ambiguous = 0
+        self.min_fuzzy_score: Optional[float] = None
+        self.unmatched_sample: List[str] = []
+
+    def resolve(self, source_key: Optional[str] = None, **keys) -> Optional[Match]:
+        match = self.index.resolve(fuzzy=self.fuzzy, **keys)
+        first, last = normalize_name(keys.get("first")), normalize_name(keys.get("last"))
+        if not last and keys.get("full_name"):
+            first, last = split_full_name(keys["full_name"])
+        key = source_key or normalize_npi(keys.get("npi")) or " ".join(p for p in (first, last) if p)
+        if key:
+            method = match.method if match else METHOD_UNMATCHED
+            if key not in self.seen:
+                self.seen.add(key)
+                self.methods[method] += 1
+                if match and match.candidates > 1:
+                    self.ambiguous += 1
+                if method == METHOD_FUZZY and (self.min_fuzzy_score is None or match.score < self.min_fuzzy_score):
+                    self.min_fuzzy_score = match.score
+                if method == METHOD_UNMATCHED and len(self.unmatched_sample) < 10:
+                    self.unmatched_sample.append(key)
+            self.pending[key] = {
+                "source": self.source,
+                "source_key": key,
+                "form_id": match.form_id if match else None,
+                "application_id": match.application_id if match else None,
+                "method": method,
+                "score": match.score if match else None,
+                "candidates": match.candidates if match else 0,
+                "matched_at": datetime.utcnow(),
+            }
+            if len(self.pending) >= RESULT_BATCH:
+                self._persist()
+        return match
+
+    def form_id_for(self, source_key: Optional[str] = None, **keys) -> Optional[str]:
+        match = self.resolve(source_key, **keys)
+        return match.form_id if match else None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "rows": len(self.seen),
+            **{m: self.methods.get(m, 0) for m in (METHOD_NPI, METHOD_NAME, METHOD_FUZZY, METHOD_UNMATCHED)},
+            "ambiguous": self.ambiguous,
+            "minFuzzyScore": self.min_fuzzy_score,
+            "unmatchedSample": self.unmatched_sample,
+        }
+
+    def _persist(self) -> None:
+        if not self.pending:
+            return
+        table = EntityMatch.__table__
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.source, table.c.source_key],
+            set_={c: stmt.excluded[c] for c in ("form_id", "application_id", "method", "score", "candidates", "matched_at")},
+        )
+        self.db.execute(stmt, list(self.pending.values()))
+        self.pending = {}
+
+    def finish(self) -> Dict[str, Any]:
+        """Persist the remaining outcomes (the caller commits) and print the report."""
+        self._persist()
+        report = self.report()
+        print(
+            f"[{self.source}] matched {report['rows'] - report[METHOD_UNMATCHED]}/{report['rows']}: "
+            f"npi={report[METHOD_NPI]} name={report[METHOD_NAME]} fuzzy={report[METHOD_FUZZY]} "
+            f"unmatched={report[METHOD_UNMATCHED]} ambiguous={report['ambiguous']}"
+            + (f" min_fuzzy_score={report['minFuzzyScore']}" if report["minFuzzyScore"] is not None else "")
+        )
+        if report["unmatchedSample"]:
+            print(f"[{self.source}] unmatched sample: {', '.join(report['unmatchedSample'])}")
+        return report
@@ -0,0 +1,285 @@
+import os
+import re
+import sys
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import openpyxl
+from sqlalchemy.orm import Session
+
+from app.models import CurrentDocument, UploadedDocument
+from app.services.ingestion_ledger import Ledger, content_hash
+from app.services.upload_service import set_current_documents
+
+# Shared core of scripts/ingest_*_from_excel.py:
+#   SheetReader     streams a worksheet (read-only mode, values only) as header -> value dicts
+#   ColumnMap       declarative output key -> header variants, resolved once per sheet
+#   DocumentWriter  batched create-or-update of each form's current document of one type
+# Memory stays flat in the sheet size: rows are never materialized as a list, and the
+# writer commits every ``commit_size`` rows. With a ledger (app/services/ingestion_ledger)
+# the writer skips rows whose content is unchanged since the last run.
+HEADER_SCAN_ROWS = 8
+COMMIT_SIZE = 1000
+
+
+@lru_cache(maxsize=4096)
+def norm_header(value: Any) -> str:
+    """'Demo_Verification_Attribute1 (PDF Format Match)' -> 'demo_verification_attribute1_pdf_format_match'."""
+    return re.sub(r"[^a-z0-9]+", "_", str(value or "").lower()).strip("_")
+
+
+def unique_headers(values: Sequence[Any], lower: bool = False) -> List[str]:
+    """Stripped header names; blank cells become ``__EMPTY_COL__<n>`` and repeats get a ``__<k>`` suffix."""
+    headers: List[str] = []
+    seen: Dict[str, int] = {}
+    for j, value in enumerate(values, start=1):
+        name = str(value).strip() if value is not None else ""
+        if lower:
+            name = name.lower()
+        if not name:
+            name = f"__EMPTY_COL__{j}"
+        count = seen.get(name, 0)
+        headers.append(name if count == 0 else f"{name}__{count + 1}")
+        seen[name] = count + 1
+    return headers
+
+
+def header_contains(*needles: str, exact: bool = False) -> Callable[[List[str]], bool]:
+    """Header-row test: some lower-cased cell contains (or, with ``exact``, equals) one of ``needles``."""
+    def test(cells: List[str]) -> bool:
+        return any((cell == n) if exact else (n in cell) for cell in cells for n in needles)
+    return test
+
+
+def cell_str(value: Any) -> str:
+    """Excel hands numeric IDs over as int/float; text cells may carry stray whitespace."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value if value is not None else "").strip()
+
+
+def commit_size_arg(argv: Optional[Sequence[str]] = None) -> int:
+    """``--commit-size N`` from the command line, else COMMIT_SIZE."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    if "--commit-size" in args:
+        return max(1, int(args[args.index("--commit-size") + 1]))
+    return COMMIT_SIZE
+
+
+def sheet_ledger(db: Session, path: str, sheet: str, argv: Optional[Sequence[str]] = None) -> Ledger:
+    """Ledger keyed by the workbook's file name and ``sheet``; ``--full`` rewrites every row."""
+    args = sys.argv[1:] if argv is None else argv
+    return Ledger(db, os.path.basename(path), sheet, force="--full" in args)
+
+
+class SheetReader:
+    """Iterates one worksheet as ``{header: value}`` dicts, skipping fully empty rows.
+
+    The header row is the first of the top HEADER_SCAN_ROWS rows accepted by ``is_header``
+    (called with the row's non-empty, lower-cased cells), else ``default_header_row``.
+    ``headers`` is filled in once iteration starts.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sheet: str,
+        is_header: Callable[[List[str]], bool],
+        default_header_row: int = 1,
+        lower: bool = False,
+    ):
+        self.path = path
+        self.sheet = sheet
+        self.is_header = is_header
+        self.default_header_row = default_header_row
+        self.lower = lower
+        self.headers: List[str] = []
+        self.rows = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        wb = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            if self.sheet not in wb.sheetnames:
+                raise RuntimeError(f"Sheet '{self.sheet}' not found in Excel file {self.path}")
+            rows = wb[self.sheet].iter_rows(values_only=True)
+            head = list(islice(rows, HEADER_SCAN_ROWS))
+            header_at = next(
+                (i for i, r in enumerate(head)
+                 if self.is_header([str(v).strip().lower() for v in r if v not in (None, "")])),
+                self.default_header_row - 1,
+            )
+            if header_at >= len(head):
+                return
+            self.headers = unique_headers(head[header_at], self.lower)
+            width = len(self.headers)
+            for values in chain(head[header_at + 1:], rows):
+                if all(v is None or v == "" for v in values):
+                    continue
+                if len(values) < width:
+                    values = tuple(values) + (None,) * (width - len(values))
+                self.rows += 1
+                yield dict(zip(self.headers, values))
+        finally:
+            # Read-only workbooks keep the file open until closed
+            wb.close()
+
+
+def column_key(value: Any) -> str:
+    """Case- and separator-insensitive header key: 'Board_ABMS_StartDate' -> 'boardabmsstartdate'."""
+    return re.sub(r"[^a-z0-9]", "", str(value or "").lower())
+
+
+class ColumnMap:
+    """Maps output keys to the header variants that may carry them, e.g.
+    ``{"abms_status": ["Board_ABMS_Status", "status"]}``.
+
+    Variants are compared by ``column_key`` and resolved once, against the first record
+    seen; per row, the first non-empty variant wins.
+    """
+
+    def __init__(self, columns: Dict[str, Sequence[str]]):
+        self.columns = {key: [column_key(v) for v in variants] for key, variants in columns.items()}
+        self._bound: Optional[List[tuple]] = None
+
+    def bind(self, headers: Sequence[str]) -> "ColumnMap":
+        by_norm: Dict[str, str] = {}
+        for h in headers:
+            by_norm.setdefault(column_key(h), h)
+        self._bound = [
+            (key, [by_norm[v] for v in variants if v in by_norm]) for key, variants in self.columns.items()
+        ]
+        return self
+
+    def extract(self, rec: Dict[str, Any]) -> Dict[str, Any]:
+        if self._bound is None:
+            self.bind(list(rec))
+        out: Dict[str, Any] = {}
+        for key, names in self._bound:
+            out[key] = next((rec[n] for n in names if rec.get(n) not in (None, "")), None)
+        return out
+
+
+class DocumentWriter:
+    """Creates or updates each form's current ``file_type`` document, ``commit_size`` rows at a time.
+
+    Per batch, the current documents of the batch's forms are fetched in one query; missing
+    ones are created and made current together. Documents go through the ORM so
+    document_fields stays in sync. ``ocr``/``verification`` of None leave that column as is.
+
+    With a ``ledger``, rows written with a ``row_key`` are skipped when their content hash
+    and target document match the last run. When several rows resolve to the same form,
+    the last one is written and every row's key is recorded against that document. Call ``finish()`` after the last row; it
+    flushes, marks vanished rows and commits.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        file_type: str,
+        filename: Callable[[str], str],
+        extension: str = "json",
+        match_types: Optional[Sequence[str]] = None,
+        rename: bool = False,
+        commit_size: int = COMMIT_SIZE,
+        ledger: Optional[Ledger] = None,
+    ):
+        self.db = db
+        self.file_type = file_type
+        self.filename = filename
+        self.extension = extension
+        self.match_types = list(match_types or [file_type])
+        self.rename = rename
+        self.commit_size = commit_size
+        self.ledger = ledger
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.written = 0
+        self.created = 0
+        self.updated = 0
+
+    def write(
+        self,
+        form_id: str,
+        ocr: Any = None,
+        verification: Any = None,
+        filename: Optional[str] = None,
+        row_key: Optional[str] = None,
+    ) -> None:
+        # A later row for the same form wins, as it would row by row. The ledger keys of
+        # the rows it replaced stay with it, so they are looked up and recorded against
+        # the document that was actually written.
+        previous = self.pending.get(form_id)
+        rows = [r for r in previous["rows"] if r[0] != row_key] if previous else []
+        if self.ledger is not None and row_key:
+            rows.append((row_key, content_hash([self.file_type, ocr, verification, filename])))
+        self.pending[form_id] = {"ocr": ocr, "verification": verification, "filename": filename, "rows": rows}
+        self.written += 1
+        if len(self.pending) >= self.commit_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self._apply()
+        self.db.commit()
+
+    def finish(self) -> None:
+        self.flush()
+        if self.ledger is not None:
+            self.ledger.finish()
+            self.db.commit()
+
+    def summary(self) -> str:
+        text = f"created={self.created} updated={self.updated}"
+        if self.ledger is not None:
+            text += f" {self.ledger.summary()}"
+        return text
+
+    def _apply(self) -> None:
+        current: Dict[str, UploadedDocument] = {}
+        rows = (
+            self.db.query(UploadedDocument)
+            .join(CurrentDocument, CurrentDocument.uploaded_document_id == UploadedDocument.id)
+            .filter(CurrentDocument.form_id.in_(list(self.pending)))
+            .filter(CurrentDocument.file_type.in_(self.match_types))
+            .order_by(UploadedDocument.id)
+        )
+        for doc in rows:
+            current[doc.form_id] = doc  # highest id wins when several match_types are current
+        stored = self.ledger.lookup(k for i in self.pending.values() for k, _ in i["rows"]) if self.ledger else {}
+        created = []
+        written = []
+        for form_id, item in self.pending.items():
+            doc = current.get(form_id)
+            if item["rows"] and doc is not None and self.ledger.unchanged_rows(stored, item["rows"], doc.id):
+                continue
+            filename = item["filename"] or self.filename(form_id)
+            if doc is None:
+                doc = UploadedDocument(
+                    form_id=form_id,
+                    filename=filename,
+                    file_extension=self.extension,
+                    file_type=self.file_type,
+                    status="In Progress",
+                )
+                self.db.add(doc)
+                created.append(doc)
+            elif self.rename:
+                doc.filename = filename
+                doc.file_extension = self.extension
+            if item["ocr"] is not None:
+                doc.ocr_output = item["ocr"]
+            if item["verification"] is not None:
+                doc.verification_data = item["verification"]
+            if not doc.status:
+                doc.status = "In Progress"
+            written.append((form_id, item, doc))
+        self.db.flush()
+        set_current_documents(self.db, created)
+        self.created += len(created)
+        self.updated += len(written) - len(created)
+        if self.ledger is not None:
+            self.ledger.record([
+                {"row_key": row_key, "content_hash": digest, "form_id": form_id, "uploaded_document_id": doc.id}
+                for form_id, item, doc in written for row_key, digest in item["rows"]
+            ])
+        self.pending = {}
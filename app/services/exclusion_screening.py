@@ -0,0 +1,292 @@
+import csv
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.date_normalizer import normalize_date
+from app.models import Application, CurrentDocument, ExclusionRecord, FormData, UploadedDocument
+from app.services.entity_resolution import name_score, name_similarity, normalize_name, normalize_npi, passes, soundex
+from app.services.upload_service import current_documents_query, set_current_documents
+
+SCREENING_SOURCE = "exclusion_screening"
+BATCH = 5000
+
+# Exclusion list CSV headers -> exclusion_records columns
+#   LEIE: https://oig.hhs.gov/exclusions/exclusions_list.asp (UPDATED.csv and monthly supplements)
+#   SAM:  SAM.gov public exclusions extract
+LIST_COLUMNS = {
+    "LEIE": {
+        "first_name": "FIRSTNAME",
+        "middle_name": "MIDNAME",
+        "last_name": "LASTNAME",
+        "business_name": "BUSNAME",
+        "npi": "NPI",
+        "dob": "DOB",
+        "state": "STATE",
+        "exclusion_type": "EXCLTYPE",
+        "exclusion_date": "EXCLDATE",
+        "reinstatement_date": "REINDATE",
+    },
+    "SAM": {
+        "first_name": "First",
+        "middle_name": "Middle",
+        "last_name": "Last",
+        "business_name": "Name",
+        "npi": "NPI",
+        "state": "State / Province",
+        "exclusion_type": "Exclusion Type",
+        "exclusion_date": "Active Date",
+        "reinstatement_date": "Termination Date",
+    },
+}
+_DATE_COLUMNS = ("dob", "exclusion_date", "reinstatement_date")
+
+# Jaro-Winkler (last, first) name similarity needed per match type (see entity_resolution)
+NAME_DOB_THRESHOLD = (0.92, 0.85)   # names agree and the full DOB matches -> confirmed
+NAME_ONLY_THRESHOLD = (0.96, 0.92)  # one side has no DOB -> possible match, needs review
+NPI_NAME_THRESHOLD = (0.80, 0.0)    # same NPI; below this the NPI is flagged as possibly misattributed
+
+# ---------- Loading ----------
+
+def read_exclusion_file(path: str, source: str) -> Iterator[Dict[str, Any]]:
+    """Stream exclusion_records rows from a LEIE or SAM CSV."""
+    columns = LIST_COLUMNS[source]
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [h for h in columns.values() if h not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path}: not a {source} file; missing columns: {', '.join(missing)}")
+        for rec in reader:
+            row = {col: (rec.get(h) or "").strip() or None for col, h in columns.items()}
+            for col in _DATE_COLUMNS:
+                row[col] = normalize_date(row.get(col))
+            row["npi"] = normalize_npi(row["npi"])
+            if row["npi"] and set(row["npi"]) == {"0"}:
+                row["npi"] = None  # LEIE uses 0000000000 for "no NPI"
+            row["birth_year"] = row["dob"].year if row["dob"] else None
+            row["name_key"] = soundex(normalize_name(row["last_name"])) or None
+            row["source"] = source
+            row["raw"] = rec
+            yield row
+
+
+def load_exclusion_list(db: Session, source: str, path: str) -> int:
+    """Replace every ``source`` row with the contents of ``path``. The caller owns the transaction,
+    so a failed load leaves the previous list in place."""
+    if source not in LIST_COLUMNS:
+        raise ValueError(f"Unknown exclusion list '{source}'")
+    table = ExclusionRecord.__table__
+    db.execute(table.delete().where(table.c.source == source))
+    now = datetime.utcnow()
+    count = 0
+    batch = []
+    for row in read_exclusion_file(path, source):
+        row["loaded_at"] = now
+        batch.append(row)
+        if len(batch) >= BATCH:
+            db.execute(table.insert(), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.execute(table.insert(), batch)
+        count += len(batch)
+    return count
+
+
+# ---------- Screening ----------
+
+class _ListIndex:
+    """Active exclusion records held in hash blocks: NPI, (soundex, birth year) and soundex alone."""
+
+    def __init__(self, db: Session, today: date):
+        self.by_npi: Dict[str, List[tuple]] = defaultdict(list)
+        self.by_block: Dict[Tuple[str, Optional[int]], List[tuple]] = defaultdict(list)
+        self.by_key: Dict[str, List[tuple]] = defaultdict(list)
+        self.size = 0
+        t = ExclusionRecord
+        rows = (
+            db.query(
+                t.id, t.source, t.first_name, t.last_name, t.npi, t.dob, t.birth_year, t.name_key,
+                t.exclusion_type, t.exclusion_date, t.state,
+            )
+            .filter(or_(t.reinstatement_date.is_(None), t.reinstatement_date > today))
+            .yield_per(BATCH)
+        )
+        for r in rows:
+            rec = (r.id, r.source, normalize_name(r.first_name), normalize_name(r.last_name), r.npi, r.dob,
+                   r.birth_year, r.exclusion_type, r.exclusion_date, r.state)
+            self.size += 1
+            if r.npi:
+                self.by_npi[r.npi].append(rec)
+            if r.name_key:
+                self.by_block[(r.name_key, r.birth_year)].append(rec)
+                self.by_key[r.name_key].append(rec)
+
+    def candidates(self, name_key: str, dob: Optional[date]) -> List[tuple]:
+        if not name_key:
+            return []
+        if dob is None:
+            return self.by_key.get(name_key, [])
+        return self.by_block.get((name_key, dob.year), []) + self.by_block.get((name_key, None), [])
+
+
+def _match(rec: tuple, kind: str, confidence: str, score: float) -> Dict[str, Any]:
+    _, source, first, last, npi, dob, _, excl_type, excl_date, state = rec
+    return {
+        "list": source,
+        "recordId": rec[0],
+        "matchType": kind,
+        "confidence": confidence,
+        "score": round(score, 3),
+        "name": " ".join(p for p in (first, last) if p),
+        "npi": npi,
+        "dob": dob.isoformat() if dob else None,
+        "exclusionType": excl_type,
+        "exclusionDate": excl_date.isoformat() if excl_date else None,
+        "state": state,
+    }
+
+
+def screen_provider(index: _ListIndex, first: str, last: str, npi: Optional[str], dob: Optional[date]) -> List[Dict[str, Any]]:
+    """Matches for one provider (names already normalized), strongest first."""
+    matches: Dict[int, Dict[str, Any]] = {}
+    for rec in index.by_npi.get(npi, []) if npi else []:
+        sim = name_similarity(first, last, rec[2], rec[3])
+        confidence = "confirmed" if passes(sim, NPI_NAME_THRESHOLD) else "possible"
+        matches[rec[0]] = _match(rec, "npi", confidence, name_score(sim))
+    for rec in index.candidates(soundex(last), dob):
+        if rec[0] in matches or not rec[2]:
+            continue
+        rec_dob = rec[5]
+        if dob and rec_dob and dob != rec_dob:
+            continue
+        sim = name_similarity(first, last, rec[2], rec[3])
+        if dob and rec_dob and passes(sim, NAME_DOB_THRESHOLD):
+            matches[rec[0]] = _match(rec, "name_dob", "confirmed", name_score(sim))
+        elif passes(sim, NAME_ONLY_THRESHOLD):
+            matches[rec[0]] = _match(rec, "name", "possible", name_score(sim))
+    return sorted(matches.values(), key=lambda m: (m["confidence"] != "confirmed", -m["score"]))
+
+
+def screening_sanction(data: Any) -> Optional[Dict[str, Any]]:
+    """The screening outcome stored in a sanctions document's verification_data, if any."""
+    if not isinstance(data, dict):
+        return None
+    if data.get("source") == SCREENING_SOURCE:
+        return data.get("sanction")
+    return data.get("screening")
+
+
+def upsert_sanction_document(db: Session, form_id: str, payload: Dict[str, Any]) -> UploadedDocument:
+    """Record a screening ``payload`` on the form's current sanctions document, creating it if needed.
+
+    A document written by screening is replaced. Any other sanctions document (e.g. from
+    the Excel "Sanctioned" sheet) keeps its source, status and details; the screening
+    outcome is added under its "screening" key.
+    """
+    row = (
+        current_documents_query(db, form_id)
+        .filter(CurrentDocument.file_type == "sanctions")
+        .first()
+    )
+    if not row:
+        row = UploadedDocument(
+            form_id=form_id,
+            filename=f"sanctions_{form_id}.json",
+            file_extension="json",
+            file_type="sanctions",
+            status="In Progress",
+        )
+        db.add(row)
+        db.flush()
+        set_current_documents(db, [row])
+    data = row.verification_data
+    if not data or (isinstance(data, dict) and data.get("source") == SCREENING_SOURCE):
+        row.verification_data = payload
+    elif isinstance(data, dict):
+        row.verification_data = dict(data, screening=payload["sanction"])
+    else:
+        row.verification_data = {"original": data, "screening": payload["sanction"]}
+    if not row.status:
+        row.status = "In Progress"
+    return row
+
+
+def _screening_payload(npi: Optional[str], first: Optional[str], last: Optional[str], status: str,
+                       matches: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "source": SCREENING_SOURCE,
+        "npi": npi,
+        "provider": {"first_name": first, "last_name": last},
+        "sanction": {
+            "status": status,
+            "details": "; ".join(
+                f"{m['list']} {m['exclusionType'] or ''} since {m['exclusionDate'] or 'unknown'} ({m['matchType']}, score {m['score']})"
+                for m in matches
+            ) or None,
+            "matches": matches,
+        },
+    }
+
+
+def screen_all_providers(db: Session) -> Dict[str, int]:
+    """Screen every provider against the active exclusion lists in one pass.
+
+    Confirmed hits (same NPI and name, or same name and DOB) write an "Excluded" sanctions
+    document and mark the application SANCTIONED; name-only hits write "Possible Match" for
+    review. A sanctions document from another source keeps its own status; the outcome is
+    added under its "screening" key. Earlier screening hits that no longer match are set to
+    "Cleared". Documents are
+    only rewritten when the outcome changes. The caller commits.
+    """
+    index = _ListIndex(db, date.today())
+    stats = {"listRecords": index.size, "providers": 0, "confirmed": 0, "possible": 0, "cleared": 0, "unchanged": 0}
+
+    previous = {
+        doc.form_id: doc
+        for doc in db.query(UploadedDocument)
+        .join(CurrentDocument, CurrentDocument.uploaded_document_id == UploadedDocument.id)
+        .filter(CurrentDocument.file_type == "sanctions")
+    }
+    apps = {a.form_id: a for a in db.query(Application).filter(Application.form_id.isnot(None))}
+
+    def changed(form_id: str, sanction: Dict[str, Any]) -> bool:
+        doc = previous.get(form_id)
+        return screening_sanction(doc.verification_data if doc else None) != sanction
+
+    hit_forms = set()
+    for form in db.query(FormData).yield_per(BATCH):
+        app = apps.get(form.form_id)
+        first_raw = form.provider_name or (app.name if app else None)
+        last_raw = form.provider_last_name or (app.last_name if app else None)
+        npi = normalize_npi(form.npi or (app.npi if app else None))
+        stats["providers"] += 1
+        matches = screen_provider(index, normalize_name(first_raw), normalize_name(last_raw), npi, form.dob)
+        if not matches:
+            continue
+        hit_forms.add(form.form_id)
+        confirmed = matches[0]["confidence"] == "confirmed"
+        stats["confirmed" if confirmed else "possible"] += 1
+        payload = _screening_payload(npi, first_raw, last_raw, "Excluded" if confirmed else "Possible Match", matches)
+        if not changed(form.form_id, payload["sanction"]):
+            stats["unchanged"] += 1
+            continue
+        upsert_sanction_document(db, form.form_id, payload)
+        if confirmed and app:
+            app.psv_status = "SANCTIONED"
+            app.committee_status = "SANCTIONED"
+
+    for form_id, doc in previous.items():
+        data = doc.verification_data
+        sanction = screening_sanction(data)
+        if form_id in hit_forms or not sanction or sanction.get("status") == "Cleared":
+            continue
+        # Application status is left for a reviewer; a cleared hit may still need follow-up
+        cleared = {"status": "Cleared", "details": None, "matches": []}
+        key = "sanction" if data.get("source") == SCREENING_SOURCE else "screening"
+        doc.verification_data = dict(data, **{key: cleared})
+        stats["cleared"] += 1
+    return stats
@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.document_fields import PROMOTED_FIELDS
+from app.models import CredentialExpiration, CurrentDocument, JobState, UploadedDocument, document_field_rows
+
+JOB_NAME = "credential_expiration_scan"
+BATCH = 500
+
+# Promoted date fields (app/document_fields.py) that carry an expiration, by credential
+EXPIRATION_FIELDS = {
+    "license_expiration_date": "license",
+    "abms_end_date": "board_certification",
+    "abms_reverification_date": "board_reverification",
+    "dea_expiration_date": "dea",
+    "malpractice_expiration_date": "malpractice",
+}
+CREDENTIALS = tuple(sorted(set(EXPIRATION_FIELDS.values())))
+_FILE_TYPES = sorted({ft for f in EXPIRATION_FIELDS for ft in PROMOTED_FIELDS[f]["file_types"]})
+
+
+def expiration_rows(doc: UploadedDocument) -> List[Dict[str, Any]]:
+    """Candidate credential_expirations rows for ``doc``; ``expires_on`` is None when the raw value did not parse."""
+    return [
+        {
+            "uploaded_document_id": doc.id,
+            "form_id": doc.form_id,
+            "file_type": doc.file_type,
+            "credential": EXPIRATION_FIELDS[r["field"]],
+            "field": r["field"],
+            "raw_value": r["value_text"],
+            "expires_on": r["value_date"],
+        }
+        for r in document_field_rows(doc)
+        if r["field"] in EXPIRATION_FIELDS
+    ]
+
+
+def _write_batch(db: Session, docs: List[UploadedDocument], stats: Dict[str, int]) -> None:
+    table = CredentialExpiration.__table__
+    db.execute(table.delete().where(table.c.uploaded_document_id.in_([d.id for d in docs])))
+    now = datetime.utcnow()
+    rows = []
+    for doc in docs:
+        for r in expiration_rows(doc):
+            if r["expires_on"] is None:
+                stats["unparsed"] += 1
+                continue
+            rows.append(dict(r, scanned_at=now))
+    if rows:
+        db.execute(table.insert(), rows)
+    stats["documents"] += len(docs)
+    stats["expirations"] += len(rows)
+
+
+def scan_expirations(db: Session, full: bool = False) -> Dict[str, Any]:
+    """Refresh credential_expirations for current documents changed since the last run
+    (all of them when ``full``), then drop rows whose document is no longer current."""
+    state = db.get(JobState, JOB_NAME)
+    if state is None:
+        state = JobState(name=JOB_NAME)
+        db.add(state)
+    started = datetime.utcnow()
+    state.last_started_at = started
+    since = None if full else state.watermark
+
+    query = (
+        db.query(UploadedDocument)
+        .join(CurrentDocument, CurrentDocument.uploaded_document_id == UploadedDocument.id)
+        .filter(func.lower(UploadedDocument.file_type).in_(_FILE_TYPES))
+        .order_by(UploadedDocument.id)
+    )
+    if since is not None:
+        # >= rather than >: a write that landed in the same instant as the last run is rescanned
+        query = query.filter(UploadedDocument.updated_at >= since)
+
+    stats = {"documents": 0, "expirations": 0, "unparsed": 0, "pruned": 0}
+    batch: List[UploadedDocument] = []
+    for doc in query.yield_per(BATCH):
+        batch.append(doc)
+        if len(batch) >= BATCH:
+            _write_batch(db, batch, stats)
+            batch = []
+    if batch:
+        _write_batch(db, batch, stats)
+
+    table = CredentialExpiration.__table__
+    stats["pruned"] = db.execute(
+        table.delete().where(table.c.uploaded_document_id.notin_(select(CurrentDocument.uploaded_document_id)))
+    ).rowcount
+
+    state.watermark = started
+    state.last_finished_at = datetime.utcnow()
+    state.last_stats = dict(stats, full=since is None, since=since.isoformat() if since else None)
+    db.commit()
+    return state.last_stats
+
+
+def last_scan(db: Session) -> Dict[str, Any]:
+    state = db.get(JobState, JOB_NAME)
+    if not state:
+        return {"lastRunAt": None, "stats": None}
+    return {
+        "lastRunAt": state.last_finished_at.isoformat() if state.last_finished_at else None,
+        "stats": state.last_stats,
+    }
@@ -0,0 +1,111 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models import IngestionLedgerEntry
+
+# Row-level change detection for the ingest scripts. Each source row (file, sheet, row key)
+# remembers the hash of the payload last written for it and the document it went to. A
+# re-run skips rows whose hash and target document are unchanged, writes the rest, and
+# reports rows that are no longer in the file.
+LOOKUP_CHUNK = 500
+
+
+def content_hash(payload: Any) -> str:
+    """sha256 of ``payload`` in canonical JSON (sorted keys; dates and other objects as strings)."""
+    data = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+    return hashlib.sha256(data).hexdigest()
+
+
+class Ledger:
+    """Ingestion ledger of one source file/sheet for one run.
+
+    ``lookup`` returns the stored (hash, document id) of rows still present in the source,
+    ``unchanged`` decides whether a row can be skipped, ``record`` upserts rows just written
+    and ``finish`` stamps ``vanished_at`` on rows this run did not see. With ``force``
+    (a --full run) every row counts as changed. The caller commits.
+    """
+
+    def __init__(self, db: Session, source: str, sheet: str = "", force: bool = False):
+        self.db = db
+        self.source = source
+        self.sheet = sheet
+        self.force = force
+        self.seen: set = set()
+        self.stats = {"unchanged": 0, "written": 0, "vanished": 0}
+        self.vanished_sample: List[str] = []
+
+    def lookup(self, row_keys: Iterable[str]) -> Dict[str, Tuple[str, Optional[int]]]:
+        keys = [k for k in row_keys if k]
+        self.seen.update(keys)
+        if self.force:
+            return {}
+        t = IngestionLedgerEntry
+        stored: Dict[str, Tuple[str, Optional[int]]] = {}
+        for i in range(0, len(keys), LOOKUP_CHUNK):
+            rows = (
+                self.db.query(t.row_key, t.content_hash, t.uploaded_document_id)
+                .filter(t.source == self.source, t.sheet == self.sheet, t.vanished_at.is_(None))
+                .filter(t.row_key.in_(keys[i:i + LOOKUP_CHUNK]))
+            )
+            for r in rows:
+                stored[r.row_key] = (r.content_hash, r.uploaded_document_id)
+        return stored
+
+    def unchanged(self, stored: Dict[str, Tuple[str, Optional[int]]], row_key: str, digest: str,
+                  document_id: Optional[int]) -> bool:
+        """True when ``row_key`` was last written with ``digest`` to ``document_id``, which is
+        still the form's current document."""
+        return self.unchanged_rows(stored, [(row_key, digest)], document_id)
+
+    def unchanged_rows(self, stored: Dict[str, Tuple[str, Optional[int]]], rows: List[Tuple[str, str]],
+                       document_id: Optional[int]) -> bool:
+        """``unchanged`` for several (row_key, digest) rows written to one document: True only if all are."""
+        if document_id is None or not rows:
+            return False
+        if all(stored.get(row_key) == (digest, document_id) for row_key, digest in rows):
+            self.stats["unchanged"] += len(rows)
+            return True
+        return False
+
+    def record(self, entries: List[Dict[str, Any]]) -> None:
+        """Upsert ``entries`` (row_key, content_hash, form_id, uploaded_document_id) as just written."""
+        if not entries:
+            return
+        now = datetime.utcnow()
+        rows = [dict(e, source=self.source, sheet=self.sheet, ingested_at=now, vanished_at=None) for e in entries]
+        table = IngestionLedgerEntry.__table__
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.source, table.c.sheet, table.c.row_key],
+            set_={c: stmt.excluded[c] for c in ("content_hash", "form_id", "uploaded_document_id", "ingested_at", "vanished_at")},
+        )
+        self.db.execute(stmt, rows)
+        self.stats["written"] += len(rows)
+
+    def finish(self) -> Dict[str, int]:
+        """Mark rows missing from this run as vanished; returns the run's counts."""
+        t = IngestionLedgerEntry
+        live = (
+            self.db.query(t.id, t.row_key)
+            .filter(t.source == self.source, t.sheet == self.sheet, t.vanished_at.is_(None))
+        )
+        gone = [(r.id, r.row_key) for r in live if r.row_key not in self.seen]
+        if gone:
+            now = datetime.utcnow()
+            for i in range(0, len(gone), LOOKUP_CHUNK):
+                ids = [g[0] for g in gone[i:i + LOOKUP_CHUNK]]
+                self.db.query(t).filter(t.id.in_(ids)).update({t.vanished_at: now}, synchronize_session=False)
+        self.stats["vanished"] = len(gone)
+        self.vanished_sample = [g[1] for g in gone[:10]]
+        return dict(self.stats)
+
+    def summary(self) -> str:
+        text = f"unchanged={self.stats['unchanged']} vanished={self.stats['vanished']}"
+        if self.vanished_sample:
+            text += f" (e.g. {', '.join(self.vanished_sample)})"
+        return text
@@ -0,0 +1,94 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+
+from app.models import Application, ApplicationIssue, UploadedDocument
+
+SEVERITY_ORDER = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+
+
+def severity_for(confidence: float) -> str:
+    """A mismatch the OCR is confident about is more likely a real discrepancy than a misread."""
+    if confidence >= 0.8:
+        return "HIGH"
+    if confidence >= 0.5:
+        return "MEDIUM"
+    return "LOW"
+
+
+def build_document_issues(doc: UploadedDocument, application_id: Optional[str]) -> List[ApplicationIssue]:
+    """One issue per mismatched field in the document's json_match."""
+    json_match_data = doc.json_match
+    if not isinstance(json_match_data, dict):
+        return []
+
+    issues = []
+    for field, data in json_match_data.items():
+        if not isinstance(data, dict) or data.get("match"):
+            continue
+        try:
+            confidence = float(data.get("extracted_confident_score", 0) or 0)
+        except (TypeError, ValueError):
+            confidence = 0.0
+        extracted = data.get("extracted")
+        issues.append(ApplicationIssue(
+            application_id=application_id,
+            form_id=doc.form_id,
+            uploaded_document_id=doc.id,
+            file_type=doc.file_type,
+            field=field.upper(),
+            issue=f"{field.upper()} field mismatch.",
+            severity=severity_for(confidence),
+            confidence=confidence,
+            value=None if extracted is None else str(extracted),
+            reasoning=f"Extracted value '{extracted}' does not match provided value '{data.get('provided')}'.",
+        ))
+    return issues
+
+
+def clear_issues(db: Session, form_id: str, file_types: Iterable[str]) -> None:
+    """Drop issues for document types that are being replaced. The caller owns the transaction."""
+    db.query(ApplicationIssue).filter(
+        ApplicationIssue.form_id == form_id,
+        ApplicationIssue.file_type.in_(list(file_types)),
+    ).delete(synchronize_session=False)
+
+
+def refresh_document_issues(db: Session, doc: UploadedDocument, application_id: Optional[str] = None) -> int:
+    """Replace the stored issues for ``doc``'s form and type with ones rebuilt from its json_match.
+
+    Returns the number of issues written. The caller owns the transaction.
+    """
+    if application_id is None:
+        application_id = db.query(Application.id).filter(Application.form_id == doc.form_id).scalar()
+    clear_issues(db, doc.form_id, [doc.file_type])
+    issues = build_document_issues(doc, application_id)
+    db.add_all(issues)
+    return len(issues)
+
+
+def get_application_issues(db: Session, application_id: str) -> List[Dict[str, Any]]:
+    rows = (
+        db.query(ApplicationIssue)
+        .filter(ApplicationIssue.application_id == application_id)
+        .order_by(
+            case(SEVERITY_ORDER, value=ApplicationIssue.severity, else_=len(SEVERITY_ORDER)),
+            ApplicationIssue.id,
+        )
+        .all()
+    )
+    return [issue_to_response(r) for r in rows]
+
+
+def issue_to_response(issue: ApplicationIssue) -> Dict[str, Any]:
+    return {
+        "field": issue.field,
+        "issue": issue.issue,
+        "severity": issue.severity,
+        "confidence": issue.confidence,
+        "value": issue.value,
+        "reasoning": issue.reasoning,
+        "documentId": issue.uploaded_document_id,
+        "fileType": issue.file_type,
+    }
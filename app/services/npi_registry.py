@@ -0,0 +1,170 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.date_normalizer import normalize_date
+from app.models import FormData, NpiRegistryEntry
+from app.services.entity_resolution import normalize_npi
+
+# NPPES dissemination file headers projected into npi_registry (full and weekly files share them)
+NPPES_COLUMNS = {
+    "npi": "NPI",
+    "entity_type": "Entity Type Code",
+    "first_name": "Provider First Name",
+    "middle_name": "Provider Middle Name",
+    "last_name": "Provider Last Name (Legal Name)",
+    "credential": "Provider Credential Text",
+    "organization_name": "Provider Organization Name (Legal Business Name)",
+    "practice_state": "Provider Business Practice Location Address State Name",
+    "practice_postal_code": "Provider Business Practice Location Address Postal Code",
+    "enumeration_date": "Provider Enumeration Date",
+    "last_update_date": "Last Update Date",
+    "deactivation_date": "NPI Deactivation Date",
+    "reactivation_date": "NPI Reactivation Date",
+}
+_DATE_COLUMNS = ("enumeration_date", "last_update_date", "deactivation_date", "reactivation_date")
+TAXONOMY_SLOTS = 15
+
+
+def npi_checksum_ok(npi: str) -> bool:
+    """Luhn check over the '80840' health-industry prefix plus the 10 NPI digits."""
+    if not npi or len(npi) != 10 or not npi.isdigit():
+        return False
+    total = 0
+    for i, ch in enumerate(reversed("80840" + npi)):
+        d = int(ch)
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def nppes_projector(header: Sequence[str]) -> Callable[[Sequence[str]], Optional[Dict[str, Any]]]:
+    """Build a function mapping one NPPES CSV row to an npi_registry row dict.
+
+    Only the registered columns are read; the primary taxonomy (and its license) is the
+    slot flagged 'Y' in the primary switch, falling back to slot 1.
+    """
+    index = {name.strip(): i for i, name in enumerate(header)}
+    missing = [h for h in NPPES_COLUMNS.values() if h not in index]
+    if missing:
+        raise ValueError(f"Not an NPPES dissemination file; missing columns: {', '.join(missing)}")
+    fields = [(col, index[h]) for col, h in NPPES_COLUMNS.items()]
+    slots = [
+        (
+            index.get(f"Healthcare Provider Taxonomy Code_{n}"),
+            index.get(f"Healthcare Provider Primary Taxonomy Switch_{n}"),
+            index.get(f"Provider License Number_{n}"),
+            index.get(f"Provider License Number State Code_{n}"),
+        )
+        for n in range(1, TAXONOMY_SLOTS + 1)
+    ]
+    slots = [s for s in slots if s[0] is not None]
+
+    def cell(row: Sequence[str], i: Optional[int]) -> Optional[str]:
+        if i is None or i >= len(row):
+            return None
+        v = row[i].strip()
+        return v or None
+
+    def project(row: Sequence[str]) -> Optional[Dict[str, Any]]:
+        rec = {col: cell(row, i) for col, i in fields}
+        if not rec["npi"]:
+            return None
+        rec["entity_type"] = int(rec["entity_type"]) if rec["entity_type"] and rec["entity_type"].isdigit() else None
+        for col in _DATE_COLUMNS:
+            rec[col] = normalize_date(rec[col])
+        chosen = next((s for s in slots if cell(row, s[1]) == "Y"), slots[0] if slots else None)
+        rec["primary_taxonomy"] = cell(row, chosen[0]) if chosen else None
+        rec["license_number"] = cell(row, chosen[2]) if chosen else None
+        rec["license_state"] = cell(row, chosen[3]) if chosen else None
+        return rec
+
+    return project
+
+
+def lookup_npi(db: Session, npi: Optional[str]) -> Optional[NpiRegistryEntry]:
+    npi = normalize_npi(npi)
+    if not npi:
+        return None
+    return db.get(NpiRegistryEntry, npi)
+
+
+def registry_loaded(db: Session) -> bool:
+    return db.query(NpiRegistryEntry.npi).limit(1).first() is not None
+
+
+def is_active(entry: NpiRegistryEntry) -> bool:
+    if not entry.deactivation_date:
+        return True
+    return bool(entry.reactivation_date and entry.reactivation_date >= entry.deactivation_date)
+
+
+def entry_to_response(entry: NpiRegistryEntry) -> Dict[str, Any]:
+    return {
+        "npi": entry.npi,
+        "entityType": entry.entity_type,
+        "firstName": entry.first_name,
+        "middleName": entry.middle_name,
+        "lastName": entry.last_name,
+        "credential": entry.credential,
+        "organizationName": entry.organization_name,
+        "primaryTaxonomy": entry.primary_taxonomy,
+        "licenseNumber": entry.license_number,
+        "licenseState": entry.license_state,
+        "practiceState": entry.practice_state,
+        "practicePostalCode": entry.practice_postal_code,
+        "enumerationDate": entry.enumeration_date.isoformat() if entry.enumeration_date else None,
+        "lastUpdateDate": entry.last_update_date.isoformat() if entry.last_update_date else None,
+        "deactivationDate": entry.deactivation_date.isoformat() if entry.deactivation_date else None,
+        "reactivationDate": entry.reactivation_date.isoformat() if entry.reactivation_date else None,
+        "active": is_active(entry),
+    }
+
+
+def _issue(issue: str, severity: str, confidence: float, value: Optional[str], reasoning: str) -> Dict[str, Any]:
+    return {
+        "field": "NPI",
+        "issue": issue,
+        "severity": severity,
+        "confidence": confidence,
+        "value": value,
+        "reasoning": reasoning,
+    }
+
+
+def npi_issues(db: Session, form_data: FormData) -> List[Dict[str, Any]]:
+    """Registry checks for the provider's NPI: format, existence, deactivation and name."""
+    raw = form_data.npi
+    if not raw or not str(raw).strip():
+        return []
+    npi = normalize_npi(raw)
+    if not npi_checksum_ok(npi or ""):
+        return [_issue(
+            "NPI number is not valid.", "HIGH", 1.0, raw,
+            "The NPI provided is not a 10-digit number with a valid check digit. This is most likely a typo.",
+        )]
+    if not registry_loaded(db):
+        # No local mirror yet; nothing to verify against
+        return []
+    entry = db.get(NpiRegistryEntry, npi)
+    if not entry:
+        return [_issue(
+            "NPI number not found in national registry.", "HIGH", 0.9, npi,
+            "The NPI provided is not in the local NPPES NPI Registry mirror. This could be a typo or a newly issued NPI.",
+        )]
+    if not is_active(entry):
+        return [_issue(
+            "NPI number is deactivated.", "HIGH", 0.95, npi,
+            f"The NPPES NPI Registry lists this NPI as deactivated on {entry.deactivation_date.isoformat()}.",
+        )]
+    provided = (form_data.provider_last_name or "").strip().upper()
+    if entry.entity_type == 1 and provided and entry.last_name and provided != entry.last_name.strip().upper():
+        return [_issue(
+            "NPI registered to a different provider.", "MEDIUM", 0.7, npi,
+            f"The NPPES NPI Registry lists this NPI under last name '{entry.last_name}', "
+            f"but the application gives '{form_data.provider_last_name}'.",
+        )]
+    return []
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.models import Application, ProcessingJob, UploadedDocument
+from app.tracing import current_trace_id
+
+# Priority lanes, served in ascending order
+LANE_EXPEDITED = 0  # sanctioned applications and applications IN_REVIEW with the committee
+LANE_NEW = 1        # new submissions from the upload endpoints
+LANE_BACKFILL = 2   # documents inserted by scripts
+
+LANE_NAMES = {
+    LANE_EXPEDITED: "expedited",
+    LANE_NEW: "new",
+    LANE_BACKFILL: "backfill",
+}
+
+MAX_ATTEMPTS = 3
+# A RUNNING job whose worker has not finished it within this long is assumed dead
+LEASE_SECONDS = 30 * 60
+
+
+def lane_for(psv_status: Optional[str], committee_status: Optional[str], source: str = "upload") -> int:
+    if psv_status == "SANCTIONED" or committee_status in ("SANCTIONED", "IN_REVIEW"):
+        return LANE_EXPEDITED
+    if source == "backfill":
+        return LANE_BACKFILL
+    return LANE_NEW
+
+
+def enqueue_documents(db: Session, docs: List[UploadedDocument], source: str = "upload") -> List[ProcessingJob]:
+    """Queue processing for freshly registered documents. The caller owns the transaction,
+    so jobs become visible in the same commit as the upload itself."""
+    if not docs:
+        return []
+    form_ids = {d.form_id for d in docs}
+    apps = {
+        a.form_id: a
+        for a in db.query(Application).filter(Application.form_id.in_(form_ids))
+    }
+    trace_id = current_trace_id()
+    jobs = []
+    for d in docs:
+        app = apps.get(d.form_id)
+        jobs.append(ProcessingJob(
+            uploaded_document_id=d.id,
+            form_id=d.form_id,
+            application_id=app.id if app else None,
+            lane=lane_for(app.psv_status if app else None, app.committee_status if app else None, source),
+            source=source,
+            status="QUEUED",
+            attempts=0,
+            trace_id=trace_id,
+        ))
+    db.add_all(jobs)
+    db.flush()
+    return jobs
+
+
+def reap_expired_jobs(db: Session, lease_seconds: int = LEASE_SECONDS) -> Dict[str, int]:
+    """Return RUNNING jobs whose lease ran out (worker killed mid-job) to the queue.
+
+    The expired run counts as an attempt: jobs at MAX_ATTEMPTS are marked FAILED and
+    their document leaves "In Progress" for "Error"."""
+    now = datetime.utcnow()
+    expired = (
+        ProcessingJob.status == "RUNNING",
+        ProcessingJob.started_at < now - timedelta(seconds=lease_seconds),
+    )
+    error = f"Lease expired after {lease_seconds}s (worker stopped)"
+    exhausted = [
+        doc_id for (doc_id,) in db.query(ProcessingJob.uploaded_document_id)
+        .filter(*expired, ProcessingJob.attempts >= MAX_ATTEMPTS)
+    ]
+    failed = db.execute(
+        update(ProcessingJob)
+        .where(*expired, ProcessingJob.attempts >= MAX_ATTEMPTS)
+        .values(status="FAILED", error=error, finished_at=now)
+    ).rowcount
+    if exhausted:
+        db.execute(
+            update(UploadedDocument)
+            .where(UploadedDocument.id.in_(exhausted), UploadedDocument.status == "In Progress")
+            .values(status="Error")
+        )
+    requeued = db.execute(
+        update(ProcessingJob).where(*expired).values(status="QUEUED", error=error)
+    ).rowcount
+    db.commit()
+    return {"requeued": requeued, "failed": failed}
+
+
+def claim_next_job(db: Session) -> Optional[ProcessingJob]:
+    """Atomically move the highest-priority QUEUED job to RUNNING and return it.
+    Expired RUNNING jobs are reaped first, so a job survives its worker dying."""
+    reaped = reap_expired_jobs(db)
+    if reaped["requeued"] or reaped["failed"]:
+        print(f"Reaped expired jobs: {reaped}")
+    while True:
+        job = (
+            db.query(ProcessingJob)
+            .filter(ProcessingJob.status == "QUEUED")
+            .order_by(ProcessingJob.lane, ProcessingJob.id)
+            .first()
+        )
+        if not job:
+            return None
+        claimed = db.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id == job.id, ProcessingJob.status == "QUEUED")
+            .values(status="RUNNING", started_at=datetime.utcnow(), attempts=ProcessingJob.attempts + 1)
+        ).rowcount
+        db.commit()
+        if claimed:
+            db.refresh(job)
+            return job
+        # another worker took it first; try the next one
+
+
+def finish_job(db: Session, job: ProcessingJob, status: str = "DONE", error: Optional[str] = None) -> None:
+    job.status = status
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+
+def fail_job(db: Session, job: ProcessingJob, error: str) -> None:
+    """Requeue a failed job in its lane until MAX_ATTEMPTS is reached."""
+    if (job.attempts or 0) < MAX_ATTEMPTS:
+        job.status = "QUEUED"
+        job.error = error
+        db.commit()
+    else:
+        finish_job(db, job, status="FAILED", error=error)
+
+
+def lane_stats(db: Session) -> List[Dict[str, Any]]:
+    """Per-lane depth (QUEUED), RUNNING count and age of the oldest queued item."""
+    now = datetime.utcnow()
+    queued = {
+        lane: (depth, oldest)
+        for lane, depth, oldest in db.query(
+            ProcessingJob.lane, func.count(ProcessingJob.id), func.min(ProcessingJob.enqueued_at)
+        )
+        .filter(ProcessingJob.status == "QUEUED")
+        .group_by(ProcessingJob.lane)
+    }
+    running = dict(
+        db.query(ProcessingJob.lane, func.count(ProcessingJob.id))
+        .filter(ProcessingJob.status == "RUNNING")
+        .group_by(ProcessingJob.lane)
+        .all()
+    )
+    stats = []
+    for lane, name in LANE_NAMES.items():
+        depth, oldest = queued.get(lane, (0, None))
+        stats.append({
+            "lane": name,
+            "priority": lane,
+            "depth": depth,
+            "running": running.get(lane, 0),
+            "oldestEnqueuedAt": oldest.isoformat() if oldest else None,
+            "oldestAgeSeconds": round((now - oldest).total_seconds(), 1) if oldest else None,
+        })
+    return stats
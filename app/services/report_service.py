@@ -5,12 +5,20 @@ import json
 
 from sqlalchemy.orm import Session
 
+from app.metrics import llm_call
 from app.models import Application, FormData, UploadedDocument, EmailRecord
+from app.tracing import span, traced
+from app.services.upload_service import current_documents_query
+
+
+def _openai_class():
+    """openai is imported on first use; it is the heaviest import in the API and only reports need it."""
+    try:
+        from openai import OpenAI  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency at runtime
+        return None
+    return OpenAI
 
-try:
-    from openai import OpenAI  # type: ignore
-except Exception:  # pragma: no cover - optional dependency at runtime
-    OpenAI = None  # type: ignore
 
 # Best-effort load environment from .env if available
 try:  # pragma: no cover
@@ -35,7 +43,8 @@ class ReportService:
         self.report_llm_model = os.getenv("REPORT_LLM_MODEL", "gpt-4o-mini")
         self._client = None
         try:
-            if self.enable_llm and OpenAI is not None and os.getenv("OPENAI_API_KEY"):
+            OpenAI = _openai_class() if self.enable_llm and os.getenv("OPENAI_API_KEY") else None
+            if OpenAI is not None:
                 self._client = OpenAI()
                 if self.debug:
                     print("[ReportService] LLM client initialized.")
@@ -49,25 +58,23 @@ class ReportService:
             if self.debug:
                 print(f"[ReportService] LLM init error: {e}")
 
+    @traced("report.generate")
     def generate_credentialing_report(self, app_id: str) -> Dict[str, Any]:
         """Generate a comprehensive credentialing report structure for a given application id"""
-        application = self.db.query(Application).filter_by(id=app_id).first()
-        if not application:
-            raise ValueError("Application not found")
-
-        form = self.db.query(FormData).filter_by(form_id=application.form_id).first()
-        if not form:
-            raise ValueError("Form data not found")
-
-        uploads = (
-            self.db.query(UploadedDocument)
-            .filter(UploadedDocument.form_id == application.form_id)
-            .all()
-        )
+        with span("report.load", **{"application.id": app_id}):
+            application = self.db.query(Application).filter_by(id=app_id).first()
+            if not application:
+                raise ValueError("Application not found")
 
-        emails = (
-            self.db.query(EmailRecord).filter(EmailRecord.application_id == application.id).all()
-        )
+            form = self.db.query(FormData).filter_by(form_id=application.form_id).first()
+            if not form:
+                raise ValueError("Form data not found")
+
+            uploads = current_documents_query(self.db, application.form_id).all()
+
+            emails = (
+                self.db.query(EmailRecord).filter(EmailRecord.application_id == application.id).all()
+            )
 
         # Build process steps and decisions from current DB state
         steps: List[Dict[str, Any]] = self._build_steps(application, form, uploads, emails)
@@ -166,11 +173,13 @@ class ReportService:
 
         return {"markdown": markdown, "data": comprehensive_data}
 
+    @traced("report.short_summary")
     def generate_short_summary(self, app_id: str) -> Dict[str, Any]:
         full = self.generate_credentialing_report(app_id)
         md = self._render_short_summary(full["data"])
         return {"markdown": md}
 
+    @traced("report.render")
     def _render_report_markdown(self, data: Dict[str, Any]) -> str:
         header = self._create_report_header(data)
         body = self._generate_enhanced_template(data)
@@ -380,6 +389,7 @@ class ReportService:
             ],
         }
 
+    @traced("report.llm_sections")
     def _maybe_generate_llm_sections(self, data: Dict[str, Any]) -> Optional[str]:
         if not self.enable_llm or not self._llm_available():
             if self.debug:
@@ -425,12 +435,14 @@ class ReportService:
 
             if self.debug:
                 print("[ReportService] Calling LLM for detailed sections...")
-            resp = self._client.chat.completions.create(
-                model=self.report_llm_model,
-                messages=messages,
-                temperature=0.2,
-                max_tokens=1200,
-            )
+            with llm_call("credentialing_report", self.report_llm_model) as call:
+                call.response = self._client.chat.completions.create(
+                    model=self.report_llm_model,
+                    messages=messages,
+                    temperature=0.2,
+                    max_tokens=1200,
+                )
+            resp = call.response
             content = (
                 resp.choices[0].message.content if getattr(resp, "choices", None) else None
             )
@@ -450,15 +462,11 @@ class ReportService:
             return 0
 
     @staticmethod
-    def _safe_eval_json(s: Optional[str]) -> Any:
-        if not s:
-            return None
-        try:
-            import json
-
-            return json.loads(s)
-        except Exception:
+    def _safe_eval_json(s: Any) -> Any:
+        # JSONText columns arrive already decoded
+        if s is None or s == "":
             return None
+        return s
 
     @staticmethod
     def _model_as_dict(obj: Any) -> Dict[str, Any]:
@@ -506,6 +514,7 @@ class ReportService:
         }
         return mapping.get(t, file_type or "Document")
 
+    @traced("report.build_steps")
     def _build_steps(
         self,
         application: Application,
@@ -560,6 +569,7 @@ class ReportService:
             )
         return steps
 
+    @traced("report.build_decisions")
     def _build_decisions(
         self,
         application: Application,
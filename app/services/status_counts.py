@@ -0,0 +1,27 @@
+from typing import Dict
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import CurrentDocument, EmailRecord, UploadedDocument
+
+
+def document_status_counts(db: Session, form_id: str) -> Dict[str, int]:
+    """``{status: count}`` for a form's current documents, in one GROUP BY."""
+    return dict(
+        db.query(UploadedDocument.status, func.count(UploadedDocument.id))
+        .join(CurrentDocument, CurrentDocument.uploaded_document_id == UploadedDocument.id)
+        .filter(CurrentDocument.form_id == form_id)
+        .group_by(UploadedDocument.status)
+        .all()
+    )
+
+
+def email_status_counts(db: Session, application_id: str) -> Dict[str, int]:
+    """``{status: count}`` for an application's email records, in one GROUP BY."""
+    return dict(
+        db.query(EmailRecord.status, func.count(EmailRecord.id))
+        .filter(EmailRecord.application_id == application_id)
+        .group_by(EmailRecord.status)
+        .all()
+    )
@@ -0,0 +1,209 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Query, Session
+
+from app.models import CurrentDocument, UploadedDocument, FormData, UploadSession
+from app.services.issue_service import clear_issues
+
+UPLOAD_DIR = "uploads"
+PARTIAL_DIR = os.path.join(UPLOAD_DIR, ".partial")
+# upload session states that still own their partial file
+ACTIVE_SESSION_STATUSES = ("OPEN", "FINALIZING")
+
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(PARTIAL_DIR, exist_ok=True)
+
+
+def split_filename(filename: str) -> Tuple[str, str]:
+    """Split a client filename into (name without extension, extension)."""
+    filename_without_ext = ".".join(filename.split(".")[:-1])
+    file_ext = filename.split(".")[-1]
+    return filename_without_ext, file_ext
+
+
+def stored_filename(filename: str, form_id: str) -> str:
+    """On-disk name for an uploaded file: ``{name}__{form_id}.{ext}``."""
+    filename_without_ext, file_ext = split_filename(filename)
+    return f"{filename_without_ext}__{form_id}.{file_ext}"
+
+
+def current_documents_query(db: Session, form_id: str) -> Query:
+    """A form's live documents, one per file type, resolved through current_documents."""
+    return (
+        db.query(UploadedDocument)
+        .join(CurrentDocument, CurrentDocument.uploaded_document_id == UploadedDocument.id)
+        .filter(CurrentDocument.form_id == form_id)
+    )
+
+
+def set_current_documents(db: Session, docs: List[UploadedDocument]) -> None:
+    """Point ``current_documents`` at ``docs`` (one per form/type), replacing any previous pointer.
+
+    The caller owns the transaction.
+    """
+    if not docs:
+        return
+    now = datetime.utcnow()
+    stmt = insert(CurrentDocument).values([
+        {"form_id": d.form_id, "file_type": d.file_type, "uploaded_document_id": d.id, "updated_at": now}
+        for d in docs
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[CurrentDocument.form_id, CurrentDocument.file_type],
+        set_={"uploaded_document_id": stmt.excluded.uploaded_document_id, "updated_at": stmt.excluded.updated_at},
+    ))
+
+
+# updated_at as SQLite text in the format SQLAlchemy's DateTime stores, in UTC like
+# set_current_documents' datetime.utcnow()
+SQL_UTC_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+
+
+def current_documents_upsert_sql(rows: str = "VALUES (?, ?, ?)", table: str = "current_documents") -> str:
+    """Raw-SQL ``set_current_documents`` for scripts writing through sqlite3 or ``text()``.
+
+    ``rows`` is a VALUES list or SELECT yielding (form_id, file_type, uploaded_document_id);
+    the default takes one row as ``?`` parameters. ``table`` may be schema-qualified.
+    """
+    return (
+        f"INSERT INTO {table} (form_id, file_type, uploaded_document_id, updated_at) "
+        f"SELECT *, {SQL_UTC_NOW} FROM ({rows}) WHERE true "
+        "ON CONFLICT(form_id, file_type) DO UPDATE SET "
+        "uploaded_document_id = excluded.uploaded_document_id, updated_at = excluded.updated_at"
+    )
+
+
+def record_upload(
+    db: Session, form_id: str, file_type: str, filename: str, blob_sha256: Optional[str] = None
+) -> UploadedDocument:
+    """Register a stored file against a form.
+
+    Marks the current document of the same type as Replaced, inserts the new
+    UploadedDocument (optionally referencing a stored blob), makes it the
+    current document and points ``FormData.<file_type>_upload_id`` at it.
+    The caller owns the transaction (flushes only, no commit).
+    """
+    _, file_ext = split_filename(filename)
+
+    # 1. Mark previous file as replaced, if exists
+    previous_record = (
+        current_documents_query(db, form_id)
+        .filter(CurrentDocument.file_type == file_type)
+        .first()
+    )
+
+    if previous_record:
+        previous_record.status = "Replaced"
+        clear_issues(db, form_id, [file_type])
+        db.flush()
+
+    # 2. Insert new file record
+    new_file_record = UploadedDocument(
+        form_id=form_id,
+        filename=filename,
+        file_extension=file_ext,
+        file_type=file_type,
+        status="New",
+        blob_sha256=blob_sha256,
+    )
+    db.add(new_file_record)
+    db.flush()
+    set_current_documents(db, [new_file_record])
+
+    # 3. Update reference in FormData
+    form = db.query(FormData).filter(FormData.form_id == form_id).first()
+    if form:
+        field_name = f"{file_type}_upload_id"
+        setattr(form, field_name, new_file_record.id)
+
+    return new_file_record
+
+
+def record_uploads(db: Session, form_id: str, items: List[Tuple[str, str, Optional[str]]]) -> List[UploadedDocument]:
+    """Batch form of :func:`record_upload` for ``(file_type, filename, blob_sha256)`` items.
+
+    Issues one UPDATE for the Replaced marking, one flush for all inserts, one
+    pointer upsert and a single FormData lookup regardless of how many
+    documents are registered. File types must be unique within the batch.
+    The caller owns the transaction.
+    """
+    file_types = [file_type for file_type, _, _ in items]
+    current_ids = select(CurrentDocument.uploaded_document_id).where(
+        CurrentDocument.form_id == form_id,
+        CurrentDocument.file_type.in_(file_types),
+    )
+    db.query(UploadedDocument).filter(
+        UploadedDocument.id.in_(current_ids)
+    ).update({UploadedDocument.status: "Replaced"}, synchronize_session=False)
+    clear_issues(db, form_id, file_types)
+
+    new_records = [
+        UploadedDocument(
+            form_id=form_id,
+            filename=filename,
+            file_extension=split_filename(filename)[1],
+            file_type=file_type,
+            status="New",
+            blob_sha256=blob_sha256,
+        )
+        for file_type, filename, blob_sha256 in items
+    ]
+    db.add_all(new_records)
+    db.flush()
+    set_current_documents(db, new_records)
+
+    form = db.query(FormData).filter(FormData.form_id == form_id).first()
+    if form:
+        for rec in new_records:
+            setattr(form, f"{rec.file_type}_upload_id", rec.id)
+
+    return new_records
+
+
+# --------- resumable upload sessions ---------
+
+def partial_path(session_id: str) -> str:
+    return os.path.join(PARTIAL_DIR, f"{session_id}.part")
+
+
+def purge_stale_upload_sessions(db: Session, max_age_hours: int = 24) -> Dict[str, int]:
+    """Expire OPEN sessions with no activity for ``max_age_hours`` and delete their partial files.
+
+    FINALIZING sessions idle that long were interrupted mid-finalize and are expired too.
+    Also removes orphaned ``.part`` files that no longer belong to an OPEN or FINALIZING session
+    and spooled ``.upload`` files left behind by interrupted requests.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    stale = (
+        db.query(UploadSession)
+        .filter(UploadSession.status.in_(ACTIVE_SESSION_STATUSES), UploadSession.updated_at < cutoff)
+        .all()
+    )
+    freed = 0
+    for s in stale:
+        path = partial_path(s.id)
+        if os.path.exists(path):
+            freed += os.path.getsize(path)
+            os.remove(path)
+        s.status = "EXPIRED"
+    db.commit()
+
+    open_ids = {sid for (sid,) in db.query(UploadSession.id).filter(UploadSession.status.in_(ACTIVE_SESSION_STATUSES))}
+    orphans = 0
+    for name in os.listdir(PARTIAL_DIR):
+        path = os.path.join(PARTIAL_DIR, name)
+        if name.endswith(".part"):
+            if name[: -len(".part")] in open_ids:
+                continue
+        elif not (name.endswith(".upload") and datetime.utcfromtimestamp(os.path.getmtime(path)) < cutoff):
+            # .upload files are single-request spools; only old ones are leftovers from a crash
+            continue
+        freed += os.path.getsize(path)
+        os.remove(path)
+        orphans += 1
+
+    return {"expired": len(stale), "orphans_removed": orphans, "bytes_freed": freed}
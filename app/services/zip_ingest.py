@@ -0,0 +1,104 @@
+import os
+import re
+import zipfile
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import SavedFile
+from app.services.blob_store import add_blob_ref, place_blob, release_blob, spool_stream
+
+# Loads screenshot archives (board certificates, licences, NPI lookups) into saved_files.
+# With a list of known NPIs, an entry belongs to the first NPI found anywhere in its path
+# (the same substring match the loaders always used, done with set lookups); without one,
+# the NPI is read from the base name with NPI_PATTERN. Each entry is streamed into the
+# blob store (never held in memory whole), and rows are committed every ``commit_size``
+# entries. Entries whose content is already stored under the same saved-file name are skipped.
+NPI_PATTERN = re.compile(r"(?<!\d)(\d{10})(?!\d)")
+COMMIT_SIZE = 200
+
+
+def npi_from_name(name: str) -> Optional[str]:
+    """First standalone 10-digit run in the entry's base name, e.g. 'CA/1234567890_board.png'."""
+    m = NPI_PATTERN.search(os.path.basename(name))
+    return m.group(1) if m else None
+
+
+def npi_in_path(path: str, known: Dict[str, int]) -> Optional[str]:
+    """The NPI of ``known`` (npi -> list position) that occurs in ``path``, earliest in the list first.
+
+    Same result as ``next(npi for npi in npi_list if npi in path)``, but every substring of
+    the path is looked up once per distinct NPI length instead of scanning the whole list.
+    """
+    best = None
+    for length in {len(npi) for npi in known}:
+        for start in range(len(path) - length + 1):
+            pos = known.get(path[start:start + length])
+            if pos is not None and (best is None or pos < known[best]):
+                best = path[start:start + length]
+    return best
+
+
+def ingest_zip(
+    db: Session,
+    zip_path: str,
+    attribute: str,
+    saved_name: Callable[[Optional[str], str], str],
+    npis: Optional[Sequence[str]] = None,
+    suffixes: Optional[Tuple[str, ...]] = (".png",),
+    commit_size: int = COMMIT_SIZE,
+) -> Dict[str, int]:
+    """Store the zip's ``suffixes`` entries as saved_files rows tagged ``attribute``.
+
+    ``saved_name(npi, entry_name)`` gives the stored filename. With ``npis``, only entries
+    whose path contains one of them are kept (``suffixes=None`` keeps every file entry).
+    A name already saved with the same content is skipped; with different content, the
+    row is pointed at the new blob.
+    """
+    known: Optional[Dict[str, int]] = None
+    if npis is not None:
+        known = {}
+        for pos, npi in enumerate(npis):
+            if npi:
+                known.setdefault(npi, pos)
+    existing: Dict[str, SavedFile] = {
+        f.filename: f for f in db.query(SavedFile).filter(SavedFile.attribute == attribute)
+    }
+    stats = {"entries": 0, "stored": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    pending = 0
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        for info in zf.infolist():
+            if info.is_dir() or (suffixes and not info.filename.lower().endswith(suffixes)):
+                continue
+            stats["entries"] += 1
+            npi = npi_from_name(info.filename) if known is None else npi_in_path(info.filename, known)
+            if known is not None and npi is None:
+                stats["skipped"] += 1
+                continue
+            filename = saved_name(npi, info.filename)
+            with zf.open(info) as src:
+                tmp_path, sha256, size = spool_stream(src)
+            saved = existing.get(filename)
+            if saved is not None and saved.blob_sha256 == sha256:
+                os.remove(tmp_path)
+                stats["unchanged"] += 1
+                continue
+            place_blob(tmp_path, sha256)
+            add_blob_ref(db, sha256, size)
+            if saved is None:
+                saved = SavedFile(filename=filename, file_type=os.path.splitext(filename)[1].lstrip(".") or "png",
+                                  attribute=attribute, blob_sha256=sha256)
+                db.add(saved)
+                existing[filename] = saved
+                stats["stored"] += 1
+            else:
+                release_blob(db, saved.blob_sha256)
+                saved.blob_sha256 = sha256
+                saved.file_data = None
+                stats["updated"] += 1
+            pending += 1
+            if pending >= commit_size:
+                db.commit()
+                pending = 0
+    db.commit()
+    return stats
@@ -0,0 +1,219 @@
+"""Development SQL tracer: per-request statement shapes, N+1 detection and EXPLAIN QUERY PLAN.
+
+Off unless SQL_TRACE is set (1/true/yes/on). When on, every statement on the engine is
+normalized (literals and IN lists collapsed to ``?``) and grouped per request. A shape run
+SQL_TRACE_THRESHOLD times or more (default 5) in one request is reported as an N+1
+candidate. The first time a SELECT shape is seen, its EXPLAIN QUERY PLAN is captured, and
+plans that SCAN a table are reported with the request.
+
+Each report is appended as one JSON line to SQL_TRACE_FILE (default sql_trace.jsonl).
+The API also keeps the latest reports for GET /debug/sql-trace. Statements outside a
+request, e.g. from scripts, are collected under the script name and written at exit, or
+per block with ``with trace_block("name"):``.
+"""
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+TRUTHY = {"1", "true", "yes", "on"}
+THRESHOLD = int(os.getenv("SQL_TRACE_THRESHOLD", "5"))
+TRACE_FILE = os.getenv("SQL_TRACE_FILE", "sql_trace.jsonl")
+KEEP_REPORTS = 200
+TOP_SHAPES = 20
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.I)
+_SPACE = re.compile(r"\s+")
+
+
+def enabled() -> bool:
+    return os.getenv("SQL_TRACE", "").strip().lower() in TRUTHY
+
+
+def normalize(statement: str) -> str:
+    sql = _SPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _IN_LIST.sub("IN (?...)", sql)
+
+
+class Trace:
+    """Statements of one request (or script block), grouped by normalized shape."""
+
+    def __init__(self, name: str, **meta):
+        self.name = name
+        self.meta = meta
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.started = time.perf_counter()
+        self.shapes: Dict[str, List[float]] = {}  # shape -> [count, seconds]
+        self.scans: Dict[str, List[str]] = {}
+
+    def add(self, shape: str, seconds: float) -> None:
+        entry = self.shapes.get(shape)
+        if entry is None:
+            entry = self.shapes[shape] = [0, 0.0]
+            plan = _scan_plans.get(shape)
+            if plan:
+                self.scans[shape] = plan
+        entry[0] += 1
+        entry[1] += seconds
+
+    def report(self) -> Dict[str, Any]:
+        ordered = sorted(self.shapes.items(), key=lambda kv: (-kv[1][0], -kv[1][1]))
+        return {
+            "name": self.name,
+            **self.meta,
+            "started_at": self.started_at,
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "statements": sum(int(c) for c, _ in self.shapes.values()),
+            "sql_ms": round(sum(s for _, s in self.shapes.values()) * 1000, 2),
+            "n_plus_one": [
+                {"sql": shape, "count": int(count), "total_ms": round(seconds * 1000, 2)}
+                for shape, (count, seconds) in ordered if count >= THRESHOLD
+            ],
+            "scans": [{"sql": shape, "plan": plan} for shape, plan in self.scans.items()],
+            "shapes": [
+                {"sql": shape, "count": int(count), "total_ms": round(seconds * 1000, 2)}
+                for shape, (count, seconds) in ordered[:TOP_SHAPES]
+            ],
+        }
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("sql_trace", default=None)
+_background: Optional[Trace] = None
+_scan_plans: Dict[str, List[str]] = {}  # shape -> plan lines that SCAN (shapes seen without one map to [])
+_reports: deque = deque(maxlen=KEEP_REPORTS)
+_lock = threading.Lock()
+
+
+def _emit(report: Dict[str, Any]) -> None:
+    if not report["statements"]:
+        return
+    line = json.dumps(report, default=str)
+    with _lock:
+        _reports.append(report)
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _explain(cursor, statement: str, parameters) -> List[str]:
+    """Plan lines that scan a table; [] when the plan only uses index searches (or cannot be explained)."""
+    try:
+        rows = cursor.connection.execute("EXPLAIN QUERY PLAN " + statement, parameters or ()).fetchall()
+    except Exception:
+        return []
+    details = [str(row[-1]) for row in rows]
+    if any(d.startswith("SCAN ") and d != "SCAN CONSTANT ROW" for d in details):
+        return details
+    return []
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_trace_started", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["sql_trace_started"].pop()
+    shape = normalize(statement)
+    if shape not in _scan_plans:
+        plan = []
+        if not executemany and conn.dialect.name == "sqlite" and shape.upper().startswith(("SELECT", "WITH")):
+            plan = _explain(cursor, statement, parameters)
+        _scan_plans[shape] = plan
+    _add(shape, seconds)
+
+
+def _handle_error(context):
+    # after_cursor_execute does not fire for a failed statement; pop its start here so the
+    # pooled connection's stack stays balanced and the time is still traced
+    started = context.connection.info.get("sql_trace_started") if context.connection is not None else None
+    if started:
+        _add(normalize(context.statement or ""), time.perf_counter() - started.pop())
+
+
+def _add(shape: str, seconds: float) -> None:
+    global _background
+    trace = _current.get()
+    if trace is None:
+        if _background is None:
+            _background = Trace(os.path.basename(sys.argv[0]) or "python")
+        trace = _background
+    trace.add(shape, seconds)
+
+
+def _flush_background() -> None:
+    if _background is not None:
+        _emit(_background.report())
+
+
+@contextmanager
+def trace_block(name: str):
+    """Collect the statements run inside the block into their own report."""
+    trace = Trace(name)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        _emit(trace.report())
+
+
+class SqlTraceMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/debug/sql-trace"):
+            await self.app(scope, receive, send)
+            return
+        trace = Trace(scope["path"], method=scope.get("method", ""), path=scope["path"])
+        token = _current.set(trace)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            trace.name = getattr(route, "path", None) or scope["path"]
+            _emit(trace.report())
+
+
+def recent_reports(limit: int = 50, flagged: bool = False) -> List[Dict[str, Any]]:
+    with _lock:
+        reports = list(_reports)
+    if flagged:
+        reports = [r for r in reports if r["n_plus_one"] or r["scans"]]
+    return reports[-limit:][::-1]
+
+
+def install_engine(engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    atexit.register(_flush_background)
+
+
+def install(app, engine) -> None:
+    """Trace ``engine`` and add the per-request middleware and GET /debug/sql-trace to ``app``."""
+    install_engine(engine)
+    app.add_middleware(SqlTraceMiddleware)
+
+    def sql_trace_reports(limit: int = 50, flagged: bool = False):
+        # flagged=true: only requests with N+1 candidates or table scans
+        return {"threshold": THRESHOLD, "file": os.path.abspath(TRACE_FILE),
+                "reports": recent_reports(limit, flagged)}
+
+    app.add_api_route("/debug/sql-trace", sql_trace_reports, methods=["GET"], include_in_schema=False)
@@ -0,0 +1,235 @@
+"""Span tracing with local exporters (no collector), modelled on OpenTelemetry.
+
+Enable with TRACING=file, TRACING=console or TRACING=file,console. With ``file``, every
+finished span is appended as one JSON line to TRACING_FILE (default traces.jsonl). With
+``console``, spans are printed as they end. When TRACING is unset, ``span()`` returns a
+shared no-op span and nothing is recorded.
+
+Span fields follow OTel naming: trace_id (32 hex), span_id (16 hex), parent_span_id,
+name, start/end (epoch ns), attributes, status. Spans come from:
+- TracingMiddleware: one root span per HTTP request. Its id is returned in X-Trace-Id.
+- install_engine: one ``db.query`` child span per SQL statement inside an active trace.
+- ``span()`` / ``@traced``: pipeline stages, ReportService phases, LLM calls (app.metrics.llm_call).
+ProcessingJob.trace_id carries the trace of the request that queued the job, so the
+worker's spans join that trace.
+"""
+import functools
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+
+TRACE_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+SQL_PREVIEW = 200  # characters of the statement kept on db.query spans
+
+
+def _exporter_names() -> List[str]:
+    return [n.strip().lower() for n in os.getenv("TRACING", "").split(",") if n.strip()]
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = "OK"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.attributes["error.type"] = type(exc).__name__
+        self.attributes["error.message"] = str(exc)[:500]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, exc: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class FileExporter:
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.as_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class ConsoleExporter:
+    def export(self, span: Span) -> None:
+        data = span.as_dict()
+        attrs = " ".join(f"{k}={v}" for k, v in data["attributes"].items())
+        print(f"[trace {data['trace_id'][:8]}] {data['name']} {data['duration_ms']:.1f}ms {data['status']} {attrs}",
+              file=sys.stderr)
+
+
+EXPORTER_TYPES = {"file": FileExporter, "console": ConsoleExporter}
+_exporters = [EXPORTER_TYPES[n]() for n in _exporter_names() if n in EXPORTER_TYPES]
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def enabled() -> bool:
+    return bool(_exporters)
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current.get()
+    return span.trace_id if span else None
+
+
+@contextmanager
+def span(name: str, trace_id: Optional[str] = None, **attributes) -> Iterator[Any]:
+    """Child of the current span, or a new root (in ``trace_id`` when given, e.g. a job's stored trace)."""
+    if not _exporters:
+        yield NOOP_SPAN
+        return
+    parent = _current.get()
+    if parent is not None and trace_id in (None, parent.trace_id):
+        current = Span(name, parent.trace_id, parent.span_id, attributes)
+    else:
+        current = Span(name, trace_id or new_trace_id(), None, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.record_error(exc)
+        raise
+    finally:
+        _current.reset(token)
+        _end(current)
+
+
+def traced(name: str):
+    """Decorator form of ``span(name)``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _exporters:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _end(current: Span) -> None:
+    current.end_ns = time.time_ns()
+    for exporter in _exporters:
+        try:
+            exporter.export(current)
+        except Exception as exc:  # tracing must never break the traced code
+            print(f"Span export failed: {exc}", file=sys.stderr)
+
+
+class TracingMiddleware:
+    """Root span per HTTP request, named by route template; the trace id is returned in X-Trace-Id."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with span("http.request", **{"http.method": scope.get("method", ""), "http.target": scope["path"]}) as root:
+            trace_header = (b"x-trace-id", root.trace_id.encode())
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    message["headers"] = list(message.get("headers", [])) + [trace_header]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    root.name = f"{scope.get('method', '')} {route}"
+                    root.set_attribute("http.route", route)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current.get()
+    if parent is None:
+        return  # statements outside a trace are not exported
+    child = Span("db.query", parent.trace_id, parent.span_id, {
+        "db.system": conn.dialect.name,
+        "db.statement": " ".join(statement.split())[:SQL_PREVIEW],
+        "db.executemany": executemany,
+    })
+    conn.info.setdefault("trace_spans", []).append(child)
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is None:
+        return
+    child = conn.info["trace_spans"].pop()
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        child.set_attribute("db.rowcount", cursor.rowcount)
+    _end(child)
+
+
+def _handle_error(context):
+    spans = context.connection.info.get("trace_spans") if context.connection is not None else None
+    if spans and _current.get() is not None:
+        child = spans.pop()
+        child.record_error(context.original_exception)
+        _end(child)
+
+
+def install_engine(engine) -> None:
+    """Export a ``db.query`` span for every statement run inside an active trace."""
+    if event.contains(engine, "before_cursor_execute", _before_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _handle_error)
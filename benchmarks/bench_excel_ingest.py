@@ -0,0 +1,162 @@
+"""Time and peak memory of the Excel ingest read path on a generated DEA-style sheet.
+
+Writes a workbook with N provider rows (default 200,000) in the layout of
+Other_Attributes_Schema.xlsx:DEA, then runs each phase in a fresh process so
+peak RSS is per phase:
+
+  stream   app/services/excel_ingest.SheetReader (read-only, iter_rows values only)
+  ingest   stream + EntityResolver + DocumentWriter into a throwaway SQLite DB
+           seeded with one form per row
+  legacy   the previous loader (full workbook DOM, ws.cell per cell); only with --legacy
+
+Usage: python benchmarks/bench_excel_ingest.py [rows] [--legacy] [--commit-size N]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+SHEET_NAME = "DEA"
+HEADER = [
+    "Flag", "Row_ID", "provider_first_name", "provider_last_name", "provider_name", "npi",
+    "Registrant Name", "DEA Registration Number", "Business Address", "Controlled Substance Schedules",
+    "Business Activity", "Issue Date", "Expiration Date",
+    "Demo_Verification_Attribute1 (PDF Format Match)", "Comment 1", "Demo_Verification_Attribute2 (DEA Verification)",
+]
+
+
+def npi_for(i: int) -> str:
+    return str(1000000000 + i)
+
+
+def write_workbook(path: str, rows: int) -> None:
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_NAME)
+    ws.append([None] * 6 + ["OCR/LLM Output"] + [None] * 6 + ["Verification"])
+    ws.append(HEADER)
+    for i in range(rows):
+        ws.append([
+            "Active", i, f"First{i}", f"Last{i}", f"First{i} Last{i}", int(npi_for(i)),
+            f"First{i} Last{i}", f"RS{i:07d}", f"{i} Main St SPRINGFIELD CA 90000", "2, 2N, 3, 3N, 4, 5",
+            "PRACTITIONER", "August 13, 2024", "February 28, 2027", "Match", None, "Done",
+        ])
+    wb.save(path)
+
+
+def phase_stream(path: str) -> int:
+    from app.services.excel_ingest import SheetReader, header_contains
+
+    count = 0
+    for _ in SheetReader(path, SHEET_NAME, header_contains("flag", exact=True), default_header_row=2):
+        count += 1
+    return count
+
+
+def phase_legacy(path: str) -> int:
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, data_only=True)
+    ws = wb[SHEET_NAME]
+    headers = {j: (str(c.value) or "").strip() for j, c in enumerate(ws[2], start=1)}
+    rows = []
+    for i in range(3, ws.max_row + 1):
+        rows.append({key: ws.cell(row=i, column=j).value for j, key in headers.items()})
+    return len(rows)
+
+
+def seed_forms(rows: int) -> None:
+    from app.database import Base, engine
+    from app.models import FormData
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(FormData.__table__.delete())
+        for start in range(0, rows, 20000):
+            conn.execute(FormData.__table__.insert(), [
+                {"form_id": f"form-{i}", "npi": npi_for(i)} for i in range(start, min(start + 20000, rows))
+            ])
+
+
+def phase_ingest(path: str, commit_size: int) -> int:
+    from app.database import SessionLocal
+    from app.services.entity_resolution import EntityResolver
+    from app.services.excel_ingest import DocumentWriter, SheetReader, cell_str, header_contains
+
+    db = SessionLocal()
+    try:
+        resolver = EntityResolver(db, "bench_dea_excel")
+        writer = DocumentWriter(db, "DEA", lambda form_id: f"dea_{form_id}.json", commit_size=commit_size)
+        for rec in SheetReader(path, SHEET_NAME, header_contains("flag", exact=True), default_header_row=2):
+            form_id = resolver.form_id_for(npi=cell_str(rec.get("npi")))
+            if form_id:
+                writer.write(
+                    form_id,
+                    {h: rec.get(h) for h in HEADER[6:13]},
+                    {"pdf_format_match": rec.get(HEADER[13]), "dea_verification": rec.get(HEADER[15])},
+                )
+        writer.flush()
+        resolver.finish()
+        db.commit()
+        return writer.written
+    finally:
+        db.close()
+
+
+def child(phase: str, path: str, rows: int, commit_size: int) -> None:
+    if phase == "ingest":
+        seed_forms(rows)  # not timed
+    started = time.perf_counter()
+    if phase == "stream":
+        count = phase_stream(path)
+    elif phase == "legacy":
+        count = phase_legacy(path)
+    else:
+        count = phase_ingest(path, commit_size)
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(json.dumps({"phase": phase, "rows": count, "seconds": round(elapsed, 2), "peak_rss_mb": round(peak_mb, 1)}))
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "--child":
+        child(args[1], args[2], int(args[3]), int(args[4]))
+        return
+    commit_size = 1000
+    if "--commit-size" in args:
+        i = args.index("--commit-size")
+        commit_size = int(args[i + 1])
+        del args[i:i + 2]
+    rows = next((int(a) for a in args if a.isdigit()), 200000)
+    phases = ["stream", "ingest"] + (["legacy"] if "--legacy" in args else [])
+
+    workdir = tempfile.mkdtemp(prefix="bench_excel_ingest_")
+    path = os.path.join(workdir, "dea.xlsx")
+    started = time.perf_counter()
+    write_workbook(path, rows)
+    print(f"Generated {rows:,} rows ({os.path.getsize(path) / 1e6:.1f} MB) in {time.perf_counter() - started:.1f}s")
+
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    env.setdefault("OPENAI_API_KEY", "bench")
+    print(f"{'phase':<8} {'rows':>9} {'seconds':>9} {'peak RSS MB':>12}")
+    for phase in phases:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", phase, path, str(rows), str(commit_size)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        r = json.loads(out)
+        print(f"{r['phase']:<8} {r['rows']:>9,} {r['seconds']:>9.2f} {r['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
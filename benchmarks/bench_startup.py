@@ -0,0 +1,112 @@
+"""Cold-start cost of the API: `import app.main` and the lifespan startup, per fresh process.
+
+Each run starts a new interpreter with `python -X importtime` against a throwaway SQLite
+DB that the warm-up run creates. It reports the wall time of `import app.main`, the
+lifespan startup (schema check), any heavy dependency that got imported, and the modules
+with the largest cumulative import time. With --max-import-ms N the run exits 1 when the
+median import exceeds N, so CI can track the cost.
+
+Usage: python benchmarks/bench_startup.py [runs] [--top N] [--max-import-ms N]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Modules whose import means a heavy dependency leaked back onto the startup path
+HEAVY_MODULES = ["openai", "fitz", "PIL", "apscheduler", "rich"]
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+heavy = [m for m in {heavy!r} if m in sys.modules]
+from fastapi.testclient import TestClient
+started_app = time.perf_counter()
+with TestClient(app.main.app):
+    ready = time.perf_counter()
+print("RESULT " + json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - started_app) * 1000,
+    "heavy": heavy,
+}}))
+"""
+
+
+def parse_importtime(stderr: str):
+    """(module, cumulative microseconds) for each module imported by `import app.main`.
+
+    importtime prints a module after its dependencies, so everything up to the app.main
+    line belongs to it; the TestClient imports after it are left out."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((name.rstrip(), int(cumulative)))
+        if name.strip() == "app.main":
+            break
+    return modules
+
+
+def run_once(workdir: str):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    env.setdefault("OPENAI_API_KEY", "bench")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(root=PROJECT_ROOT, heavy=HEAVY_MODULES)],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+    result = next(json.loads(line[len("RESULT "):]) for line in proc.stdout.splitlines() if line.startswith("RESULT "))
+    result["modules"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(name, default):
+        if name in args:
+            i = args.index(name)
+            value = args[i + 1]
+            del args[i:i + 2]
+            return value
+        return default
+
+    top = int(option("--top", "15"))
+    max_import_ms = option("--max-import-ms", None)
+    runs = int(args[0]) if args else 5
+
+    # One DB for all runs: the warm-up creates the schema and the .pyc files, so measured
+    # runs see a restart of an existing deployment
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    run_once(workdir)
+    results = [run_once(workdir) for _ in range(runs)]
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    startup_ms = statistics.median(r["startup_ms"] for r in results)
+
+    print(f"runs={runs}  import app.main p50={import_ms:.1f}ms  lifespan startup p50={startup_ms:.1f}ms")
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    print(f"heavy modules loaded at startup: {', '.join(heavy) if heavy else 'none'}")
+
+    # Top-level-ish modules by cumulative import time (from the last run)
+    modules = sorted(results[-1]["modules"], key=lambda m: -m[1])
+    print(f"\n{'cumulative ms':>14}  module")
+    for name, cumulative in modules[:top]:
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+    if max_import_ms is not None and import_ms > float(max_import_ms):
+        print(f"\n❌ import app.main p50 {import_ms:.1f}ms exceeds {max_import_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Latency of GET /api/forms/upload-info as a form's replacement history grows.
+
+Seeds a throwaway SQLite DB with one form whose provider document types have
+been replaced N times each, then times the endpoint. The "legacy" column
+times the previous approach (load every row for the form, filter in Python)
+for comparison.
+
+Usage: python benchmarks/bench_upload_info.py [requests_per_size]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+DB_FILE = os.path.join(tempfile.mkdtemp(prefix="bench_upload_info_"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_FILE}"
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import FormData, UploadedDocument  # noqa: E402
+
+HISTORY_SIZES = [1, 10, 100, 1000, 5000]
+FILE_TYPES = ["degree", "cv", "dea", "malpractice_insurance", "dl", "npi"]
+
+
+def seed_history(form_id, replacements):
+    """Insert ``replacements`` Replaced rows per type followed by one current row (and its pointer)."""
+    rows = []
+    for file_type in FILE_TYPES:
+        for i in range(replacements):
+            rows.append({
+                "form_id": form_id, "filename": f"{file_type}_{i}.pdf", "file_extension": "pdf",
+                "file_type": file_type, "status": "Replaced", "json_match": {"fn": {"match": True}},
+            })
+        rows.append({
+            "form_id": form_id, "filename": f"{file_type}.pdf", "file_extension": "pdf",
+            "file_type": file_type, "status": "New", "json_match": {"fn": {"match": True}},
+        })
+    with engine.begin() as conn:
+        conn.execute(UploadedDocument.__table__.insert(), rows)
+        conn.execute(
+            text(
+                "INSERT INTO current_documents (form_id, file_type, uploaded_document_id) "
+                "SELECT form_id, file_type, MAX(id) FROM uploaded_documents "
+                "WHERE form_id = :form_id AND status != 'Replaced' GROUP BY form_id, file_type"
+            ),
+            {"form_id": form_id},
+        )
+
+
+def legacy_select(form_id):
+    db = SessionLocal()
+    try:
+        return db.query(UploadedDocument).filter(UploadedDocument.form_id == form_id).order_by(UploadedDocument.id.desc()).all()
+    finally:
+        db.close()
+
+
+def timed(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) >= 2 else 50
+    Base.metadata.create_all(bind=engine)  # the app does this in its lifespan, which a bare TestClient skips
+    client = TestClient(app)
+    print(f"DB: {DB_FILE}")
+    print(f"{'history/type':>12} {'rows':>7} {'p50 ms':>8} {'p95 ms':>8} {'legacy p50 ms':>14}")
+    for size in HISTORY_SIZES:
+        form_id = f"BENCH-{size}"
+        db = SessionLocal()
+        db.add(FormData(form_id=form_id))
+        db.commit()
+        db.close()
+        seed_history(form_id, size)
+
+        def call():
+            r = client.get("/api/forms/upload-info", params={"formId": form_id})
+            assert r.status_code == 200, r.text
+            assert all(f["fileId"] for f in r.json()["files"].values()), "expected every provider tile to be filled"
+
+        call()  # warm up
+        p50, p95 = timed(call, n)
+        legacy_p50, _ = timed(lambda: legacy_select(form_id), n)
+        print(f"{size:>12} {(size + 1) * len(FILE_TYPES):>7} {p50:>8.2f} {p95:>8.2f} {legacy_p50:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Latency, SQL statement count, rows fetched and response size of the main read endpoints.
+
+For every dataset size a subprocess seeds a throwaway SQLite DB with
+benchmarks/synthetic_data.py, then calls each endpoint in-process through TestClient.
+Per endpoint it reports p50/p95/p99 latency, plus the worst-case statements, rows
+fetched and response bytes of any single request. Results are written as JSON
+(benchmarks/results/ by default) so runs can be compared over time.
+
+Budgets (benchmarks/budgets.json, or --budgets FILE) cap any reported metric per
+endpoint, either as one number for every size or as {"size": number}. --baseline FILE
+compares p95 and statement counts with an earlier results file and allows
+--tolerance (default 1.25x) before it counts a regression. Any budget or baseline
+violation exits with status 1.
+
+Usage:
+  python benchmarks/run_endpoints.py [--sizes 1000,10000] [--requests 30] [--seed 7]
+      [--out FILE] [--budgets FILE] [--baseline FILE] [--tolerance 1.25]
+"""
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+DEFAULT_SIZES = [1000, 10000]
+DEFAULT_BUDGETS = os.path.join(CURRENT_DIR, "budgets.json")
+RESULTS_DIR = os.path.join(CURRENT_DIR, "results")
+SAMPLE_APPS = 20  # distinct applications cycled through by the per-application endpoints
+
+# name -> (path template, query params); {app_id} is filled per request
+ENDPOINTS = {
+    "applications": ("/api/applications/", None),
+    "application_detail": ("/api/applications/{app_id}", None),
+    "upload_info": ("/api/forms/upload-info", {"appId": "{app_id}"}),
+    "upload_info_psv": ("/api/forms/upload-info-psv", {"appId": "{app_id}"}),
+    "psv_info": ("/api/psv-info/{app_id}", None),
+    "executive_summary": ("/api/executive-summary", None),
+    "application_summary": ("/api/applications/summary/{app_id}", None),
+}
+METRICS = ["p50_ms", "p95_ms", "p99_ms", "statements", "rows", "bytes"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class SqlCounter:
+    """Statements executed and rows fetched on ``engine`` since the last reset()."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.statements = 0
+        self.rows = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        # Every fetched row passes through the sqlite3 row factory; tuples are what SQLAlchemy expects anyway
+        event.listen(engine.pool, "checkout", self._on_checkout)
+        engine.dispose()
+
+    def _on_execute(self, *args):
+        self.statements += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        dbapi_connection.row_factory = self._row
+
+    def _row(self, cursor, row):
+        self.rows += 1
+        return row
+
+    def reset(self):
+        self.statements = 0
+        self.rows = 0
+
+
+def sample_app_ids(engine, seed: int) -> List[str]:
+    """Deterministic sample of applications, always including the one with the longest document history."""
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        ids = [r[0] for r in conn.execute(text("SELECT id FROM applications ORDER BY id"))]
+        heaviest = conn.execute(text(
+            "SELECT a.id FROM applications a JOIN uploaded_documents d ON d.form_id = a.form_id "
+            "GROUP BY a.id ORDER BY COUNT(*) DESC, a.id LIMIT 1"
+        )).scalar()
+    sample = random.Random(seed).sample(ids, min(SAMPLE_APPS - 1, len(ids)))
+    return [heaviest] + [i for i in sample if i != heaviest]
+
+
+def measure_size(size: int, requests: int, seed: int) -> Dict[str, Any]:
+    """Runs in the per-size subprocess: DATABASE_URL and cwd already point at a fresh temp dir."""
+    from synthetic_data import populate
+
+    started = time.perf_counter()
+    populate(size, seed=seed, fast=True)
+    seed_seconds = time.perf_counter() - started
+
+    from fastapi.testclient import TestClient
+
+    from app.database import engine
+    from app.main import app
+
+    counter = SqlCounter(engine)
+    client = TestClient(app)
+    app_ids = sample_app_ids(engine, seed)
+    results = {}
+    for name, (path, params) in ENDPOINTS.items():
+        samples, statements, rows, sizes = [], [], [], []
+        for i in range(requests + 1):
+            app_id = app_ids[i % len(app_ids)]
+            url = path.format(app_id=app_id)
+            query = {k: v.format(app_id=app_id) for k, v in (params or {}).items()}
+            counter.reset()
+            start = time.perf_counter()
+            response = client.get(url, params=query)
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                raise SystemExit(f"{name}: GET {url} returned {response.status_code}: {response.text[:200]}")
+            if i == 0:
+                continue  # warm-up
+            samples.append(elapsed)
+            statements.append(counter.statements)
+            rows.append(counter.rows)
+            sizes.append(len(response.content))
+        results[name] = {
+            "p50_ms": round(statistics.median(samples), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "p99_ms": round(percentile(samples, 99), 2),
+            "statements": max(statements),
+            "rows": max(rows),
+            "bytes": max(sizes),
+        }
+        print(f"  {size:>8} {name:<20} p50={results[name]['p50_ms']:>8.2f}ms p95={results[name]['p95_ms']:>8.2f}ms "
+              f"stmts={results[name]['statements']:>4} rows={results[name]['rows']:>8} bytes={results[name]['bytes']:>10}",
+              flush=True)
+    return {"size": size, "seed_seconds": round(seed_seconds, 2), "endpoints": results}
+
+
+def run_size(size: int, requests: int, seed: int) -> Dict[str, Any]:
+    """Seed and measure one size in a subprocess, so each size gets its own engine and database."""
+    workdir = tempfile.mkdtemp(prefix=f"bench_endpoints_{size}_")
+    out_file = os.path.join(workdir, "result.json")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    env.setdefault("OPENAI_API_KEY", "bench")
+    print(f"Size {size:,} (DB in {workdir})", flush=True)
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", str(size), str(requests), str(seed), out_file],
+        cwd=workdir, env=env, check=True, stdout=sys.stdout,
+    )
+    with open(out_file) as f:
+        return json.load(f)
+
+
+def budget_for(budget: Any, size: int):
+    if isinstance(budget, dict):
+        return budget.get(str(size))
+    return budget
+
+
+def check(results: Dict[str, Any], budgets: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    failures = []
+    previous = {run["size"]: run["endpoints"] for run in (baseline or {}).get("runs", [])}
+    for run in results["runs"]:
+        size = run["size"]
+        for name, measured in run["endpoints"].items():
+            for metric, budget in budgets.get(name, {}).items():
+                limit = budget_for(budget, size)
+                if limit is not None and measured[metric] > limit:
+                    failures.append(f"{name} @ {size}: {metric}={measured[metric]} exceeds budget {limit}")
+            before = previous.get(size, {}).get(name)
+            if not before:
+                continue
+            if measured["statements"] > before["statements"]:
+                failures.append(f"{name} @ {size}: statements {before['statements']} -> {measured['statements']}")
+            if measured["p95_ms"] > before["p95_ms"] * tolerance:
+                failures.append(f"{name} @ {size}: p95 {before['p95_ms']}ms -> {measured['p95_ms']}ms "
+                                f"(> {tolerance}x baseline)")
+    return failures
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "--measure":
+        size, requests, seed, out_file = int(args[1]), int(args[2]), int(args[3]), args[4]
+        sys.path.insert(0, CURRENT_DIR)
+        with open(out_file, "w") as f:
+            json.dump(measure_size(size, requests, seed), f)
+        return
+
+    def option(name, default):
+        if name in args:
+            return args[args.index(name) + 1]
+        return default
+
+    sizes = [int(s) for s in option("--sizes", ",".join(map(str, DEFAULT_SIZES))).split(",")]
+    requests = int(option("--requests", "30"))
+    seed = int(option("--seed", "7"))
+    tolerance = float(option("--tolerance", "1.25"))
+    budgets_file = option("--budgets", DEFAULT_BUDGETS)
+    baseline_file = option("--baseline", None)
+    out_file = option("--out", os.path.join(RESULTS_DIR, f"endpoints_{datetime.now():%Y%m%d_%H%M%S}.json"))
+
+    results = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "seed": seed,
+        "requests": requests,
+        "runs": [run_size(size, requests, seed) for size in sizes],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(out_file)), exist_ok=True)
+    with open(out_file, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results: {out_file}")
+
+    budgets = {}
+    if budgets_file and os.path.exists(budgets_file):
+        with open(budgets_file) as f:
+            budgets = json.load(f)
+    baseline = None
+    if baseline_file:
+        with open(baseline_file) as f:
+            baseline = json.load(f)
+    failures = check(results, budgets, baseline, tolerance)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ All endpoints within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""Deterministic synthetic dataset for capacity testing at 100k-1M applications.
+
+Generates applications with their form_data, PSV documents (OCR/verification JSON shaped
+like scripts/ingest_*_from_excel.py writes it, plus replacement history), current
+document pointers, promoted document_fields, email records, application events and
+saved-file screenshots backed by the blob store. Rows are built in parallel chunks and
+written through db_script's loader (one executemany per table per chunk, one
+transaction, ANALYZE at the end).
+
+The same --seed gives the same rows whatever --workers is: chunk k draws only from
+Random(seed, k). --skew is a Zipf exponent: specialties, markets and assignees are
+Zipf-distributed over their value lists, and per-application history, emails and
+events follow a power law, so a few providers carry most of the rows. Larger skew means
+more lopsided data.
+
+Usage:
+  DATABASE_URL=sqlite:///./load.db python benchmarks/synthetic_data.py [apps]
+      [--seed N] [--skew S] [--workers N] [--chunk-size N] [--fast]
+
+From a benchmark (after setting DATABASE_URL and cwd):
+  sys.path.insert(0, BENCH_DIR); from synthetic_data import populate
+  populate(100_000, seed=7, fast=True)
+"""
+import hashlib
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from multiprocessing import Pool
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from app.document_fields import extract_fields  # noqa: E402
+
+AS_OF = datetime(2026, 10, 1, 9, 0, 0)
+CHUNK_SIZE = 5000
+HISTORY_CAP = 25     # max replaced versions of one document type
+EVENT_CAP = 60
+EMAIL_CAP = 30
+SCREENSHOT_POOL = 64  # distinct screenshot images shared by all saved_files rows
+NAMESPACE = uuid.UUID("6f1c3a52-8d0e-4f6b-9a57-2d1e4c7b9a10")
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Maria", "Wei",
+               "Priya", "Ahmed", "Sofia", "Hiroshi", "Olga", "Carlos", "Fatima", "Ivan", "Aisha", "Lars"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+              "Lee", "Nguyen", "Patel", "Kim", "Chen", "Singh", "Cohen", "Okafor", "Novak", "Rossi"]
+SPECIALTIES = ["Psychologist", "Family Medicine", "Internal Medicine", "Pediatrics", "Psychiatry", "Cardiology",
+               "Dermatology", "Orthopedic Surgery", "Radiology", "Anesthesiology", "Neurology", "Oncology",
+               "Obstetrics & Gynecology", "Emergency Medicine", "Ophthalmology", "Urology"]
+MARKETS = ["CA", "TX", "NY", "FL", "IL", "PA", "OH", "GA", "NC", "MI", "WA", "AZ"]
+CITIES = ["LOS ANGELES", "SAN DIEGO", "HOUSTON", "AUSTIN", "NEW YORK", "MIAMI", "CHICAGO", "PHILADELPHIA",
+          "COLUMBUS", "ATLANTA", "CHARLOTTE", "DETROIT", "SEATTLE", "PHOENIX"]
+ASSIGNEES = ["Unassigned", "Sam Carter", "Priya Nair", "Alex Kim", "Jordan Lee", "Morgan Diaz", "Taylor Brooks"]
+SOURCES = ["Manual Entry", "CAQH", "Email", "Availity", "Portal"]
+PSV_STATUSES = [("NEW", 30), ("IN_PROGRESS", 40), ("COMPLETED", 20), ("IN_COMMITTE_REVIEW", 5), ("APPROVED", 3),
+                ("DENIED", 1), ("SANCTIONED", 1)]
+COMMITTEE_STATUSES = {"NEW": "NOT_STARTED", "IN_PROGRESS": "NOT_STARTED", "COMPLETED": "NOT_STARTED",
+                      "IN_COMMITTE_REVIEW": "IN_REVIEW", "APPROVED": "APPROVED", "DENIED": "DENIED",
+                      "SANCTIONED": "SANCTIONED"}
+DOC_STATUSES = [("New", 25), ("In Progress", 50), ("APPROVED", 20), ("Rejected", 5)]
+EVENT_TYPES = [("SYSTEM", 60), ("STATUS_CHANGE", 25), ("COMMENT", 15)]
+
+APPLICATION_COLUMNS = ["id", "provider_id", "form_id", "name", "last_name", "email", "phone", "specialty", "address",
+                       "npi", "psv_status", "committee_status", "psv_original_label", "progress", "assignee", "source",
+                       "market", "create_dt", "last_updt_dt"]
+FORM_DATA_COLUMNS = ["form_id", "provider_id", "provider_name", "provider_last_name", "npi", "dob", "email", "phone",
+                     "specialty", "address", "degree_type", "university", "year", "experience", "last_org",
+                     "info_correct", "consent_verification"]
+DOCUMENT_COLUMNS = ["id", "form_id", "filename", "file_extension", "file_type", "status", "ocr_output", "pdf_match",
+                    "json_match", "verification_data", "updated_at"]
+CURRENT_COLUMNS = ["form_id", "file_type", "uploaded_document_id", "updated_at"]
+FIELD_COLUMNS = ["uploaded_document_id", "form_id", "file_type", "field", "value_text", "value_date"]
+EMAIL_COLUMNS = ["id", "application_id", "recipient_email", "subject", "body", "status", "sent_at"]
+EVENT_COLUMNS = ["application_id", "event_type", "message", "created_at"]
+SAVED_FILE_COLUMNS = ["filename", "file_type", "attribute", "blob_sha256", "created_at"]
+
+TABLES = [
+    ("applications", APPLICATION_COLUMNS),
+    ("form_data", FORM_DATA_COLUMNS),
+    ("uploaded_documents", DOCUMENT_COLUMNS),
+    ("current_documents", CURRENT_COLUMNS),
+    ("document_fields", FIELD_COLUMNS),
+    ("email_records", EMAIL_COLUMNS),
+    ("application_events", EVENT_COLUMNS),
+    ("saved_files", SAVED_FILE_COLUMNS),
+]
+
+
+def _ts(value: datetime) -> str:
+    # Same text format SQLAlchemy's DateTime stores in SQLite
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _json(value: Any) -> str:
+    return orjson.dumps(value).decode("utf-8")
+
+
+def _zipf_weights(n: int, skew: float) -> List[float]:
+    return list(accumulate(1.0 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+def _weighted(pairs) -> tuple:
+    return [v for v, _ in pairs], list(accumulate(w for _, w in pairs))
+
+
+def _heavy_tail(rng: random.Random, skew: float, cap: int) -> int:
+    """Power-law count >= 0: mostly 0-2, occasionally up to ``cap``."""
+    return min(cap, int(rng.paretovariate(max(skew, 0.1))) - 1)
+
+
+def npi_for(seed: int, index: int) -> str:
+    """Unique 10-digit NPI per index with a valid Luhn check digit (prefix 80840)."""
+    base = str(100000000 + (index * 7919 + seed * 104729) % 900000000)
+    digits = [int(c) for c in "80840" + base]
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return base + str((10 - total % 10) % 10)
+
+
+def screenshot_pool(seed: int, size: int = SCREENSHOT_POOL) -> List[bytes]:
+    """Deterministic fake PNGs (2-20 KB) shared by the saved_files rows."""
+    rng = random.Random(f"{seed}:screenshots")
+    header = b"\x89PNG\r\n\x1a\n"
+    return [header + rng.randbytes(rng.randint(2048, 20480)) for _ in range(size)]
+
+
+def _date(d: date, fmt: str) -> str:
+    return d.strftime(fmt)
+
+
+def _documents(rng: random.Random, app: Dict[str, Any], as_of: datetime) -> Dict[str, Dict[str, Any]]:
+    """file_type -> (filename, ocr, verification) of one provider, shaped like the ingest scripts' payloads."""
+    name, first, last, npi = app["name"], app["_first"], app["last_name"], app["npi"]
+    today = as_of.date()
+    # Expirations spread from already-expired to ~3 years out
+    license_exp = today + timedelta(days=rng.randint(-120, 1100))
+    dea_exp = today + timedelta(days=rng.randint(-60, 1100))
+    policy_exp = today + timedelta(days=rng.randint(-30, 365))
+    board_end = today + timedelta(days=rng.randint(-200, 3650))
+    match = lambda p: "Match" if rng.random() < p else "Mismatch"  # noqa: E731
+    docs = {
+        "DEA": (f"dea_{app['form_id']}.json", {
+            "Registrant Name": name.upper(),
+            "DEA Registration Number": f"{last[0]}{first[0]}{rng.randint(1000000, 9999999)}",
+            "Business Address": app["address"],
+            "Controlled Substance Schedules": rng.choice(["2, 2N, 3, 3N, 4, 5", "2, 3, 4, 5", "4, 5"]),
+            "Business Activity": "PRACTITIONER",
+            "Issue Date": _date(dea_exp - timedelta(days=1095), "%B %d, %Y"),
+            "Expiration Date": _date(dea_exp, "%B %d, %Y"),
+        }, {"pdf_format_match": match(0.95), "comment_1": None, "dea_verification": rng.choice(["Done", "Pending"])}),
+        "CV": (f"cv_{app['form_id']}.json", {
+            "Provider Name": name,
+            "Medical Education": f"MD, {rng.choice(['Stanford', 'UCLA', 'Johns Hopkins', 'UCSF', 'Baylor'])} School of Medicine",
+            "Postgraduate Training": f"Residency in {app['specialty']}",
+            "Board Certification": f"American Board of {app['specialty']}",
+            "Most Recent Work History": f"{rng.choice(CITIES).title()} Medical Group ({rng.randint(2005, 2024)}-Present)",
+        }, {"pdf_format_match": match(0.9), "verification_summary": rng.choice(["Verified", "Gap in work history"])}),
+        "MEDICAL_TRAINING_CERTIFICATE": (f"medical_cert_{app['form_id']}.json", {
+            "Issuer": f"{rng.choice(CITIES).title()} University Hospital",
+            "Recipient Name": name,
+            "Title/Degree": "Residency Certificate",
+            "Field of Study": app["specialty"],
+            "Date of Certification": _date(today - timedelta(days=rng.randint(700, 9000)), "%m/%d/%Y"),
+            "Document Type": "Certificate",
+            "Certificate No.": f"MC-{rng.randint(100000, 999999)}",
+        }, {"Demo_Verification_Attribute1 (PDF Format Match)": match(0.9), "Comment 1": ""}),
+        "malpractice_insurance": (f"malpractice_{app['form_id']}.json", {
+            "Insured Name": name,
+            "Insurer Name": rng.choice(["The Doctors Company", "MedPro Group", "ProAssurance", "NORCAL"]),
+            "Policy Number": f"PL{rng.randint(10000000, 99999999)}",
+            "Policy Effective Date": _date(policy_exp - timedelta(days=365), "%m/%d/%Y"),
+            "Policy Expiration Date": _date(policy_exp, "%m/%d/%Y"),
+            "Liability Limit (Per Claim)": "$1,000,000",
+            "Liability Limit (Aggregate)": "$3,000,000",
+        }, {"pdf_format_match": match(0.95), "comment_1": None, "verification_status": match(0.9)}),
+        "board_certification": (f"{npi}_Board_Certificate.png", {
+            "abms_name": name,
+            "abms_certification_board": f"American Board of {app['specialty']}",
+            "abms_certification_type": "General",
+            "abms_status": rng.choices(["Certified", "Not Certified", "Expired"], [90, 6, 4])[0],
+            "abms_start_date": _date(board_end - timedelta(days=3650), "%m/%d/%Y"),
+            "abms_end_date": _date(board_end, "%m/%d/%Y"),
+            "abms_reverification_date": _date(board_end - timedelta(days=rng.randint(0, 365)), "%m/%d/%Y"),
+            "abms_participating_in_moc": rng.choice(["Yes", "No"]),
+        }, {"pdf_format_match": match(0.95), "board_certificate_match": match(0.9), "certification_status": "Active"}),
+        "license_board": (f"{npi}_Licence.png", {
+            "LicenseBoard_ExtractedLicense": f"{rng.choice('AGCP')}{rng.randint(10000, 199999)}",
+            "LicenseBoard_Extracted_Name": f"{last.upper()}, {first.upper()}",
+            "LicenseBoard_Extracted_License_Type": "Physician and Surgeon",
+            "LicenseBoard_Extracted_Primary_Status": rng.choices(["License Renewed & Current", "Delinquent", "Revoked"],
+                                                                 [92, 6, 2])[0],
+            "LicenseBoard_Extracted_Address": app["address"],
+            "LicenseBoard_Extracted_Issuance_Date": _date(license_exp - timedelta(days=rng.randint(800, 9000)), "%m/%d/%Y"),
+            "LicenseBoard_Extracted_Expiration_Date": _date(license_exp, "%m/%d/%Y"),
+            "LicenseBoard_Extracted_Disciplinary_Actions": rng.choices(["No", "Yes"], [97, 3])[0],
+        }, {"pdf_format_match": match(0.95), "license_number_match": match(0.93), "dates_match_status": match(0.9)}),
+        "npi": (f"{npi}_NPI.png", {}, {
+            "source": "NPPES", "npi": npi, "verified": rng.random() < 0.97,
+            "deactivatedDate": None, "comment": None,
+        }),
+    }
+    if app["psv_status"] == "SANCTIONED":
+        docs["sanctions"] = (f"sanctions_{app['form_id']}.json", None, {
+            "source": "Other_Attributes_Schema.xlsx:Sanctioned",
+            "npi": npi,
+            "provider": {"first_name": first, "last_name": last, "name": name},
+            "sanction": {"status": "Sanctioned", "details": "OIG exclusion 1128(b)(4)", "comment_1": None, "comment_2": None},
+        })
+    return docs
+
+
+def generate_chunk(task: tuple) -> Dict[str, Any]:
+    """Rows of applications ``start``..``stop`` (exclusive). Pure function of its arguments."""
+    seed, skew, chunk, start, stop, pool_shas = task
+    rng = random.Random(f"{seed}:{chunk}")
+    as_of = AS_OF
+    spec_cw = _zipf_weights(len(SPECIALTIES), skew)
+    market_cw = _zipf_weights(len(MARKETS), skew)
+    assignee_cw = _zipf_weights(len(ASSIGNEES), skew)
+    pool_cw = _zipf_weights(len(pool_shas), skew)
+    psv_values, psv_cw = _weighted(PSV_STATUSES)
+    doc_values, doc_cw = _weighted(DOC_STATUSES)
+    event_values, event_cw = _weighted(EVENT_TYPES)
+
+    out: Dict[str, List] = {name: [] for name, _ in TABLES}
+    for i in range(start, stop):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        form_id = str(uuid.uuid5(NAMESPACE, f"{seed}:form:{i}"))
+        app_id = f"APP-{i:07d}"
+        market = rng.choices(MARKETS, cum_weights=market_cw)[0]
+        specialty = rng.choices(SPECIALTIES, cum_weights=spec_cw)[0]
+        psv_status = rng.choices(psv_values, cum_weights=psv_cw)[0]
+        created = as_of - timedelta(days=rng.randint(0, 720), seconds=rng.randint(0, 86399))
+        updated = min(as_of, created + timedelta(days=rng.randint(0, 90)))
+        app = {
+            "id": app_id,
+            "provider_id": f"P{i:07d}",
+            "form_id": form_id,
+            "name": f"{first} {last}",
+            "last_name": last,
+            "email": f"{first.lower()}.{last.lower()}.{i}@example.com",
+            "phone": f"{rng.randint(201, 989)}-555-{rng.randint(0, 9999):04d}",
+            "specialty": specialty,
+            "address": f"{rng.randint(1, 9999)} {rng.choice(['MAIN', 'OAK', 'PINE', 'MAPLE', 'CEDAR'])} ST "
+                       f"{rng.choice(CITIES)} {market} {rng.randint(10000, 99999)}",
+            "npi": npi_for(seed, i),
+            "psv_status": psv_status,
+            "committee_status": COMMITTEE_STATUSES[psv_status],
+            "psv_original_label": psv_status.replace("_", " ").title(),
+            "progress": rng.randint(0, 100),
+            "assignee": rng.choices(ASSIGNEES, cum_weights=assignee_cw)[0],
+            "source": rng.choice(SOURCES),
+            "market": market,
+            "create_dt": _ts(created),
+            "last_updt_dt": _ts(updated),
+            "_first": first,
+        }
+        out["form_data"].append({
+            "form_id": form_id, "provider_id": app["provider_id"], "provider_name": first, "provider_last_name": last,
+            "npi": app["npi"], "dob": _date(date(1950, 1, 1) + timedelta(days=rng.randint(0, 17000)), "%Y-%m-%d"),
+            "email": app["email"], "phone": app["phone"], "specialty": specialty, "address": app["address"],
+            "degree_type": "MD", "university": rng.choice(["Stanford", "UCLA", "Johns Hopkins", "UCSF", "Baylor"]),
+            "year": str(rng.randint(1975, 2020)), "experience": str(rng.randint(1, 40)),
+            "last_org": f"{rng.choice(CITIES).title()} Medical Group", "info_correct": 1, "consent_verification": 1,
+        })
+
+        for file_type, (filename, ocr, verification) in _documents(rng, app, as_of).items():
+            # Older versions first (status Replaced), then the current one
+            for version in range(_heavy_tail(rng, skew + 1, HISTORY_CAP), -1, -1):
+                touched = updated - timedelta(days=version * rng.randint(1, 30))
+                doc = {
+                    "form_id": form_id, "filename": filename, "file_extension": filename.rsplit(".", 1)[-1],
+                    "file_type": file_type,
+                    "status": "Replaced" if version else rng.choices(doc_values, cum_weights=doc_cw)[0],
+                    "ocr_output": _json(ocr) if ocr is not None else None, "pdf_match": None,
+                    "json_match": _json({"name": {"match": rng.random() < 0.9, "extracted": app["name"],
+                                                  "provided": app["name"], "extracted_confident_score": 0.97}}),
+                    "verification_data": _json(verification) if verification is not None else None,
+                    "updated_at": _ts(touched),
+                }
+                local = len(out["uploaded_documents"])
+                out["uploaded_documents"].append(doc)
+                if version == 0:
+                    out["current_documents"].append(
+                        {"form_id": form_id, "file_type": file_type, "_doc": local, "updated_at": doc["updated_at"]})
+                    for row in extract_fields(file_type, {"ocr_output": ocr, "verification_data": verification}):
+                        value_date = row["value_date"].isoformat() if row["value_date"] else None
+                        out["document_fields"].append(
+                            dict(row, value_date=value_date, _doc=local, form_id=form_id, file_type=file_type))
+
+        for k in range(1 + _heavy_tail(rng, skew, EMAIL_CAP)):
+            out["email_records"].append({
+                "id": str(uuid.uuid5(NAMESPACE, f"{seed}:email:{i}:{k}")), "application_id": app_id,
+                "recipient_email": app["email"], "subject": f"Regarding your application {app_id}",
+                "body": "Please upload your updated documents." if k % 2 else "Thanks for your submission.",
+                "status": "DRAFT" if k % 3 == 2 else "SENT",
+                "sent_at": _ts(created + timedelta(hours=k * rng.randint(1, 48))),
+            })
+        for k in range(2 + _heavy_tail(rng, skew, EVENT_CAP)):
+            event_type = rng.choices(event_values, cum_weights=event_cw)[0]
+            out["application_events"].append({
+                "application_id": app_id, "event_type": event_type,
+                "message": {"SYSTEM": "Document processed", "STATUS_CHANGE": f"PSV status set to {psv_status}",
+                            "COMMENT": "Requested updated malpractice certificate"}[event_type],
+                "created_at": _ts(created + timedelta(minutes=k * rng.randint(5, 600))),
+            })
+        for attribute, filename in (("npi", f"{app['npi']}_NPI.png"),
+                                    ("board_certificate", f"{app['npi']}_Board_Certificate.png"),
+                                    ("license_board_certification", f"{app['npi']}_Licence.png")):
+            if rng.random() < 0.8:
+                out["saved_files"].append({
+                    "filename": filename, "file_type": "png", "attribute": attribute,
+                    "blob_sha256": rng.choices(pool_shas, cum_weights=pool_cw)[0], "created_at": app["create_dt"],
+                })
+        del app["_first"]
+        out["applications"].append(app)
+    return out
+
+
+def _insert_sql(table: str, columns: List[str]):
+    from sqlalchemy import text
+
+    return text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})")
+
+
+def _store_screenshots(conn, seed: int) -> List[str]:
+    """Put the screenshot pool in the blob store; file_blobs.ref_count is set after the load."""
+    from sqlalchemy import text
+
+    from app.services.blob_store import place_blob
+    from app.services.upload_service import PARTIAL_DIR
+
+    shas = []
+    for blob in screenshot_pool(seed):
+        sha256 = hashlib.sha256(blob).hexdigest()
+        tmp = os.path.join(PARTIAL_DIR, f"{uuid.uuid4()}.upload")
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        place_blob(tmp, sha256)
+        conn.execute(
+            text("INSERT OR IGNORE INTO file_blobs (sha256, size, ref_count, created_at) VALUES (:s, :n, 0, :t)"),
+            {"s": sha256, "n": len(blob), "t": _ts(AS_OF)},
+        )
+        shas.append(sha256)
+    return shas
+
+
+def populate(apps: int, seed: int = 1, skew: float = 1.2, workers: Optional[int] = None,
+             chunk_size: int = CHUNK_SIZE, fast: bool = False) -> Dict[str, int]:
+    """Generate ``apps`` applications into DATABASE_URL (which must have no applications yet).
+    Returns row counts per table."""
+    import db_script
+    from sqlalchemy import text
+
+    from app.database import Base, engine
+    import app.models  # noqa: F401  (registers the tables)
+
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(text("SELECT COUNT(*) FROM applications")).scalar():
+            raise RuntimeError("synthetic_data.populate needs a database without applications")
+
+    workers = workers or os.cpu_count() or 1
+    statements = {name: _insert_sql(name, cols) for name, cols in TABLES}
+    counts = {name: 0 for name, _ in TABLES}
+    started = time.perf_counter()
+    with db_script.load_connection(fast) as conn:
+        pool_shas = _store_screenshots(conn, seed)
+        next_doc_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM uploaded_documents")).scalar() + 1
+        tasks = [(seed, skew, k, start, min(start + chunk_size, apps), pool_shas)
+                 for k, start in enumerate(range(0, apps, chunk_size))]
+        with Pool(workers) if workers > 1 else _InlinePool() as pool:
+            for k, chunk in enumerate(pool.imap(generate_chunk, tasks)):
+                # Document ids are assigned here, in chunk order, so they do not depend on --workers
+                for doc in chunk["uploaded_documents"]:
+                    doc["id"] = next_doc_id
+                    next_doc_id += 1
+                base = chunk["uploaded_documents"][0]["id"] if chunk["uploaded_documents"] else 0
+                for name in ("current_documents", "document_fields"):
+                    for row in chunk[name]:
+                        row["uploaded_document_id"] = base + row.pop("_doc")
+                for name, _ in TABLES:
+                    if chunk[name]:
+                        conn.execute(statements[name], chunk[name])
+                        counts[name] += len(chunk[name])
+                print(f"  chunk {k + 1}/{len(tasks)}: {counts['applications']:,} applications "
+                      f"({time.perf_counter() - started:.1f}s)")
+        conn.execute(text(
+            "UPDATE file_blobs SET ref_count = ref_count + "
+            "(SELECT COUNT(*) FROM saved_files s WHERE s.blob_sha256 = file_blobs.sha256) "
+            "WHERE sha256 IN (SELECT DISTINCT blob_sha256 FROM saved_files)"
+        ))
+    db_script.analyze()
+    print(f"Generated {counts} in {time.perf_counter() - started:.1f}s")
+    return counts
+
+
+class _InlinePool:
+    """Pool stand-in for --workers 1 (no subprocesses)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap(self, fn, items):
+        return map(fn, items)
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(name, cast, default):
+        if name in args:
+            i = args.index(name)
+            value = cast(args[i + 1])
+            del args[i:i + 2]
+            return value
+        return default
+
+    seed = option("--seed", int, 1)
+    skew = option("--skew", float, 1.2)
+    workers = option("--workers", int, None)
+    chunk_size = option("--chunk-size", int, CHUNK_SIZE)
+    fast = "--fast" in args
+    apps = next((int(a) for a in args if a.isdigit()), 100000)
+    populate(apps, seed=seed, skew=skew, workers=workers, chunk_size=chunk_size, fast=fast)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,37 @@ import csv
 import re
 import uuid
 import json
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Iterable, Iterator
 from sqlalchemy import create_engine
 from sqlalchemy.sql import text
 from datetime import datetime
 
+from app.models import refresh_document_fields
+from app.services.upload_service import current_documents_upsert_sql
+
 # SQLite database URL
-DATABASE_URL = "sqlite:///./credential.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./credential.db")
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 
+# Seeding writes rows with one executemany per table per chunk of applications.
+# --chunk-size N changes the chunk; --fast turns off the rollback journal and fsync for
+# the load (a crash mid-load can corrupt the file, so only for throwaway/test databases).
+CHUNK_SIZE = 5000
+FAST_PRAGMAS = {"journal_mode": "OFF", "synchronous": "OFF", "temp_store": "MEMORY", "cache_size": "-200000"}
+SAFE_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL", "temp_store": "DEFAULT", "cache_size": "-2000"}
+
+PSV_STATUS_MAP = {
+    'New': 'NEW',
+    'In-Progress': 'IN_PROGRESS',
+    'In Progress': 'IN_PROGRESS',
+    'Completed': 'COMPLETED',
+    'Approved': 'APPROVED',
+    'Denied': 'DENIED',
+}
+
 def _normalize_status(s: str) -> str:
     if not s:
         return "New"
@@ -86,166 +108,275 @@ def load_applications_from_csv(csv_path: str) -> list[dict]:
             apps.append(_mk_app_from_csv_row(row, i))
     return apps
 
-def bulk_insert(apps: list[dict]):
-    now = datetime.now()
-    insert_sql = text(
-        """
-        INSERT OR REPLACE INTO applications (
-            id, provider_id, form_id, name, last_name, email, phone, status, progress, assignee,
-            source, market, specialty, address, npi,
-            create_dt, last_updt_dt
-        ) VALUES (
-            :id, :provider_id, :form_id, :name, :last_name, :email, :phone, :status, :progress, :assignee,
-            :source, :market, :specialty, :address, :npi,
-            :create_dt, :last_updt_dt
-        )
-        """
+INSERT_APPLICATION = text(
+    """
+    INSERT OR REPLACE INTO applications (
+        id, provider_id, form_id, name, last_name, email, phone, psv_status, committee_status,
+        psv_original_label, progress, assignee, source, market, specialty, address, npi,
+        create_dt, last_updt_dt
+    ) VALUES (
+        :id, :provider_id, :form_id, :name, :last_name, :email, :phone, :psv_status, :committee_status,
+        :psv_original_label, :progress, :assignee, :source, :market, :specialty, :address, :npi,
+        :create_dt, :last_updt_dt
     )
+    """
+)
 
-    with engine.begin() as conn:
-        for app in apps:
-            conn.execute(
-                insert_sql,
-                {
-                    "id": app["id"],
-                    "provider_id": app["provider_id"],
-                    "form_id": app["form_id"],
-                    "name": app["name"],
-                    "last_name": app.get("last_name"),
-                    "email": app.get("email"),
-                    "phone": app.get("phone"),
-                    "status": app["status"],
-                    "progress": app["progress"],
-                    "assignee": app["assignee"],
-                    "source": app["source"],
-                    "market": app["market"],
-                    "specialty": app["specialty"],
-                    "address": app["address"],
-                    "npi": app["npi"],
-                    "create_dt": now,
-                    "last_updt_dt": now,
-                },
-            )
-    print("✅ Applications inserted successfully.")
-
-def seed_related_data(apps: list[dict]):
-    now = datetime.now()
-
-    insert_form_data = text(
-        """
-        INSERT OR REPLACE INTO form_data (
-            form_id, provider_id, provider_name, provider_last_name, npi, email, phone, specialty, address
-        ) VALUES (
-            :form_id, :provider_id, :provider_name, :provider_last_name, :npi, :email, :phone, :specialty, :address
-        )
-        """
+INSERT_FORM_DATA = text(
+    """
+    INSERT OR REPLACE INTO form_data (
+        form_id, provider_id, provider_name, provider_last_name, npi, email, phone, specialty, address
+    ) VALUES (
+        :form_id, :provider_id, :provider_name, :provider_last_name, :npi, :email, :phone, :specialty, :address
     )
+    """
+)
 
-    insert_upload = text(
-        """
-        INSERT INTO form_file_uploads (
-            form_id, filename, file_extension, file_type, status, ocr_output, pdf_match, json_match
-        ) VALUES (
-            :form_id, :filename, :file_extension, :file_type, :status, :ocr_output, :pdf_match, :json_match
-        )
-        """
+INSERT_UPLOAD = text(
+    """
+    INSERT INTO uploaded_documents (
+        form_id, filename, file_extension, file_type, status, ocr_output, pdf_match, json_match
+    ) VALUES (
+        :form_id, :filename, :file_extension, :file_type, :status, :ocr_output, :pdf_match, :json_match
     )
+    """
+)
 
-    insert_email = text(
-        """
-        INSERT INTO email_records (
-            id, application_id, recipient_email, subject, body, status, sent_at
-        ) VALUES (
-            :id, :application_id, :recipient_email, :subject, :body, :status, :sent_at
-        )
-        """
+INSERT_EMAIL = text(
+    """
+    INSERT INTO email_records (
+        id, application_id, recipient_email, subject, body, status, sent_at
+    ) VALUES (
+        :id, :application_id, :recipient_email, :subject, :body, :status, :sent_at
     )
+    """
+)
+
+# New uploads become their form's current document of that type
+SET_CURRENT_DOCUMENTS = text(current_documents_upsert_sql(
+    "SELECT form_id, file_type, MAX(id) FROM uploaded_documents WHERE id > :after_id GROUP BY form_id, file_type"
+))
+
+
+def refresh_new_document_fields(conn, after_id: int) -> int:
+    """document_fields for uploads inserted with raw SQL after ``after_id`` (no ORM listeners ran)."""
+    ids = [r[0] for r in conn.execute(text("SELECT id FROM uploaded_documents WHERE id > :after_id"), {"after_id": after_id})]
+    return refresh_document_fields(conn.connection.cursor(), ids)
+
+
+def _chunks(items: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _set_pragmas(conn, pragmas: dict):
+    for name, value in pragmas.items():
+        conn.exec_driver_sql(f"PRAGMA {name}={value}")
+
+
+@contextmanager
+def load_connection(fast: bool = False):
+    """One transaction for a whole load; with ``fast``, FAST_PRAGMAS apply until it ends."""
+    with engine.connect() as conn:
+        if fast:
+            _set_pragmas(conn, FAST_PRAGMAS)  # journal_mode can't change inside a transaction
+            conn.commit()
+        try:
+            with conn.begin():
+                yield conn
+        finally:
+            if fast:
+                _set_pragmas(conn, SAFE_PRAGMAS)
+                conn.commit()
+
+
+def executemany_chunked(conn, statement, apps: Iterable[dict], to_rows: Callable[[list[dict], datetime], list[dict]],
+                        chunk_size: int = CHUNK_SIZE) -> int:
+    """Run ``statement`` once per chunk of ``apps`` with the rows ``to_rows`` builds for it."""
+    now = datetime.now()
+    count = 0
+    for chunk in _chunks(apps, chunk_size):
+        rows = to_rows(chunk, now)
+        conn.execute(statement, rows)
+        count += len(rows)
+    return count
 
-    with engine.begin() as conn:
-        for app in apps:
-            # Seed form_data
-            provider_name = app["name"].replace("Dr. ", "").strip()
-            conn.execute(
-                insert_form_data,
-                {
-                    "form_id": app["form_id"],
-                    "provider_id": app["provider_id"],
-                    "provider_name": provider_name,
-                    "provider_last_name": app.get("last_name"),
-                    "npi": app["npi"],
-                    "email": app.get("email"),
-                    "phone": app.get("phone"),
-                    "specialty": app["specialty"],
-                    "address": app["address"],
-                },
-            )
-
-            # Seed two uploads (DL and NPI)
-            json_match_ok = {
-                "name": {"match": True, "extracted_confident_score": 0.98, "extracted": provider_name, "provided": provider_name}
-            }
-            json_match_bad = {
-                "address": {"match": False, "extracted_confident_score": 0.75, "extracted": "123 Wrong St", "provided": app["address"]}
-            }
 
-            conn.execute(
-                insert_upload,
-                {
-                    "form_id": app["form_id"],
-                    "filename": f"dl_{app['id'].lower()}.pdf",
-                    "file_extension": "pdf",
-                    "file_type": "DRIVING_LICENSE",
-                    "status": "APPROVED" if app["progress"] >= 75 else "In Progress",
-                    "ocr_output": "{}",
-                    "pdf_match": None,
-                    "json_match": json.dumps(json_match_ok),
-                },
-            )
-            conn.execute(
-                insert_upload,
-                {
-                    "form_id": app["form_id"],
-                    "filename": f"npi_{app['id'].lower()}.pdf",
-                    "file_extension": "pdf",
-                    "file_type": "NPI",
-                    "status": "In Progress" if app["status"] != "Completed" else "APPROVED",
-                    "ocr_output": "{}",
-                    "pdf_match": None,
-                    "json_match": json.dumps(json_match_bad),
-                },
-            )
-
-            # Seed two emails (one SENT, one DRAFT)
-            conn.execute(
-                insert_email,
-                {
-                    "id": str(uuid.uuid4()),
-                    "application_id": app["id"],
-                    "recipient_email": app["email"],
-                    "subject": f"Regarding your application {app['id']}",
-                    "body": "Thanks for your submission. We'll get back to you soon.",
-                    "status": "SENT",
-                    "sent_at": now,
-                },
-            )
-            conn.execute(
-                insert_email,
-                {
-                    "id": str(uuid.uuid4()),
-                    "application_id": app["id"],
-                    "recipient_email": app["email"],
-                    "subject": f"Additional info needed for {app['id']}",
-                    "body": "Please upload your updated documents.",
-                    "status": "DRAFT",
-                    "sent_at": now,
-                },
-            )
-        print("✅ Related form_data, uploads, and email_records inserted.")
+def _max_upload_id(conn) -> int:
+    return conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM uploaded_documents")).scalar()
+
+
+def analyze():
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+    print("📊 ANALYZE complete.")
+
+
+def application_rows(apps: list[dict], now: datetime) -> list[dict]:
+    return [
+        {
+            "id": app["id"],
+            "provider_id": app["provider_id"],
+            "form_id": app["form_id"],
+            "name": app["name"],
+            "last_name": app.get("last_name"),
+            "email": app.get("email"),
+            "phone": app.get("phone"),
+            "psv_status": PSV_STATUS_MAP.get(app["status"], "NEW"),
+            "committee_status": "NOT_STARTED",
+            "psv_original_label": app["status"],
+            "progress": app["progress"],
+            "assignee": app["assignee"],
+            "source": app["source"],
+            "market": app["market"],
+            "specialty": app["specialty"],
+            "address": app["address"],
+            "npi": app["npi"],
+            "create_dt": now,
+            "last_updt_dt": now,
+        }
+        for app in apps
+    ]
+
+
+def form_data_rows(apps: list[dict], now: datetime) -> list[dict]:
+    rows = []
+    for app in apps:
+        rows.append({
+            "form_id": app["form_id"],
+            "provider_id": app["provider_id"],
+            "provider_name": app["name"].replace("Dr. ", "").strip(),
+            "provider_last_name": app.get("last_name"),
+            "npi": app["npi"],
+            "email": app.get("email"),
+            "phone": app.get("phone"),
+            "specialty": app["specialty"],
+            "address": app["address"],
+        })
+    return rows
+
+
+def upload_rows(apps: list[dict], now: datetime) -> list[dict]:
+    # Two uploads per application (DL and NPI)
+    rows = []
+    for app in apps:
+        provider_name = app["name"].replace("Dr. ", "").strip()
+        json_match_ok = {
+            "name": {"match": True, "extracted_confident_score": 0.98, "extracted": provider_name, "provided": provider_name}
+        }
+        json_match_bad = {
+            "address": {"match": False, "extracted_confident_score": 0.75, "extracted": "123 Wrong St", "provided": app["address"]}
+        }
+        rows.append({
+            "form_id": app["form_id"],
+            "filename": f"dl_{app['id'].lower()}.pdf",
+            "file_extension": "pdf",
+            "file_type": "DRIVING_LICENSE",
+            "status": "APPROVED" if app["progress"] >= 75 else "In Progress",
+            "ocr_output": "{}",
+            "pdf_match": None,
+            "json_match": json.dumps(json_match_ok),
+        })
+        rows.append({
+            "form_id": app["form_id"],
+            "filename": f"npi_{app['id'].lower()}.pdf",
+            "file_extension": "pdf",
+            "file_type": "NPI",
+            "status": "In Progress" if app["status"] != "Completed" else "APPROVED",
+            "ocr_output": "{}",
+            "pdf_match": None,
+            "json_match": json.dumps(json_match_bad),
+        })
+    return rows
+
+
+def email_rows(apps: list[dict], now: datetime) -> list[dict]:
+    # Two emails per application (one SENT, one DRAFT)
+    rows = []
+    for app in apps:
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "application_id": app["id"],
+            "recipient_email": app["email"],
+            "subject": f"Regarding your application {app['id']}",
+            "body": "Thanks for your submission. We'll get back to you soon.",
+            "status": "SENT",
+            "sent_at": now,
+        })
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "application_id": app["id"],
+            "recipient_email": app["email"],
+            "subject": f"Additional info needed for {app['id']}",
+            "body": "Please upload your updated documents.",
+            "status": "DRAFT",
+            "sent_at": now,
+        })
+    return rows
+
+
+def insert_related_chunk(conn, apps: list[dict], now: datetime) -> dict:
+    """form_data, uploads and emails of one chunk of applications, one executemany per table."""
+    counts = {}
+    for name, statement, to_rows in (
+        ("form_data", INSERT_FORM_DATA, form_data_rows),
+        ("uploaded_documents", INSERT_UPLOAD, upload_rows),
+        ("email_records", INSERT_EMAIL, email_rows),
+    ):
+        rows = to_rows(apps, now)
+        conn.execute(statement, rows)
+        counts[name] = len(rows)
+    return counts
+
+
+def bulk_insert(apps: list[dict], chunk_size: int = CHUNK_SIZE, fast: bool = False):
+    with load_connection(fast) as conn:
+        count = executemany_chunked(conn, INSERT_APPLICATION, apps, application_rows, chunk_size)
+    print(f"✅ {count} applications inserted successfully.")
+
+
+def seed_related_data(apps: list[dict], chunk_size: int = CHUNK_SIZE, fast: bool = False):
+    now = datetime.now()
+    totals: dict = {}
+    with load_connection(fast) as conn:
+        after_id = _max_upload_id(conn)
+        for chunk in _chunks(apps, chunk_size):
+            for name, n in insert_related_chunk(conn, chunk, now).items():
+                totals[name] = totals.get(name, 0) + n
+        conn.execute(SET_CURRENT_DOCUMENTS, {"after_id": after_id})
+        refresh_new_document_fields(conn, after_id)
+    print(f"✅ Related data inserted: {totals}")
+
+
+def seed_applications(apps: Iterable[dict], chunk_size: int = CHUNK_SIZE, fast: bool = False) -> dict:
+    """Applications plus related rows in a single streaming pass (``apps`` may be a generator),
+    then current_documents and ANALYZE."""
+    started = datetime.now()
+    totals = {"applications": 0}
+    with load_connection(fast) as conn:
+        after_id = _max_upload_id(conn)
+        for chunk in _chunks(apps, chunk_size):
+            now = datetime.now()
+            conn.execute(INSERT_APPLICATION, application_rows(chunk, now))
+            totals["applications"] += len(chunk)
+            for name, n in insert_related_chunk(conn, chunk, now).items():
+                totals[name] = totals.get(name, 0) + n
+        conn.execute(SET_CURRENT_DOCUMENTS, {"after_id": after_id})
+        refresh_new_document_fields(conn, after_id)
+    analyze()
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"✅ Seeded {totals} in {elapsed:.1f}s")
+    return totals
+
 
 def reset_all():
     with engine.begin() as conn:
         conn.execute(text("DELETE FROM email_records"))
-        conn.execute(text("DELETE FROM form_file_uploads"))
+        conn.execute(text("DELETE FROM document_fields"))
+        conn.execute(text("DELETE FROM current_documents"))
+        conn.execute(text("DELETE FROM uploaded_documents"))
         conn.execute(text("DELETE FROM form_data"))
         conn.execute(text("DELETE FROM applications"))
         print("🧹 Cleared existing data from all tables.")
@@ -262,7 +393,7 @@ def _parse_completion(value: str) -> int:
     except Exception:
         return 0
 
-def import_applications_from_csv(csv_path: str, truncate: bool = True):
+def import_applications_from_csv(csv_path: str, truncate: bool = True, chunk_size: int = CHUNK_SIZE):
     if not os.path.isabs(csv_path):
         csv_path = os.path.abspath(csv_path)
     if not os.path.exists(csv_path):
@@ -273,17 +404,39 @@ def import_applications_from_csv(csv_path: str, truncate: bool = True):
     insert_sql = text(
         """
         INSERT INTO applications (
-            id, provider_id, form_id, name, status, progress, assignee,
+            id, provider_id, form_id, name, psv_status, committee_status, psv_original_label, progress, assignee,
             source, market, specialty, address, npi,
             create_dt, last_updt_dt
         ) VALUES (
-            :id, :provider_id, :form_id, :name, :status, :progress, :assignee,
+            :id, :provider_id, :form_id, :name, :psv_status, :committee_status, :psv_original_label, :progress, :assignee,
             :source, :market, :specialty, :address, :npi,
             :create_dt, :last_updt_dt
         )
         """
     )
 
+    def rows(reader):
+        for row in reader:
+            status = row.get("Status", "").strip()
+            yield {
+                "id": row.get("App ID", "").strip(),
+                "provider_id": None,
+                "form_id": None,
+                "name": row.get("Name", "").strip(),
+                "psv_status": PSV_STATUS_MAP.get(_normalize_status(status), "NEW"),
+                "committee_status": "NOT_STARTED",
+                "psv_original_label": status,
+                "progress": _parse_completion(row.get("Completion")),
+                "assignee": row.get("Assignee", "").strip(),
+                "source": row.get("Source", "").strip(),
+                "market": row.get("Market", "").strip(),
+                "specialty": row.get("Specialty", "").strip(),
+                "address": None,
+                "npi": None,
+                "create_dt": now,
+                "last_updt_dt": now,
+            }
+
     with engine.begin() as conn:
         if truncate:
             conn.execute(text("DELETE FROM applications"))
@@ -299,27 +452,9 @@ def import_applications_from_csv(csv_path: str, truncate: bool = True):
                 raise RuntimeError(f"CSV missing required columns: {missing}")
 
             count = 0
-            for row in reader:
-                conn.execute(
-                    insert_sql,
-                    {
-                        "id": row.get("App ID", "").strip(),
-                        "provider_id": None,
-                        "form_id": None,
-                        "name": row.get("Name", "").strip(),
-                        "status": row.get("Status", "").strip(),
-                        "progress": _parse_completion(row.get("Completion")),
-                        "assignee": row.get("Assignee", "").strip(),
-                        "source": row.get("Source", "").strip(),
-                        "market": row.get("Market", "").strip(),
-                        "specialty": row.get("Specialty", "").strip(),
-                        "address": None,
-                        "npi": None,
-                        "create_dt": now,
-                        "last_updt_dt": now,
-                    },
-                )
-                count += 1
+            for chunk in _chunks(rows(reader), chunk_size):
+                conn.execute(insert_sql, chunk)
+                count += len(chunk)
 
         print(f"✅ Imported {count} applications from '{csv_path}'.")
 
@@ -345,23 +480,23 @@ def run_manual_sql():
 def run_defined_sql():
     user_sql = """
     DELETE FROM email_records;
-    DELETE FROM form_file_uploads;
+    DELETE FROM document_fields;
+    DELETE FROM current_documents;
+    DELETE FROM uploaded_documents;
     DELETE FROM form_data;
     DELETE FROM applications;
     """
     with engine.connect() as conn:
         try:
-            result = conn.execute(text(user_sql.strip().rstrip(";")))
-            if result.returns_rows:
-                for row in result.fetchall():
-                    print(row)
-            else:
-                print("✅ Statement executed successfully.")
+            # sqlite3 runs one statement per execute
+            for statement in [q.strip() for q in user_sql.split(";") if q.strip()]:
+                conn.execute(text(statement))
+            print("✅ Statement executed successfully.")
             conn.commit()
         except Exception as e:
             print(f"❌ Error: {e}")
 
-def seed_demo(truncate: bool = True):
+def seed_demo(truncate: bool = True, chunk_size: int = CHUNK_SIZE, fast: bool = False):
     # Backwards-compatible demo: load from Downloads/newApplications.csv if present
     default_csv = os.path.expanduser(r"~\\Downloads\\newApplications.csv")
     apps = []
@@ -372,34 +507,44 @@ def seed_demo(truncate: bool = True):
         return
     if truncate:
         reset_all()
-    bulk_insert(apps)
-    seed_related_data(apps)
+    seed_applications(apps, chunk_size, fast)
 
-def seed_from_csv(csv_path: str, truncate: bool = True):
+def seed_from_csv(csv_path: str, truncate: bool = True, chunk_size: int = CHUNK_SIZE, fast: bool = False):
     apps = load_applications_from_csv(csv_path)
     if truncate:
         reset_all()
-    bulk_insert(apps)
-    seed_related_data(apps)
+    seed_applications(apps, chunk_size, fast)
+
+def _load_options(argv: list[str]) -> tuple[list[str], int, bool]:
+    """Strips ``--chunk-size N`` and ``--fast`` from argv."""
+    args = list(argv)
+    chunk_size = CHUNK_SIZE
+    if "--chunk-size" in args:
+        i = args.index("--chunk-size")
+        chunk_size = max(1, int(args[i + 1]))
+        del args[i:i + 2]
+    fast = "--fast" in args
+    return [a for a in args if a != "--fast"], chunk_size, fast
 
 if __name__ == "__main__":
-    # Support CLI mode for automation
-    if len(sys.argv) >= 2 and sys.argv[1] == "--import-csv":
-        csv_arg = sys.argv[2] if len(sys.argv) >= 3 else input("CSV path: ").strip()
+    # Support CLI mode for automation; --chunk-size N and --fast apply to the seeding modes
+    argv, chunk_size, fast = _load_options(sys.argv)
+    if len(argv) >= 2 and argv[1] == "--import-csv":
+        csv_arg = argv[2] if len(argv) >= 3 else input("CSV path: ").strip()
         truncate = True
-        if len(sys.argv) >= 4:
-            truncate = sys.argv[3].lower() in ("1", "true", "yes", "y")
-        import_applications_from_csv(csv_arg, truncate)
+        if len(argv) >= 4:
+            truncate = argv[3].lower() in ("1", "true", "yes", "y")
+        import_applications_from_csv(csv_arg, truncate, chunk_size)
         sys.exit(0)
-    if len(sys.argv) >= 2 and sys.argv[1] == "--seed-demo":
-        seed_demo(truncate=True)
+    if len(argv) >= 2 and argv[1] == "--seed-demo":
+        seed_demo(truncate=True, chunk_size=chunk_size, fast=fast)
         sys.exit(0)
-    if len(sys.argv) >= 2 and sys.argv[1] == "--seed-from-csv":
-        csv_arg = sys.argv[2] if len(sys.argv) >= 3 else input("CSV path: ").strip()
+    if len(argv) >= 2 and argv[1] == "--seed-from-csv":
+        csv_arg = argv[2] if len(argv) >= 3 else input("CSV path: ").strip()
         truncate = True
-        if len(sys.argv) >= 4:
-            truncate = sys.argv[3].lower() in ("1", "true", "yes", "y")
-        seed_from_csv(csv_arg, truncate)
+        if len(argv) >= 4:
+            truncate = argv[3].lower() in ("1", "true", "yes", "y")
+        seed_from_csv(csv_arg, truncate, chunk_size, fast)
         sys.exit(0)
 
     # Interactive menu
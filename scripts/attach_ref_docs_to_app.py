@@ -1,12 +1,21 @@
 import os
-import shutil
 import sqlite3
+import sys
 from datetime import datetime
 
-ROOT = os.path.dirname(os.path.dirname(__file__))
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app.services.blob_store import hash_file, place_blob
+from app.services.processing_queue import lane_for
+from app.models import refresh_document_fields
+from app.services.upload_service import current_documents_upsert_sql
+
 DB = os.path.join(ROOT, 'credential.db')
 REF_DIR = os.path.join(ROOT, 'ref_uploads')
 UPLOADS_DIR = os.path.join(ROOT, 'uploads')
+BLOB_DIR = os.path.join(UPLOADS_DIR, 'blobs')
 
 DOCS = {
     'dl': 'dl.pdf',
@@ -20,11 +29,12 @@ def attach(provider_id: str):
 
     with sqlite3.connect(DB) as con:
         cur = con.cursor()
-        cur.execute('SELECT id, form_id, name FROM applications WHERE provider_id=?', (provider_id,))
+        cur.execute('SELECT id, form_id, name, psv_status, committee_status FROM applications WHERE provider_id=?', (provider_id,))
         row = cur.fetchone()
         if not row:
             raise SystemExit(f'No application found for provider_id={provider_id}')
-        app_id, form_id, name = row
+        app_id, form_id, name, psv_status, committee_status = row
+        lane = lane_for(psv_status, committee_status, source='backfill')
         print(f'Found application {app_id} for {provider_id} -> form {form_id} ({name})')
 
         for ftype, ref_name in DOCS.items():
@@ -33,29 +43,45 @@ def attach(provider_id: str):
                 print(f'Skipping {ftype}: {src} missing')
                 continue
             dest_name = f'{ftype}__{form_id}.pdf'
-            dest = os.path.join(UPLOADS_DIR, dest_name)
-            shutil.copy2(src, dest)
-            print(f'Copied {src} -> {dest}')
+            # Reference files are shared by every application: store the bytes once and count references
+            sha, size = hash_file(src)
+            if place_blob(src, sha, move=False, blob_dir=BLOB_DIR):
+                print(f'Stored {src} as blob {sha}')
+            cur.execute('''
+                INSERT INTO file_blobs (sha256, size, ref_count, created_at)
+                VALUES (?, ?, 1, CURRENT_TIMESTAMP)
+                ON CONFLICT(sha256) DO UPDATE SET ref_count=ref_count+1
+            ''', (sha, size))
 
             # Mark previous file as Replaced for this type
             cur.execute('''
-                UPDATE form_file_uploads
+                UPDATE uploaded_documents
                 SET status='Replaced'
-                WHERE form_id=? AND LOWER(file_type)=? AND status!='Replaced'
+                WHERE id IN (SELECT uploaded_document_id FROM current_documents WHERE form_id=? AND LOWER(file_type)=?)
             ''', (form_id, ftype))
+            cur.execute('DELETE FROM current_documents WHERE form_id=? AND LOWER(file_type)=?', (form_id, ftype))
+            cur.execute('DELETE FROM application_issues WHERE form_id=? AND file_type=?', (form_id, ftype))
 
             # Insert new upload record
             cur.execute('''
-                INSERT INTO form_file_uploads (form_id, filename, file_extension, file_type, status, ocr_output, pdf_match, json_match)
-                VALUES (?, ?, 'pdf', ?, 'New', NULL, NULL, NULL)
-            ''', (form_id, dest_name, ftype))
+                INSERT INTO uploaded_documents (form_id, filename, file_extension, file_type, status, ocr_output, pdf_match, json_match, blob_sha256)
+                VALUES (?, ?, 'pdf', ?, 'New', NULL, NULL, NULL, ?)
+            ''', (form_id, dest_name, ftype, sha))
             cur.execute('SELECT last_insert_rowid()')
             upload_id = cur.fetchone()[0]
+            cur.execute(current_documents_upsert_sql(), (form_id, ftype, upload_id))
+            refresh_document_fields(cur, [upload_id])
             print(f'Inserted upload id={upload_id} type={ftype}')
 
             # Update link in form_data
             cur.execute(f'UPDATE form_data SET {ftype}_upload_id=? WHERE form_id=?', (upload_id, form_id))
 
+            # Queue OCR/matching behind live uploads unless the application is expedited
+            cur.execute('''
+                INSERT INTO processing_jobs (uploaded_document_id, form_id, application_id, lane, source, status, attempts, enqueued_at)
+                VALUES (?, ?, ?, ?, 'backfill', 'QUEUED', 0, CURRENT_TIMESTAMP)
+            ''', (upload_id, form_id, app_id, lane))
+
         con.commit()
         print('✓ Attachment complete')
 
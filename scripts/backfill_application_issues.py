@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Ensure project root is on sys.path when running directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.database import Base, SessionLocal, engine
+from app.models import Application, ApplicationIssue, CurrentDocument, UploadedDocument
+from app.services.issue_service import build_document_issues
+
+# Rebuilds application_issues from the json_match of every current document
+# (see current_documents). Safe to re-run: the table is cleared first.
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        app_ids = dict(db.query(Application.form_id, Application.id))
+        db.query(ApplicationIssue).delete(synchronize_session=False)
+        docs = (
+            db.query(UploadedDocument)
+            .join(CurrentDocument, CurrentDocument.uploaded_document_id == UploadedDocument.id)
+            .filter(UploadedDocument.json_match.isnot(None))
+            .yield_per(500)
+        )
+        doc_count = issue_count = 0
+        for doc in docs:
+            issues = build_document_issues(doc, app_ids.get(doc.form_id))
+            db.add_all(issues)
+            doc_count += 1
+            issue_count += len(issues)
+        db.commit()
+        print(f"Issue backfill complete. documents={doc_count} issues={issue_count}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import os
+import sys
+
+# Ensure project root is on sys.path when running directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.database import Base, SessionLocal, engine
+from app.models import DocumentField, UploadedDocument, document_field_rows
+
+# Rebuilds document_fields from every uploaded document. ORM writes and the raw-SQL
+# scripts (through app.models.refresh_document_fields) keep the table in sync; run this
+# after adding a field to PROMOTED_FIELDS.
+BATCH = 1000
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.query(DocumentField).delete(synchronize_session=False)
+        docs = db.query(UploadedDocument).yield_per(BATCH)
+        pending = []
+        doc_count = field_count = 0
+        for doc in docs:
+            pending.extend(document_field_rows(doc))
+            doc_count += 1
+            if len(pending) >= BATCH:
+                db.execute(DocumentField.__table__.insert(), pending)
+                field_count += len(pending)
+                pending = []
+        if pending:
+            db.execute(DocumentField.__table__.insert(), pending)
+            field_count += len(pending)
+        db.commit()
+        print(f"Document field backfill complete. documents={doc_count} fields={field_count}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import os
+import sys
+
+# Ensure project root is on sys.path when running directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.database import SessionLocal
+from app.services.upload_service import purge_stale_upload_sessions
+
+
+def main():
+    max_age_hours = int(sys.argv[1]) if len(sys.argv) >= 2 else 24
+    db = SessionLocal()
+    try:
+        result = purge_stale_upload_sessions(db, max_age_hours=max_age_hours)
+        print(
+            f"Upload session GC complete. expired={result['expired']} "
+            f"orphans_removed={result['orphans_removed']} bytes_freed={result['bytes_freed']}"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
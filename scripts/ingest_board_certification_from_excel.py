@@ -1,17 +1,17 @@
 import os
 import sys
-import json
-from typing import Any, Dict, List
+from typing import Any, Dict
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-import openpyxl  # type: ignore
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models import UploadedDocument, Application, FormData, SavedFile
+from app.services.entity_resolution import EntityResolver, normalize_npi
+from app.services.excel_ingest import ColumnMap, DocumentWriter, SheetReader, cell_str, commit_size_arg, header_contains, sheet_ledger
+from app.services.zip_ingest import ingest_zip
 
 EXCEL_PATH = os.path.join(PROJECT_ROOT, "data", "BoardCertificate_License_Schema.xlsx")
 SHEET_NAME = "Board_Certification"
@@ -31,201 +31,66 @@ def _s(val: Any) -> Any:
     return str(val)
 
 
-def detect_header_row(ws) -> int:
-    # Look for a header that contains either NPI, provider_name, or Board_ABMS_*
-    max_scan = min(8, ws.max_row)
-    for r in range(1, max_scan + 1):
-        vals = [(str(c.value) or "").strip().lower() for c in ws[r]]
-        if any("npi" in v for v in vals) or any(v.startswith("board_abms_") for v in vals) or any("provider_name" in v for v in vals):
-            return r
-    return 1
-
-
-def load_rows(path: str) -> List[Dict[str, Any]]:
-    wb = openpyxl.load_workbook(path, data_only=True)
-    if SHEET_NAME not in wb.sheetnames:
-        raise RuntimeError(f"Sheet '{SHEET_NAME}' not found in Excel file {path}")
-    ws = wb[SHEET_NAME]
-    header_row = detect_header_row(ws)
-    headers_by_idx: Dict[int, str] = {}
-    for j, cell in enumerate(ws[header_row], start=1):
-        headers_by_idx[j] = (str(cell.value) or "").strip()
-    rows: List[Dict[str, Any]] = []
-    for i in range(header_row + 1, ws.max_row + 1):
-        rec: Dict[str, Any] = {}
-        empty = True
-        for j, key in headers_by_idx.items():
-            v = ws.cell(row=i, column=j).value
-            rec[key] = v
-            if v not in (None, ""):
-                empty = False
-        if not empty:
-            rows.append(rec)
-    return rows
-
-
-def _norm_keys(rec: Dict[str, Any]) -> Dict[str, Any]:
-    # Normalize keys for fuzzy matching: lowercase and remove non-alphanumeric
-    out = {}
-    import re
-    for k, v in rec.items():
-        nk = re.sub(r"[^a-z0-9]", "", (str(k) or "").lower())
-        out[nk] = v
-    return out
-
-
-def _get_first(nrec: Dict[str, Any], candidates: List[str]):
-    for c in candidates:
-        if c in nrec and nrec[c] not in (None, ""):
-            return nrec[c]
-    return None
+def load_rows(path: str) -> SheetReader:
+    # Header row: the first with an NPI, provider_name or Board_ABMS_* cell
+    return SheetReader(path, SHEET_NAME, header_contains("npi", "board_abms_", "provider_name"))
+
+
+# Canonical OCR keys expected by API for board_certification
+OCR_COLUMNS = ColumnMap({
+    "abmsuid": ["Board_ABMS_Uid", "abmsuid"],
+    "abms_name": ["provider_name", "abms_name", "Board_ABMS_Name"],
+    "abms_dob": ["Board_ABMS_DOB", "dob"],
+    "abms_education": ["Board_ABMS_Education"],
+    "abms_address": ["Board_ABMS_Address"],
+    "abms_certification_board": ["Board_ABMS_CertificationBoard"],
+    "abms_certification_type": ["Board_ABMS_CertificationType"],
+    "abms_status": ["Board_ABMS_Status"],
+    "abms_duration": ["Board_ABMS_Duration"],
+    "abms_occurrence": ["Board_ABMS_Occurrence"],
+    "abms_start_date": ["Board_ABMS_StartDate"],
+    "abms_end_date": ["Board_ABMS_EndDate"],
+    "abms_reverification_date": ["Board_ABMS_ReverificationDate"],
+    "abms_participating_in_moc": ["Board_ABMS_ParticipatingInMoc"],
+})
+# Comments typically appear as Comment 1, Comment 2, Comment 3
+VERIFICATION_COLUMNS = ColumnMap({
+    "pdf_format_match": ["Demo_Verification_Attribute1 (PDF Format Match)", "PDF Format Match"],
+    "board_certificate_match": ["Demo_Verification_Attribute2 (Board Certificate Match)", "Board Certificate Match"],
+    "certification_status": ["Demo_Verification_Attribute3 (Certification Status)", "Certification Status"],
+    "comment_1": ["Comment 1"],
+    "comment_2": ["Comment 2"],
+    "comment_3": ["Comment 3"],
+})
+PROVIDER_COLUMNS = ColumnMap({
+    "npi": ["npi", "provider_npi"],
+    "first_name": ["provider_first_name", "first_name"],
+    "last_name": ["provider_last_name", "last_name"],
+})
 
 
 def build_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
-    nrec = _norm_keys(rec)
-    # Canonical OCR keys expected by API for board_certification
-    ocr = {
-        "abmsuid": _s(_get_first(nrec, [
-            "boardabmsuid", "abmsuid"
-        ])),
-        "abms_name": _s(_get_first(nrec, [
-            "providername", "provider_name", "abmsname", "boardabmsname"
-        ])),
-        "abms_dob": _s(_get_first(nrec, [
-            "boardabmsdob", "dob"
-        ])),
-        "abms_education": _s(_get_first(nrec, [
-            "boardabmseducation"
-        ])),
-        "abms_address": _s(_get_first(nrec, [
-            "boardabmsaddress"
-        ])),
-        "abms_certification_board": _s(_get_first(nrec, [
-            "boardabmscertificationboard"
-        ])),
-        "abms_certification_type": _s(_get_first(nrec, [
-            "boardabmscertificationtype"
-        ])),
-        "abms_status": _s(_get_first(nrec, [
-            "boardabmsstatus"
-        ])),
-        "abms_duration": _s(_get_first(nrec, [
-            "boardabmsduration"
-        ])),
-        "abms_occurrence": _s(_get_first(nrec, [
-            "boardabmsoccurrence"
-        ])),
-        "abms_start_date": _s(_get_first(nrec, [
-            "boardabmsstartdate", "boardabmsstart_date"
-        ])),
-        "abms_end_date": _s(_get_first(nrec, [
-            "boardabmsenddate", "boardabmsend_date"
-        ])),
-        "abms_reverification_date": _s(_get_first(nrec, [
-            "boardabmsreverificationdate"
-        ])),
-        "abms_participating_in_moc": _s(_get_first(nrec, [
-            "boardabmsparticipatinginmoc", "boardabmsparticipatinginmoc"
-        ])),
-    }
-    # Drop None values
-    ocr = {k: v for k, v in ocr.items() if v not in (None, "")}
-
-    # Verification fields
-    pdf_match = _s(_get_first(nrec, [
-        "demo_verification_attribute1pdfformatmatch".replace("_", ""),
-        "pdfformatmatch"
-    ]))
-    cert_match = _s(_get_first(nrec, [
-        "demo_verification_attribute2boardcertificatematch".replace("_", ""),
-        "boardcertificatematch"
-    ]))
-    cert_status = _s(_get_first(nrec, [
-        "demo_verification_attribute3certificationstatus".replace("_", ""),
-        "certificationstatus"
-    ]))
-
-    # Comments typically appear as Comment 1, Comment 2, Comment 3
-    comment1 = _s(_get_first(nrec, ["comment1"]))
-    comment2 = _s(_get_first(nrec, ["comment2"]))
-    comment3 = _s(_get_first(nrec, ["comment3"]))
-
-    verification = {
-        "pdf_format_match": pdf_match,
-        "board_certificate_match": cert_match,
-        "certification_status": cert_status,
-        "comment_1": comment1,
-        "comment_2": comment2,
-        "comment_3": comment3,
-    }
-    # Remove empty entries
-    verification = {k: v for k, v in verification.items() if v not in (None, "")}
-
+    # Empty values are dropped from both sections
+    ocr = {k: _s(v) for k, v in OCR_COLUMNS.extract(rec).items() if v not in (None, "")}
+    verification = {k: _s(v) for k, v in VERIFICATION_COLUMNS.extract(rec).items() if v not in (None, "")}
     # Extract npi for traceability
-    npi_val = _get_first(nrec, ["npi", "providernpi", "provider_npi"])
-    npi_str = None
-    if npi_val is not None:
-        try:
-            npi_str = str(int(npi_val)) if isinstance(npi_val, (int, float)) else str(npi_val)
-            npi_str = npi_str.strip()
-        except Exception:
-            npi_str = str(npi_val).strip()
-
+    npi_val = PROVIDER_COLUMNS.extract(rec)["npi"]
     return {
         "source": f"{os.path.basename(EXCEL_PATH)}:{SHEET_NAME}",
-        "npi": npi_str,
+        "npi": cell_str(npi_val) if npi_val is not None else None,
         "ocr": ocr,
         "verification": verification,
     }
 
 
-def upsert_board_certification(db: Session, form_id: str, payload: Dict[str, Any], filename: str = None):
-    row = (
-        db.query(UploadedDocument)
-        .filter(UploadedDocument.form_id == form_id)
-        .filter(UploadedDocument.file_type == "board_certification")
-        .first()
-    )
-    if not row:
-        row = UploadedDocument(
-            form_id=form_id,
-            filename=filename,
-            file_extension="png",
-            file_type="board_certification",
-            status="In Progress",
-        )
-        db.add(row)
-        db.flush()
-    else:
-        row.filename = filename
-        row.file_extension = "png"
-    row.ocr_output = json.dumps(payload.get("ocr", {}))
-    row.verification_data = json.dumps(payload.get("verification", {}))
-    if not row.status:
-        row.status = "In Progress"
-    return row
-
-import zipfile
-
 def ingest_board_files(zip_path, npi_list):
     session = SessionLocal()
     try:
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            for file_info in zf.infolist():
-                for npi in npi_list:
-                    if npi in file_info.filename:
-                        file_data = zf.read(file_info.filename)
-                        filename = f"{npi}_Board_Certificate.png"
-                        saved_file = SavedFile(
-                            filename=filename,
-                            file_type="png",
-                            file_data=file_data,
-                            attribute="board_certificate",
-                        )
-                        session.add(saved_file)
-                        break  # Avoid duplicate uploads for the same file
-        session.commit()
-        print("Board files ingested.")
+        stats = ingest_zip(
+            session, zip_path, "board_certificate", lambda npi, name: f"{npi}_Board_Certificate.png", npis=npi_list,
+            suffixes=None,
+        )
+        print(f"Board files ingested. {stats}")
     except Exception as e:
         session.rollback()
         print(f"Error: {e}")
@@ -235,54 +100,37 @@ def ingest_board_files(zip_path, npi_list):
 
 def main():
     rows = load_rows(EXCEL_PATH)
-    print(f"Loaded Board_Certification rows: {len(rows)}")
 
     db: Session = SessionLocal()
     try:
-        # Build NPI -> form_id index
-        npi_to_form: Dict[str, str] = {}
-        npi_list = []
-        for f in db.query(FormData).all():
-            if f.npi and f.form_id:
-                npi_str = str(f.npi).strip()
-                npi_to_form[npi_str] = f.form_id
-                npi_list.append(npi_str)
-        for a in db.query(Application).all():
-            if a.npi and a.form_id:
-                npi_str = str(a.npi).strip()
-                npi_to_form.setdefault(npi_str, a.form_id)
-                if npi_str not in npi_list:
-                    npi_list.append(npi_str)
+        resolver = EntityResolver(db, "board_certification_excel")
+        npi_list = list(resolver.index.by_npi)
 
         # Ingest board certificate files from zip
         zip_path = os.path.join(PROJECT_ROOT, "data", "CA_ABMS_Sample 1.zip")
         ingest_board_files(zip_path, npi_list)
 
-        upserts = 0
+        writer = DocumentWriter(
+            db, "board_certification", lambda form_id: None, extension="png", rename=True,
+            commit_size=commit_size_arg(),
+            ledger=sheet_ledger(db, EXCEL_PATH, SHEET_NAME),
+        )
         for rec in rows:
-            # ... (existing upsert logic)
-            nrec = _norm_keys(rec)
-            npi_val = None
-            for cand in ("npi", "providernpi", "provider_npi"):
-                if cand in nrec and nrec[cand] not in (None, ""):
-                    npi_val = nrec[cand]
-                    break
-            if not npi_val:
+            provider = PROVIDER_COLUMNS.extract(rec)
+            if not provider["npi"]:
                 continue
-            try:
-                npi = str(int(npi_val)) if isinstance(npi_val, (int, float)) else str(npi_val)
-                npi = npi.strip()
-            except Exception:
-                npi = str(npi_val).strip()
-            form_id = npi_to_form.get(npi)
+            npi = normalize_npi(provider["npi"])
+            form_id = resolver.form_id_for(npi=npi, first=provider["first_name"], last=provider["last_name"])
             if not form_id:
                 continue
             payload = build_payload(rec)
             filename = f"{npi}_Board_Certificate.png"
-            upsert_board_certification(db, form_id, payload, filename)
-            upserts += 1
+            writer.write(form_id, payload.get("ocr", {}), payload.get("verification", {}), filename=filename, row_key=npi)
+        writer.finish()
+        print(f"Loaded Board_Certification rows: {rows.rows}")
+        resolver.finish()
         db.commit()
-        print(f"Board Certification ingest complete. Upserts={upserts}")
+        print(f"Board Certification ingest complete. Upserts={writer.written} ({writer.summary()})")
     finally:
         db.close()
 # def main():
@@ -1,4 +1,4 @@
-import os, sys, json
+import os, sys
 from typing import Any, Dict
 
 # Ensure project root path
@@ -7,10 +7,10 @@ PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-import openpyxl
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models import UploadedDocument, Application, FormData
+from app.services.entity_resolution import EntityResolver
+from app.services.excel_ingest import DocumentWriter, SheetReader, cell_str, commit_size_arg, header_contains, sheet_ledger
 
 SHEET_NAME = "CV"
 
@@ -28,43 +28,12 @@ VERIF_HEADERS = [
 
 
 def _npi_str(val: Any) -> str:
-    if isinstance(val, (int, float)):
-        return str(int(val))
-    return str(val or "").strip()
-
-
-def load_sheet(path: str):
-    wb = openpyxl.load_workbook(path, data_only=True)
-    if SHEET_NAME not in wb.sheetnames:
-        raise RuntimeError(f"Sheet '{SHEET_NAME}' not found in Excel file")
-    ws = wb[SHEET_NAME]
-
-    # Find header row by scanning first 6 rows for a cell equal to 'Flag' or 'Provider Name'
-    headers = {}
-    header_row = None
-    for r in range(1, 8):
-        row_vals = [str(c.value).strip() if c.value is not None else "" for c in ws[r]]
-        if any(v.lower() == "flag" for v in row_vals) or any(v == "Provider Name" for v in row_vals):
-            header_row = r
-            break
-    if not header_row:
-        header_row = 2
-
-    # Map column index to exact header text
-    for j, cell in enumerate(ws[header_row], start=1):
-        key = (str(cell.value) or "").strip()
-        headers[j] = key
-
-    rows = []
-    for i in range(header_row + 1, ws.max_row + 1):
-        rec = {}
-        for j, key in headers.items():
-            rec[key] = ws.cell(row=i, column=j).value
-        npi = _npi_str(rec.get("npi") or rec.get("provider_npi"))
-        if not npi:
-            continue
-        rows.append(rec)
-    return rows
+    return cell_str(val)
+
+
+def load_sheet(path: str) -> SheetReader:
+    # Header row: the first of the top rows with a 'Flag' or 'Provider Name' cell
+    return SheetReader(path, SHEET_NAME, header_contains("flag", "provider name", exact=True), default_header_row=2)
 
 
 def structured_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
@@ -81,57 +50,33 @@ def structured_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def upsert_cv(db: Session, form_id: str, payload: Dict[str, Any]):
-    row = (
-        db.query(UploadedDocument)
-        .filter(UploadedDocument.form_id == form_id)
-        .filter(UploadedDocument.file_type.in_(["CV", "cv", "cv/resume"]))
-        .order_by(UploadedDocument.id.desc())
-        .first()
-    )
-    if not row:
-        row = UploadedDocument(
-            form_id=form_id,
-            filename=f"cv_{form_id}.json",
-            file_extension="json",
-            file_type="CV",
-            status="In Progress",
-        )
-        db.add(row)
-        db.flush()
-    row.ocr_output = json.dumps(payload.get("ocr", {}))
-    row.verification_data = json.dumps(payload.get("verification", {}))
-    if not row.status:
-        row.status = "In Progress"
-    return row
-
-
 def main():
     excel_path = os.path.join(PROJECT_ROOT, "data", "Other_Attributes_Schema.xlsx")
     records = load_sheet(excel_path)
-    print(f"Loaded CV records: {len(records)}")
 
     db: Session = SessionLocal()
     try:
-        npi_to_form = {}
-        for f in db.query(FormData).all():
-            if f.npi:
-                npi_to_form[str(f.npi).strip()] = f.form_id
-        for a in db.query(Application).all():
-            if a.npi and a.form_id:
-                npi_to_form.setdefault(str(a.npi).strip(), a.form_id)
-
-        upserts = 0
+        resolver = EntityResolver(db, "cv_excel")
+        writer = DocumentWriter(
+            db, "CV", lambda form_id: f"cv_{form_id}.json",
+            match_types=["CV", "cv", "cv/resume"], commit_size=commit_size_arg(),
+            ledger=sheet_ledger(db, excel_path, SHEET_NAME),
+        )
+
         for rec in records:
             npi = _npi_str(rec.get("npi") or rec.get("provider_npi"))
-            form_id = npi_to_form.get(npi)
+            if not npi:
+                continue
+            form_id = resolver.form_id_for(npi=npi, full_name=rec.get("Provider Name"))
             if not form_id:
                 continue
             payload = structured_payload(rec)
-            upsert_cv(db, form_id, payload)
-            upserts += 1
+            writer.write(form_id, payload.get("ocr", {}), payload.get("verification", {}), row_key=npi)
+        writer.finish()
+        print(f"Loaded CV records: {records.rows}")
+        resolver.finish()
         db.commit()
-        print(f"CV ingest complete. Upserts={upserts}")
+        print(f"CV ingest complete. Upserts={writer.written} ({writer.summary()})")
     finally:
         db.close()
 
@@ -1,8 +1,5 @@
 import os
-import zipfile
 import sys
-import json
-import re
 from typing import Any, Dict, List, Tuple
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -10,10 +7,13 @@ PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-import openpyxl  # type: ignore
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models import UploadedDocument, Application, FormData, SavedFile
+from app.services.entity_resolution import EntityResolver, normalize_npi
+from app.services.excel_ingest import (
+    ColumnMap, DocumentWriter, SheetReader, cell_str, commit_size_arg, header_contains, norm_header, sheet_ledger,
+)
+from app.services.zip_ingest import ingest_zip
 
 EXCEL_PATH = os.path.join(PROJECT_ROOT, "data", "BoardCertificate_License_Schema.xlsx")
 SHEET_NAME = "License Board"
@@ -59,184 +59,112 @@ def _s(val: Any) -> Any:
     return str(val)
 
 
-def detect_header_row(ws) -> int:
-    max_scan = min(8, ws.max_row)
-    for r in range(1, max_scan + 1):
-        vals = [(str(c.value) or "").strip().lower() for c in ws[r]]
-        if any("licenseboard_extractedlicense" in v for v in vals) or any("npi" in v for v in vals):
-            return r
-    return 1
-
-
-def load_rows(path: str) -> List[Dict[str, Any]]:
-    wb = openpyxl.load_workbook(path, data_only=True)
-    if SHEET_NAME not in wb.sheetnames:
-        raise RuntimeError(f"Sheet '{SHEET_NAME}' not found in Excel file {path}")
-    ws = wb[SHEET_NAME]
-    header_row = detect_header_row(ws)
-    # Capture headers and preserve duplicates with unique suffixes
-    raw_headers_by_idx: Dict[int, str] = {}
-    for j, cell in enumerate(ws[header_row], start=1):
-        raw_headers_by_idx[j] = (str(cell.value) or "").strip()
-    headers_by_idx: Dict[int, str] = {}
-    seen_counts: Dict[str, int] = {}
-    for j, name in raw_headers_by_idx.items():
-        if name == "":
-            name = f"__EMPTY_COL__{j}"
-        count = seen_counts.get(name, 0)
-        if count == 0:
-            headers_by_idx[j] = name
-        else:
-            headers_by_idx[j] = f"{name}__{count+1}"
-        seen_counts[name] = count + 1
-    rows: List[Dict[str, Any]] = []
-    for i in range(header_row + 1, ws.max_row + 1):
-        rec: Dict[str, Any] = {}
-        empty = True
-        for j, key in headers_by_idx.items():
-            v = ws.cell(row=i, column=j).value
-            rec[key] = v
-            if v not in (None, ""):
-                empty = False
-        if not empty:
-            rows.append(rec)
-    return rows
+def load_rows(path: str) -> SheetReader:
+    # Duplicate headers (e.g. two 'Match with input' columns) are kept with unique suffixes
+    return SheetReader(path, SHEET_NAME, header_contains("licenseboard_extractedlicense", "npi"))
+
+
+# Map Excel column variants (shown in the screenshot) to canonical OCR keys expected by API
+CANONICAL_OCR_MAP = ColumnMap({
+    # License number and core fields
+    "LicenseBoard_ExtractedLicense": [
+        "license_website_license_number",
+        "license_website_license_numbe",  # truncated header variant
+        "licenseboard_extractedlicense",
+    ],
+    "LicenseBoard_Extracted_Name": [
+        "license_website_name",  # often the provider name from the site
+        "licenseboard_extracted_name",
+    ],
+    "LicenseBoard_Extracted_License_Type": [
+        "license_website_licensetype",
+        "license_board_licensetype",
+        "licenseboard_extracted_license_type",
+    ],
+    "LicenseBoard_Extracted_Primary_Status": [
+        "license_website_primarystatus",
+        "licenseboard_extracted_primary_status",
+    ],
+    "LicenseBoard_Extracted_Specialty": [
+        "license_website_special",
+        "licenseboard_extracted_specialty",
+    ],
+    "LicenseBoard_Extracted_Qualification": [
+        "license_website_qualification",
+        "licenseboard_extracted_qualification",
+    ],
+    "LicenseBoard_Extracted_School_Name": [
+        "license_website_schoolname",
+        "licenseboard_extracted_school_name",
+    ],
+    "LicenseBoard_Extracted_Graduation_Year": [
+        "license_website_graduationyear",
+        "licenseboard_extracted_graduation_year",
+    ],
+    "LicenseBoard_Extracted_Previous_Names": [
+        "license_website_previous_names",
+        "licenseboard_extracted_previous_names",
+    ],
+    "LicenseBoard_Extracted_Address": [
+        "license_website_address",
+        "licenseboard_extracted_address",
+    ],
+    "LicenseBoard_Extracted_Issuance_Date": [
+        "license_website_issuance_date",
+        "licenseboard_extracted_issuance_date",
+    ],
+    "LicenseBoard_Extracted_Expiration_Date": [
+        "license_website_expiration_date",
+        "licenseboard_extracted_expiration_date",
+    ],
+    "LicenseBoard_Extracted_Current_Date_Time": [
+        "license_website_currentdatetime",
+        "licenseboard_extracted_current_date_time",
+    ],
+    "LicenseBoard_Extracted_Professional_Url": [
+        "license_website_professionalurl",
+        "licenseboard_extracted_professional_url",
+    ],
+    "LicenseBoard_Extracted_Disciplinary_Actions": [
+        "license_website_disciplinaryactions",
+        "licenseboard_extracted_disciplinary_actions",
+    ],
+    "LicenseBoard_Extracted_Public_Record_Actions": [
+        "license_website_public_record_actions",
+        "licenseboard_extracted_public_record_actions",
+    ],
+})
+
+# Optional extras (won't break API)
+EXTRA_MAP = ColumnMap({
+    "LicenseBoard_Extracted_Board_Name": [
+        "license_website_boardname",
+        "license_board_boardname",
+    ]
+})
+
+# Verification label is handled in API; capture details present in the sheet
+VERIFICATION_MAP = ColumnMap({
+    "pdf_format_match": ["demo_verification_attribute1_pdf_format_match", "pdf_format_match"],
+    "license_number_match": ["demo_verification_attribute2_license_number_match", "license_number_match"],
+    "dates_match_status": ["demo_verification_attribute3_dates_match_status", "dates_match_status"],
+    # Provider name match and score
+    "provider_name_match": ["license_provider_match"],
+    "provider_name_match_score": ["license_provider_match_score"],
+})
+# Misc note column sometimes present
+EXPIRY_ISSUE_MAP = ColumnMap({"expiry_issue": ["license_expiry_issue"]})
+NPI_MAP = ColumnMap({"npi": ["npi", "provider_npi"]})
 
 
 def build_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
-    # Normalize record keys for resilient lookups
-    def norm_key(s: str) -> str:
-        return re.sub(r"[^a-z0-9]+", "_", s.lower()).strip("_")
-
-    rec_norm: Dict[str, Any] = {norm_key(k): v for k, v in rec.items()}
-
-    # Map Excel column variants (shown in the screenshot) to canonical OCR keys expected by API
-    CANONICAL_OCR_MAP: Dict[str, List[str]] = {
-        # License number and core fields
-        "LicenseBoard_ExtractedLicense": [
-            "license_website_license_number",
-            "license_website_license_numbe",  # truncated header variant
-            "licenseboard_extractedlicense",
-        ],
-        "LicenseBoard_Extracted_Name": [
-            "license_website_name",  # often the provider name from the site
-            "licenseboard_extracted_name",
-        ],
-        "LicenseBoard_Extracted_License_Type": [
-            "license_website_licensetype",
-            "license_board_licensetype",
-            "licenseboard_extracted_license_type",
-        ],
-        "LicenseBoard_Extracted_Primary_Status": [
-            "license_website_primarystatus",
-            "licenseboard_extracted_primary_status",
-        ],
-        "LicenseBoard_Extracted_Specialty": [
-            "license_website_special",
-            "licenseboard_extracted_specialty",
-        ],
-        "LicenseBoard_Extracted_Qualification": [
-            "license_website_qualification",
-            "licenseboard_extracted_qualification",
-        ],
-        "LicenseBoard_Extracted_School_Name": [
-            "license_website_schoolname",
-            "licenseboard_extracted_school_name",
-        ],
-        "LicenseBoard_Extracted_Graduation_Year": [
-            "license_website_graduationyear",
-            "licenseboard_extracted_graduation_year",
-        ],
-        "LicenseBoard_Extracted_Previous_Names": [
-            "license_website_previous_names",
-            "licenseboard_extracted_previous_names",
-        ],
-        "LicenseBoard_Extracted_Address": [
-            "license_website_address",
-            "licenseboard_extracted_address",
-        ],
-        "LicenseBoard_Extracted_Issuance_Date": [
-            "license_website_issuance_date",
-            "licenseboard_extracted_issuance_date",
-        ],
-        "LicenseBoard_Extracted_Expiration_Date": [
-            "license_website_expiration_date",
-            "licenseboard_extracted_expiration_date",
-        ],
-        "LicenseBoard_Extracted_Current_Date_Time": [
-            "license_website_currentdatetime",
-            "licenseboard_extracted_current_date_time",
-        ],
-        "LicenseBoard_Extracted_Professional_Url": [
-            "license_website_professionalurl",
-            "licenseboard_extracted_professional_url",
-        ],
-        "LicenseBoard_Extracted_Disciplinary_Actions": [
-            "license_website_disciplinaryactions",
-            "licenseboard_extracted_disciplinary_actions",
-        ],
-        "LicenseBoard_Extracted_Public_Record_Actions": [
-            "license_website_public_record_actions",
-            "license_website_public_record_actions_",  # possible spacing variants
-            "licenseboard_extracted_public_record_actions",
-        ],
-    }
-
-    # Optional extras (won't break API)
-    EXTRA_MAP: Dict[str, List[str]] = {
-        "LicenseBoard_Extracted_Board_Name": [
-            "license_website_boardname",
-            "license_board_boardname",
-        ]
-    }
-
-    def pick_first(keys: List[str]) -> Any:
-        for k in keys:
-            if k in rec_norm:
-                v = rec_norm.get(k)
-                if v not in (None, ""):
-                    return v
-        return None
-
     # Build OCR dict
-    ocr: Dict[str, Any] = {}
-    for canon, excel_keys in CANONICAL_OCR_MAP.items():
-        ocr[canon] = _s(pick_first(excel_keys))
-    for canon, excel_keys in EXTRA_MAP.items():
-        val = pick_first(excel_keys)
+    ocr: Dict[str, Any] = {canon: _s(val) for canon, val in CANONICAL_OCR_MAP.extract(rec).items()}
+    for canon, val in EXTRA_MAP.extract(rec).items():
         if val not in (None, ""):
             ocr[canon] = _s(val)
 
-    # Verification label is handled in API; capture details present in the sheet
-    def get_norm(*candidates: str) -> Any:
-        for c in candidates:
-            v = rec_norm.get(c)
-            if v not in (None, ""):
-                return v
-        return None
-
-    verification: Dict[str, Any] = {}
-    verification["pdf_format_match"] = _s(
-        get_norm(
-            "demo_verification_attribute1_pdf_format_match",
-            "pdf_format_match",
-        )
-    )
-    verification["license_number_match"] = _s(
-        get_norm(
-            "demo_verification_attribute2_license_number_match",
-            "license_number_match",
-        )
-    )
-    verification["dates_match_status"] = _s(
-        get_norm(
-            "demo_verification_attribute3_dates_match_status",
-            "dates_match_status",
-        )
-    )
-    # Provider name match and score
-    verification["provider_name_match"] = _s(get_norm("license_provider_match"))
-    verification["provider_name_match_score"] = _s(get_norm("license_provider_match_score"))
+    verification: Dict[str, Any] = {k: _s(v) for k, v in VERIFICATION_MAP.extract(rec).items()}
 
     # Issuance/Expiration match flags: detect by relative position to corresponding date columns
     issuance_match = None
@@ -244,8 +172,8 @@ def build_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
     expect_issuance_next_match = False
     expect_expiration_next_match = False
     for k, v in rec.items():  # preserve original column order
-        nk = norm_key(str(k))
-        if nk in ("license_website_issuance_date",):
+        nk = norm_header(k)
+        if nk in ("license_website_issuance_date", "license_website_issuancedate"):
             expect_issuance_next_match = True
             continue
         if nk in ("license_website_expiration_date", "license_website_expirationdate"):
@@ -263,14 +191,12 @@ def build_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
     verification["expiration_date_match"] = _s(expiration_match)
 
     # Misc note column sometimes present
-    verification["expiry_issue"] = _s(
-        get_norm("license_expiry_issue", "license_expiry_issue_")
-    )
+    verification["expiry_issue"] = _s(EXPIRY_ISSUE_MAP.extract(rec)["expiry_issue"])
 
     # Comments: capture any 'comment' columns
     comments: List[Tuple[str, Any]] = []
     for k, v in rec.items():
-        nk = norm_key(str(k))
+        nk = norm_header(k)
         if nk.startswith("comment") and v not in (None, ""):
             comments.append((nk, v))
     # Sort deterministically and assign comment_1..comment_3 as available
@@ -282,14 +208,8 @@ def build_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
     verification = {k: v for k, v in verification.items() if v not in (None, "")}
 
     # Trace NPI if available
-    npi_raw = rec.get("npi") or rec.get("NPI") or rec.get("provider_npi")
-    npi_str = None
-    if npi_raw is not None:
-        try:
-            npi_str = str(int(npi_raw)) if isinstance(npi_raw, (int, float)) else str(npi_raw)
-            npi_str = npi_str.strip()
-        except Exception:
-            npi_str = str(npi_raw).strip()
+    npi_raw = NPI_MAP.extract(rec)["npi"]
+    npi_str = cell_str(npi_raw) if npi_raw is not None else None
 
     return {
         "source": f"{os.path.basename(EXCEL_PATH)}:{SHEET_NAME}",
@@ -298,51 +218,14 @@ def build_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
         "verification": verification,
     }
 
-def upsert_license_board(db: Session, form_id: str, payload: Dict[str, Any], filename: str):
-    row = (
-        db.query(UploadedDocument)
-        .filter(UploadedDocument.form_id == form_id)
-        .filter(UploadedDocument.file_type == "license_board")
-        .first()
-    )
-    if not row:
-        row = UploadedDocument(
-            form_id=form_id,
-            filename=filename,
-            file_extension="png",
-            file_type="license_board",
-            status="In Progress",
-        )
-        db.add(row)
-        db.flush()
-    else:
-        row.filename = filename  # Ensure filename is updated
-        row.file_extension = "png"
-    row.filename = filename  # Ensure filename is updated
-    row.ocr_output = json.dumps(payload.get("ocr", {}))
-    row.verification_data = json.dumps(payload.get("verification", {}))
-    if not row.status:
-        row.status = "In Progress"
-    return row
-
 def ingest_board_cert_files(zip_path, npi_list):
     session = SessionLocal()
     try:
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            for file_info in zf.infolist():
-                for npi in npi_list:
-                    if npi in file_info.filename:
-                        file_data = zf.read(file_info.filename)
-                        saved_file = SavedFile(
-                            filename=f"{npi}_Licence.png",
-                            file_type="png",
-                            file_data=file_data,
-                            attribute="license_board_certification",
-                        )
-                        session.add(saved_file)
-                        break  # Avoid duplicate uploads for the same file
-        session.commit()
-        print("Board certification files ingested.")
+        stats = ingest_zip(
+            session, zip_path, "license_board_certification", lambda npi, name: f"{npi}_Licence.png", npis=npi_list,
+            suffixes=None,
+        )
+        print(f"Board certification files ingested. {stats}")
     except Exception as e:
         session.rollback()
         print(f"Error: {e}")
@@ -351,55 +234,40 @@ def ingest_board_cert_files(zip_path, npi_list):
 
 def main():
     rows = load_rows(EXCEL_PATH)
-    print(f"Loaded License Board rows: {len(rows)}")
 
     db: Session = SessionLocal()
     try:
-        # Build NPI -> form_id index
-        npi_to_form: Dict[str, str] = {}
-        for f in db.query(FormData).all():
-            if f.npi and f.form_id:
-                npi_to_form[str(f.npi).strip()] = f.form_id
-        for a in db.query(Application).all():
-            if a.npi and a.form_id:
-                npi_to_form.setdefault(str(a.npi).strip(), a.form_id)
+        resolver = EntityResolver(db, "license_board_excel")
+        writer = DocumentWriter(
+            db, "license_board", lambda form_id: None, extension="png", rename=True,
+            commit_size=commit_size_arg(),
+            ledger=sheet_ledger(db, EXCEL_PATH, SHEET_NAME),
+        )
 
-        # After loading rows
         npi_list = []
         for rec in rows:
-            npi_raw = rec.get("npi") or rec.get("NPI") or rec.get("provider_npi")
-            if npi_raw:
-                try:
-                    npi = str(int(npi_raw)) if isinstance(npi_raw, (int, float)) else str(npi_raw)
-                    npi = npi.strip()
-                except Exception:
-                    npi = str(npi_raw).strip()
-                npi_list.append(npi)
-        print(npi_list)
-        zip_path = os.path.join(PROJECT_ROOT, "data", "CA_License_Details_Sample 1 (1).zip")
-        ingest_board_cert_files(zip_path, npi_list)
-        print("Files ingested in DB")
-
-        upserts = 0
-        for rec in rows:
-            npi_raw = rec.get("npi") or rec.get("NPI") or rec.get("provider_npi")
+            npi_raw = NPI_MAP.extract(rec)["npi"]
             if not npi_raw:
                 continue
-            try:
-                npi = str(int(npi_raw)) if isinstance(npi_raw, (int, float)) else str(npi_raw)
-                npi = npi.strip()
-            except Exception:
-                npi = str(npi_raw).strip()
-            form_id = npi_to_form.get(npi)
+            npi_list.append(cell_str(npi_raw))
+            npi = normalize_npi(npi_raw)
+            form_id = resolver.form_id_for(npi=npi)
             if not form_id:
                 continue
             payload = build_payload(rec)
             filename = f"{npi}_Licence.png"
-            upsert_license_board(db, form_id, payload, filename)
-            upserts += 1
+            writer.write(form_id, payload.get("ocr", {}), payload.get("verification", {}), filename=filename, row_key=npi)
+        writer.finish()
+        print(f"Loaded License Board rows: {rows.rows}")
+
+        # Screenshots for the NPIs seen in the sheet
+        zip_path = os.path.join(PROJECT_ROOT, "data", "CA_License_Details_Sample 1 (1).zip")
+        ingest_board_cert_files(zip_path, npi_list)
+        print("Files ingested in DB")
 
+        resolver.finish()
         db.commit()
-        print(f"License Board ingest complete. Upserts={upserts}")
+        print(f"License Board ingest complete. Upserts={writer.written} ({writer.summary()})")
     finally:
         db.close()
 
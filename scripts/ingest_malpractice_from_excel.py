@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 from typing import Dict, Any
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -8,10 +7,10 @@ PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-import openpyxl
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models import UploadedDocument, Application, FormData
+from app.services.entity_resolution import EntityResolver
+from app.services.excel_ingest import DocumentWriter, SheetReader, cell_str, commit_size_arg, header_contains, sheet_ledger
 
 SHEET_NAME = "Malpractice Insurance"
 
@@ -31,30 +30,8 @@ VERIF_HEADERS = [
 ]
 
 
-def detect_header_row(ws) -> int:
-    for r in range(1, min(7, ws.max_row + 1)):
-        row_vals = [(str(c.value) or "").strip().lower() for c in ws[r]]
-        if any("insured name" in v for v in row_vals):
-            return r
-    return 2
-
-
-def load_rows(path: str):
-    wb = openpyxl.load_workbook(path, data_only=True)
-    if SHEET_NAME not in wb.sheetnames:
-        raise RuntimeError(f"Sheet '{SHEET_NAME}' not found in Excel file")
-    ws = wb[SHEET_NAME]
-    header_row = detect_header_row(ws)
-    headers_by_idx = {}
-    for j, cell in enumerate(ws[header_row], start=1):
-        headers_by_idx[j] = (str(cell.value) or "").strip()
-    rows = []
-    for i in range(header_row + 1, ws.max_row + 1):
-        rec = {}
-        for j, key in headers_by_idx.items():
-            rec[key] = ws.cell(row=i, column=j).value
-        rows.append(rec)
-    return rows
+def load_rows(path: str) -> SheetReader:
+    return SheetReader(path, SHEET_NAME, header_contains("insured name"), default_header_row=2)
 
 
 def _s(val: Any) -> Any:
@@ -90,80 +67,37 @@ def structured_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def upsert_malpractice(db: Session, form_id: str, payload: Dict[str, Any]):
-    row = (
-        db.query(UploadedDocument)
-        .filter(UploadedDocument.form_id == form_id)
-        .filter(UploadedDocument.file_type == "malpractice_insurance")
-        .first()
-    )
-    if not row:
-        row = UploadedDocument(
-            form_id=form_id,
-            filename=f"malpractice_{form_id}.json",
-            file_extension="json",
-            file_type="malpractice_insurance",
-            status="In Progress",
-        )
-        db.add(row)
-        db.flush()
-    row.ocr_output = json.dumps(payload.get("ocr", {}))
-    row.verification_data = json.dumps(payload.get("verification", {}))
-    if not row.status:
-        row.status = "In Progress"
-    return row
-
-
 def main():
     excel_path = os.path.join(PROJECT_ROOT, "data", "Other_Attributes_Schema.xlsx")
     rows = load_rows(excel_path)
-    print(f"Loaded Malpractice rows: {len(rows)}")
 
     db: Session = SessionLocal()
     try:
-        # Build indices
-        npi_to_form: Dict[str, str] = {}
-        for f in db.query(FormData).all():
-            if f.npi and f.form_id:
-                npi_to_form[str(f.npi).strip()] = f.form_id
-        for a in db.query(Application).all():
-            if a.npi and a.form_id:
-                npi_to_form.setdefault(str(a.npi).strip(), a.form_id)
-
-        name_to_form: Dict[str, str] = {}
-        for a in db.query(Application).all():
-            if a.form_id and a.name:
-                name_to_form.setdefault(a.name.strip().lower(), a.form_id)
-        for f in db.query(FormData).all():
-            if f.form_id and f.provider_name:
-                name_to_form.setdefault(f.provider_name.strip().lower(), f.form_id)
-
-        upserts = 0
+        resolver = EntityResolver(db, "malpractice_excel")
+        writer = DocumentWriter(
+            db, "malpractice_insurance", lambda form_id: f"malpractice_{form_id}.json",
+            commit_size=commit_size_arg(),
+            ledger=sheet_ledger(db, excel_path, SHEET_NAME),
+        )
+        npi_header = None
+
         for rec in rows:
             # Prefer NPI linkage when available
-            npi_val = None
-            for k, v in rec.items():
-                if "npi" in (k or "").strip().lower():
-                    npi_val = v
-                    break
-            form_id = None
-            if npi_val is not None:
-                try:
-                    npi_str = str(int(npi_val)) if isinstance(npi_val, (int, float)) else str(npi_val)
-                    npi_str = npi_str.strip()
-                except Exception:
-                    npi_str = str(npi_val).strip()
-                form_id = npi_to_form.get(npi_str)
-            if not form_id:
-                insured_name = (str(rec.get("Insured Name") or "").strip().lower())
-                form_id = name_to_form.get(insured_name)
+            if npi_header is None:
+                npi_header = next((k for k in rec if "npi" in (k or "").strip().lower()), "")
+            npi_val = rec.get(npi_header)
+            # Falls back to the insured's name when the NPI is missing or unknown
+            form_id = resolver.form_id_for(npi=npi_val, full_name=rec.get("Insured Name"))
             if not form_id:
                 continue
             payload = structured_payload(rec)
-            upsert_malpractice(db, form_id, payload)
-            upserts += 1
+            row_key = cell_str(npi_val) or cell_str(rec.get("Insured Name"))
+            writer.write(form_id, payload.get("ocr", {}), payload.get("verification", {}), row_key=row_key)
+        writer.finish()
+        print(f"Loaded Malpractice rows: {rows.rows}")
+        resolver.finish()
         db.commit()
-        print(f"Malpractice Insurance ingest complete. Upserts={upserts}")
+        print(f"Malpractice Insurance ingest complete. Upserts={writer.written} ({writer.summary()})")
     finally:
         db.close()
 
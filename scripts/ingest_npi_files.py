@@ -0,0 +1,127 @@
+import csv
+import io
+import os
+import sys
+import time
+import zipfile
+from datetime import datetime
+from typing import Iterator, List, Optional, TextIO
+
+# Ensure project root is on sys.path when running directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import Base, SessionLocal, engine
+from app.models import JobState, NpiRegistryEntry
+from app.services.npi_registry import nppes_projector
+
+# Streams NPPES dissemination files (https://download.cms.gov/nppes/NPI_Files.html) into
+# npi_registry. Accepts the monthly full file or the weekly incremental file, either as the
+# extracted npidata_pfile_*.csv or the downloaded zip. Rows are read one at a time, only the
+# columns in NPPES_COLUMNS are kept, and each BATCH rows are upserted in one transaction, so
+# memory stays flat regardless of file size. A row never replaces one with a newer
+# Last Update Date, so files can be applied in any order.
+# Usage: python scripts/ingest_npi_files.py <file.csv|file.zip> [more files...]
+BATCH = 50000
+JOB_NAME = "npi_registry_load"
+
+
+def _open_nppes(path: str) -> Iterator[TextIO]:
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            members = [
+                n for n in zf.namelist()
+                if os.path.basename(n).lower().startswith("npidata_pfile") and "fileheader" not in n.lower()
+            ]
+            if not members:
+                raise ValueError(f"{path}: no npidata_pfile_*.csv inside")
+            for name in members:
+                with zf.open(name) as raw:
+                    yield io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+    else:
+        with open(path, encoding="utf-8", errors="replace", newline="") as f:
+            yield f
+
+
+def _upsert_statement():
+    table = NpiRegistryEntry.__table__
+    stmt = sqlite_insert(table)
+    # Keep whichever version NPPES updated last
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.npi],
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name != "npi"},
+        where=or_(
+            table.c.last_update_date.is_(None),
+            stmt.excluded.last_update_date.is_(None),
+            stmt.excluded.last_update_date >= table.c.last_update_date,
+        ),
+    )
+
+
+def _flush(stmt, rows: List[dict]) -> int:
+    with engine.begin() as conn:
+        return conn.execute(stmt, rows).rowcount
+
+
+def load_file(path: str, stmt) -> dict:
+    stats = {"file": os.path.basename(path), "read": 0, "written": 0, "skipped": 0}
+    for stream in _open_nppes(path):
+        reader = csv.reader(stream)
+        header: Optional[List[str]] = next(reader, None)
+        if not header:
+            continue
+        project = nppes_projector(header)
+        batch = []
+        for row in reader:
+            stats["read"] += 1
+            rec = project(row)
+            if rec is None:
+                stats["skipped"] += 1
+                continue
+            batch.append(rec)
+            if len(batch) >= BATCH:
+                stats["written"] += _flush(stmt, batch)
+                batch = []
+                print(f"  {stats['file']}: {stats['read']:,} rows", flush=True)
+        if batch:
+            stats["written"] += _flush(stmt, batch)
+    # Rows neither written nor skipped were older than what is already stored
+    stats["stale"] = stats["read"] - stats["written"] - stats["skipped"]
+    return stats
+
+
+def main():
+    paths = sys.argv[1:]
+    if not paths:
+        print("Usage: python scripts/ingest_npi_files.py <file.csv|file.zip> [more files...]")
+        sys.exit(1)
+    Base.metadata.create_all(bind=engine)
+    stmt = _upsert_statement()
+    for path in paths:
+        started = time.perf_counter()
+        stats = load_file(path, stmt)
+        elapsed = time.perf_counter() - started
+        print(
+            f"Loaded {stats['file']}: read={stats['read']} written={stats['written']} "
+            f"stale={stats['stale']} skipped={stats['skipped']} in {elapsed:.1f}s"
+        )
+        db = SessionLocal()
+        try:
+            state = db.get(JobState, JOB_NAME)
+            if state is None:
+                state = JobState(name=JOB_NAME)
+                db.add(state)
+            state.last_finished_at = datetime.utcnow()
+            state.last_stats = stats
+            db.commit()
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,5 @@
 import os
 import sys
-import json
-from typing import Optional, Dict, Any
-import zipfile
-from openpyxl import load_workbook
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, os.pardir))
@@ -11,73 +7,14 @@ if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
 from app.database import SessionLocal  # type: ignore
-from app.models import Application, UploadedDocument, FormData, SavedFile  # type: ignore
-
-
-def normalize_npi(value: Optional[str]) -> Optional[str]:
-    if value is None:
-        return None
-    s = str(value).strip()
-    if not s:
-        return None
-    # Handle scientific notation like 1.23456789E9
-    try:
-        if "e" in s.lower():
-            num = float(s)
-            s = str(int(num))
-    except Exception:
-        pass
-    # Remove non-digits and pad to 10 if needed
-    digits = "".join(ch for ch in s if ch.isdigit())
-    if not digits:
-        return None
-    if len(digits) == 9:
-        # Some sources miss a leading zero
-        digits = digits.zfill(10)
-    return digits
-
-def upsert_npi_doc(session, form_id: str, verification_details: Dict[str, Any]):
-    row = (
-        session.query(UploadedDocument)
-        .filter(UploadedDocument.form_id == form_id)
-        .filter(UploadedDocument.file_type == "npi")
-        .first()
-    )
-    if not row:
-        row = UploadedDocument(
-            form_id=form_id,
-            filename=f"{verification_details['npi']}_NPI.png",
-            file_extension="png",
-            file_type="npi",
-            status="In Progress",
-        )
-        session.add(row)
-        session.flush()
-
-    else:
-        row.filename = f"{verification_details['npi']}_NPI.png"
-        row.file_extension = "png"
-
-    row.ocr_output = json.dumps({})
-    row.verification_data = json.dumps(verification_details or {})
-    if not row.status:
-        row.status = "In Progress"
+from app.services.entity_resolution import EntityResolver, normalize_npi  # type: ignore
+from app.services.excel_ingest import DocumentWriter, SheetReader, commit_size_arg, header_contains, sheet_ledger  # type: ignore
+from app.services.zip_ingest import ingest_zip  # type: ignore
 
 
 def ingest_files_from_zip(session, zip_path):
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        for file_info in zf.infolist():
-            if file_info.filename.lower().endswith(".png"):
-                file_data = zf.read(file_info.filename)
-                base_filename = os.path.basename(file_info.filename)
-                saved_file = SavedFile(
-                    filename=base_filename,
-                    file_type="png",
-                    file_data=file_data,
-                    attribute = "npi"
-                )
-                session.add(saved_file)
-        session.commit()
+    # Every PNG is kept under its own base name (e.g. 1234567890_NPI.png)
+    return ingest_zip(session, zip_path, "npi", lambda npi, name: os.path.basename(name))
 
 
 def main():
@@ -88,75 +25,48 @@ def main():
         print(f"Excel file not found at {excel_path}")
         sys.exit(1)
 
-    wb = load_workbook(excel_path, data_only=True)
-    if sheet_name not in wb.sheetnames:
-        print(f"Sheet '{sheet_name}' not found in workbook")
-        sys.exit(1)
-    ws = wb[sheet_name]
-
-    # Detect header row by scanning first 6 rows for any cell containing 'npi'
-    header_row = None
-    for r in range(1, min(7, ws.max_row + 1)):
-        row_vals = [(str(c.value) or "").strip().lower() for c in ws[r]]
-        if any("npi" in v for v in row_vals):
-            header_row = r
-            break
-    if not header_row:
-        header_row = 1
-
-    headers_by_name: Dict[str, int] = {}
-    headers_by_idx: Dict[int, str] = {}
-    for idx, cell in enumerate(ws[header_row], start=1):
-        key = (str(cell.value) or "").strip()
-        if key:
-            headers_by_name[key.strip().lower()] = idx
-            headers_by_idx[idx] = key
-
-    # Find NPI column among various possible header names
-    npi_col_idx = None
-    for k, idx in headers_by_name.items():
-        if "npi" in k:
-            npi_col_idx = idx
-            break
-    if not npi_col_idx:
-        print("Could not locate an NPI column in NPI sheet")
-        sys.exit(1)
+    # Header row: the first of the top rows with a cell containing 'npi'
+    rows = SheetReader(excel_path, sheet_name, header_contains("npi"))
 
     session = SessionLocal()
-    upserts = 0
-    scanned = 0
     try:
-        # Build NPI -> form_id map
-        npi_to_form: Dict[str, str] = {}
-        for f in session.query(FormData).all():
-            if f.npi and f.form_id:
-                npi_to_form[str(f.npi).strip()] = f.form_id
-        for a in session.query(Application).all():
-            if a.npi and a.form_id:
-                npi_to_form.setdefault(str(a.npi).strip(), a.form_id)
-
-        for row in ws.iter_rows(min_row=header_row + 1, values_only=True):
-            scanned += 1
-            raw_npi = row[npi_col_idx - 1]
-            npi = normalize_npi(raw_npi)
+        resolver = EntityResolver(session, "npi_excel", fuzzy=False)
+        writer = DocumentWriter(
+            session, "npi", lambda form_id: f"{form_id}_NPI.png", extension="png", rename=True,
+            commit_size=commit_size_arg(),
+            ledger=sheet_ledger(session, excel_path, sheet_name),
+        )
+        columns = None
+
+        for rec in rows:
+            if columns is None:
+                headers_by_name = {h.strip().lower(): h for h in rows.headers if not h.startswith("__EMPTY_COL__")}
+
+                def find(name_options):
+                    return next((headers_by_name[n] for n in name_options if n in headers_by_name), None)
+
+                # Find NPI column among various possible header names; optional 'active', 'comment', 'deactivated date'
+                columns = {
+                    "npi": next((h for k, h in headers_by_name.items() if "npi" in k), None),
+                    "active": find(["active", "is_active", "status"]),
+                    "comment": find(["comment", "comments", "note"]),
+                    "deactivated": find(["deactivated date", "deactivation date", "inactive since"]),
+                }
+                if not columns["npi"]:
+                    print("Could not locate an NPI column in NPI sheet")
+                    sys.exit(1)
+
+            npi = normalize_npi(rec.get(columns["npi"]))
             if not npi:
                 continue
 
-            form_id = npi_to_form.get(npi)
+            form_id = resolver.form_id_for(npi=npi)
             if not form_id:
                 continue
 
-            # Optional fields: 'active', 'comment', 'deactivated date'
-            def get_cell_by_name(name_options):
-                for name in name_options:
-                    name_l = name.lower()
-                    if name_l in headers_by_name:
-                        return row[headers_by_name[name_l] - 1]
-                return None
-
-            active_val = get_cell_by_name(["active", "is_active", "status"])
-            comment_val = get_cell_by_name(["comment", "comments", "note"])
-            deactivated_val = get_cell_by_name(["deactivated date", "deactivation date", "inactive since"])
+            active_val = rec.get(columns["active"]) if columns["active"] else None
+            comment_val = rec.get(columns["comment"]) if columns["comment"] else None
+            deactivated_val = rec.get(columns["deactivated"]) if columns["deactivated"] else None
 
             verification_details = {
                 "source": "NPPES",
@@ -166,11 +76,12 @@ def main():
                 "comment": str(comment_val).strip() if comment_val else None,
             }
 
-            upsert_npi_doc(session, form_id, verification_details)
-            upserts += 1
+            writer.write(form_id, {}, verification_details, filename=f"{npi}_NPI.png", row_key=npi)
 
+        writer.finish()
+        resolver.finish()
         session.commit()
-        print(f"NPI ingest complete. Rows scanned={scanned}, upserts={upserts}")
+        print(f"NPI ingest complete. Rows scanned={rows.rows}, upserts={writer.written} ({writer.summary()})")
     except Exception as e:
         session.rollback()
         print(f"Error during NPI ingest: {e}")
@@ -182,8 +93,8 @@ def main():
     if os.path.exists(zip_path):
         session = SessionLocal()
         try:
-            ingest_files_from_zip(session, zip_path)
-            print("Files from zip saved to DB.")
+            stats = ingest_files_from_zip(session, zip_path)
+            print(f"Files from zip saved to DB. {stats}")
         finally:
             session.close()
 
@@ -1,4 +1,4 @@
-import csv, json, uuid
+import csv, uuid
 from pathlib import Path
 from sqlalchemy.orm import Session
 import sys
@@ -9,7 +9,10 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from app.database import SessionLocal  # noqa
-from app.models import Application, UploadedDocument  # noqa
+from app.models import Application, UploadedDocument, CurrentDocument  # noqa
+from app.services.entity_resolution import EntityResolver  # noqa
+from app.services.ingestion_ledger import Ledger, content_hash  # noqa
+from app.services.upload_service import current_documents_query, set_current_documents  # noqa
 
 CSV_PATH = Path('data/ocrDataAndVerificationSectionData.csv')
 
@@ -52,7 +55,7 @@ def row_to_struct(row):
 
 
 def upsert_board_cert(db: Session, app: Application, row):
-    doc = db.query(UploadedDocument).filter_by(form_id=app.form_id, file_type=FILE_TYPE).order_by(UploadedDocument.id.desc()).first()
+    doc = current_documents_query(db, app.form_id).filter(CurrentDocument.file_type == FILE_TYPE).first()
     ocr_payload, verification = row_to_struct(row)
     status_raw = (row.get('Board_ABMS_Status') or '').lower()
     computed_status = 'APPROVED' if status_raw == 'active' else ('In Progress' if status_raw else 'In Progress')
@@ -63,21 +66,24 @@ def upsert_board_cert(db: Session, app: Application, row):
             file_extension='png',
             file_type=FILE_TYPE,
             status=computed_status,
-            ocr_output=json.dumps(ocr_payload) if ocr_payload else None,
-            verification_data=json.dumps(verification) if verification else None,
+            ocr_output=ocr_payload if ocr_payload else None,
+            verification_data=verification if verification else None,
         )
         db.add(doc)
+        db.flush()
+        set_current_documents(db, [doc])
     else:
         # Always update; allow empty lists
-        doc.ocr_output = json.dumps(ocr_payload) if ocr_payload else doc.ocr_output
-        doc.verification_data = json.dumps(verification) if verification else doc.verification_data
+        doc.ocr_output = ocr_payload if ocr_payload else doc.ocr_output
+        doc.verification_data = verification if verification else doc.verification_data
         if status_raw:
             doc.status = computed_status
+    return doc
 
 
 def upsert_sanctions(db: Session, app: Application, row):
     # One sanctions doc per application
-    doc = db.query(UploadedDocument).filter_by(form_id=app.form_id, file_type=SANCTIONS_TYPE).first()
+    doc = current_documents_query(db, app.form_id).filter(CurrentDocument.file_type == SANCTIONS_TYPE).first()
     # Sanctions rows in CSV have minimal ABMS data; treat as no OCR, only verification attributes derived from Demo_ attributes if present
     ocr_payload, verification = row_to_struct(row)
     if doc is None:
@@ -87,15 +93,18 @@ def upsert_sanctions(db: Session, app: Application, row):
             file_extension='pdf',
             file_type=SANCTIONS_TYPE,
             status='In Progress',
-            ocr_output=json.dumps(ocr_payload) if ocr_payload else None,
-            verification_data=json.dumps(verification) if verification else None,
+            ocr_output=ocr_payload if ocr_payload else None,
+            verification_data=verification if verification else None,
         )
         db.add(doc)
+        db.flush()
+        set_current_documents(db, [doc])
     else:
         if ocr_payload:
-            doc.ocr_output = json.dumps(ocr_payload)
+            doc.ocr_output = ocr_payload
         if verification:
-            doc.verification_data = json.dumps(verification)
+            doc.verification_data = verification
+    return doc
 
 
 def ingest():
@@ -107,20 +116,31 @@ def ingest():
     updated = 0
     sanctions_inserted = 0
     sanctions_updated = 0
+    resolver = EntityResolver(db, 'ocr_verification_csv', fuzzy=False)
+    # Rows whose content and target document are the same as last run are skipped; --full rewrites all
+    ledger = Ledger(db, CSV_PATH.name, '', force='--full' in sys.argv[1:])
     with CSV_PATH.open(newline='', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for row in reader:
             npi = row.get('npi') or row.get('NPI')
             if not npi:
                 continue
-            app = db.query(Application).filter_by(npi=npi).first()
+            match = resolver.resolve(npi=npi)
+            app = db.get(Application, match.application_id) if match and match.application_id else None
             if not app:
                 # Skip if application not present
                 continue
             flag = (row.get('Flag') or '').lower()
+            file_type = SANCTIONS_TYPE if flag == 'sanctioned' else FILE_TYPE
+            row_key = f'{file_type}:{npi.strip()}'
+            digest = content_hash(row)
+            stored = ledger.lookup([row_key])
+            current = current_documents_query(db, app.form_id).filter(CurrentDocument.file_type == file_type).first()
+            if current is not None and ledger.unchanged(stored, row_key, digest, current.id):
+                continue
             if flag == 'sanctioned':
                 before_s = db.query(UploadedDocument).filter_by(form_id=app.form_id, file_type=SANCTIONS_TYPE).count()
-                upsert_sanctions(db, app, row)
+                doc = upsert_sanctions(db, app, row)
                 after_s = db.query(UploadedDocument).filter_by(form_id=app.form_id, file_type=SANCTIONS_TYPE).count()
                 if after_s>before_s:
                     sanctions_inserted += 1
@@ -128,15 +148,20 @@ def ingest():
                     sanctions_updated += 1
             else:
                 before = db.query(UploadedDocument).filter_by(form_id=app.form_id, file_type=FILE_TYPE).count()
-                upsert_board_cert(db, app, row)
+                doc = upsert_board_cert(db, app, row)
                 after = db.query(UploadedDocument).filter_by(form_id=app.form_id, file_type=FILE_TYPE).count()
                 if after>before:
                     inserted += 1
                 else:
                     updated += 1
+            db.flush()
+            ledger.record([{'row_key': row_key, 'content_hash': digest, 'form_id': app.form_id, 'uploaded_document_id': doc.id}])
+    resolver.finish()
+    ledger.finish()
     db.commit()
     db.close()
     print(f'Ingestion complete. BoardCert Inserted={inserted} Updated={updated} Sanctions Inserted={sanctions_inserted} Updated={sanctions_updated}')
+    print(f'Ledger: {ledger.summary()}')
 
 if __name__ == '__main__':
     ingest()
@@ -1,4 +1,4 @@
-import os, sys, json
+import os, sys
 from typing import Any, Dict
 
 # Ensure project root path
@@ -7,10 +7,11 @@ PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-import openpyxl
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models import UploadedDocument, Application, FormData
+from app.models import Application
+from app.services.entity_resolution import EntityResolver
+from app.services.excel_ingest import DocumentWriter, SheetReader, cell_str, commit_size_arg, header_contains, sheet_ledger
 
 SHEET_NAME = "Sanctioned"
 
@@ -31,43 +32,25 @@ HEADER_MAP = {
 
 
 def load_sheet(path: str):
-    wb = openpyxl.load_workbook(path, data_only=True)
-    if SHEET_NAME not in wb.sheetnames:
-        raise RuntimeError(f"Sheet '{SHEET_NAME}' not found in Excel file")
-    ws = wb[SHEET_NAME]
-    # Build header index map (lowercased)
-    headers = {}
-    for j, cell in enumerate(ws[2], start=1):  # assume header row at 2
-        key = (str(cell.value) or "").strip().lower()
-        if key:
-            headers[j] = key
-    # Parse rows starting at 3
-    rows = []
-    for i in range(3, ws.max_row + 1):
-        rec = {}
-        for j, key in headers.items():
-            rec[key] = ws.cell(row=i, column=j).value
-        # basic filter: keep only flagged 'Sanctioned'
+    # Header row 2, keys lowercased; keep only rows flagged 'Sanctioned' that carry an NPI
+    reader = SheetReader(path, SHEET_NAME, header_contains("flag", exact=True), default_header_row=2, lower=True)
+    for rec in reader:
         flag = (str(rec.get("flag") or "").strip().lower())
-        raw_npi = rec.get("provider_npi") or rec.get("npi")
-        if isinstance(raw_npi, float) or isinstance(raw_npi, int):
-            npi = str(int(raw_npi))
-        else:
-            npi = (str(raw_npi or "").strip())
-        if not npi:
+        if not _npi(rec):
             continue
         if flag and flag.startswith("sanctioned"):
-            rows.append(rec)
-    return rows
+            yield rec
+
+
+def _npi(rec: Dict[str, Any]) -> str:
+    return cell_str(rec.get("provider_npi") or rec.get("npi"))
 
 
 def normalized_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
     # Build a structured dict to store in UploadedDocument.verification_data
-    raw_npi = rec.get("provider_npi") or rec.get("npi")
-    npi_str = str(int(raw_npi)) if isinstance(raw_npi, (int, float)) else str(raw_npi or "").strip()
     return {
         "source": "Other_Attributes_Schema.xlsx:Sanctioned",
-        "npi": npi_str,
+        "npi": _npi(rec),
         "provider": {
             "first_name": rec.get("provider_first_name") or rec.get("first_name"),
             "last_name": rec.get("provider_last_name") or rec.get("last_name"),
@@ -82,68 +65,39 @@ def normalized_payload(rec: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def upsert_sanction(db: Session, form_id: str, payload: Dict[str, Any]):
-    # Find an existing sanctions record for this form
-    row = (
-        db.query(UploadedDocument)
-        .filter(UploadedDocument.form_id == form_id)
-        .filter(UploadedDocument.file_type == "sanctions")
-        .first()
-    )
-    if not row:
-        row = UploadedDocument(
-            form_id=form_id,
-            filename=f"sanctions_{form_id}.json",
-            file_extension="json",
-            file_type="sanctions",
-            status="In Progress",
-        )
-        db.add(row)
-        db.flush()
-    row.verification_data = json.dumps(payload)
-    if not row.status:
-        row.status = "In Progress"
-    return row
-
-
 def main():
     excel_path = os.path.join(PROJECT_ROOT, "data", "Other_Attributes_Schema.xlsx")
-    records = load_sheet(excel_path)
-    print(f"Loaded sanctioned records: {len(records)}")
 
     db: Session = SessionLocal()
     try:
-        npi_to_form = {}
-        # Build quick index: NPI -> form_id (prefer direct form_data match)
-        for f in db.query(FormData).all():
-            if f.npi:
-                npi_to_form[str(f.npi).strip()] = f.form_id
-        # Fallback via applications table
-        for a in db.query(Application).all():
-            if a.npi and a.form_id:
-                npi_to_form.setdefault(str(a.npi).strip(), a.form_id)
-
-        upserts = 0
+        # NPI only: a fuzzy name match is not enough to mark an application SANCTIONED
+        resolver = EntityResolver(db, "sanctioned_excel", fuzzy=False)
+        writer = DocumentWriter(
+            db, "sanctions", lambda form_id: f"sanctions_{form_id}.json",
+            commit_size=commit_size_arg(), ledger=sheet_ledger(db, excel_path, SHEET_NAME),
+        )
+
+        records = 0
         app_updates = 0
-        for rec in records:
-            raw_npi = rec.get("provider_npi") or rec.get("npi")
-            npi = str(int(raw_npi)) if isinstance(raw_npi, (int, float)) else str(raw_npi or "").strip()
-            form_id = npi_to_form.get(npi)
-            if not form_id:
+        for rec in load_sheet(excel_path):
+            records += 1
+            match = resolver.resolve(npi=_npi(rec))
+            if not match:
                 continue
-            payload = normalized_payload(rec)
-            upsert_sanction(db, form_id, payload)
-            upserts += 1
+            writer.write(match.form_id, verification=normalized_payload(rec), row_key=_npi(rec))
             # Mark application as SANCTIONED if NPI matches
-            app = db.query(Application).filter(Application.form_id == form_id).first()
+            app = db.get(Application, match.application_id) if match.application_id else None
             if app:
                 if app.psv_status != "SANCTIONED":
                     app.psv_status = "SANCTIONED"
                 if app.committee_status != "SANCTIONED":
                     app.committee_status = "SANCTIONED"
                 app_updates += 1
+        writer.finish()
+        print(f"Loaded sanctioned records: {records}")
+        resolver.finish()
         db.commit()
-        print(f"Ingest complete. Sanctions upserts={upserts} applications_marked={app_updates}")
+        print(f"Ingest complete. Sanctions upserts={writer.written} ({writer.summary()}) applications_marked={app_updates}")
     finally:
         db.close()
 
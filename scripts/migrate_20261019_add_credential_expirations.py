@@ -0,0 +1,85 @@
+import sqlite3
+from pathlib import Path
+
+DB=Path('credential.db')
+
+# Adds uploaded_documents.updated_at (stamped by triggers for raw-SQL writers) plus the
+# credential_expirations and job_state tables used by scripts/run_expiration_scan.py.
+# Existing documents are stamped with the migration time, so the first scan covers them.
+
+TOUCH="UPDATE uploaded_documents SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') || '000' WHERE id = NEW.id;"
+
+TRIGGERS = {
+    'trg_uploaded_documents_touch_insert': f'''CREATE TRIGGER trg_uploaded_documents_touch_insert AFTER INSERT ON uploaded_documents
+WHEN NEW.updated_at IS NULL BEGIN {TOUCH} END''',
+    'trg_uploaded_documents_touch_update': f'''CREATE TRIGGER trg_uploaded_documents_touch_update AFTER UPDATE ON uploaded_documents
+WHEN NEW.updated_at IS OLD.updated_at BEGIN {TOUCH} END''',
+}
+
+TABLES = {
+    'credential_expirations': '''CREATE TABLE credential_expirations (
+    id INTEGER NOT NULL,
+    uploaded_document_id INTEGER NOT NULL,
+    form_id VARCHAR,
+    file_type VARCHAR,
+    credential VARCHAR NOT NULL,
+    field VARCHAR,
+    raw_value VARCHAR,
+    expires_on DATE NOT NULL,
+    scanned_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(uploaded_document_id) REFERENCES uploaded_documents (id)
+)''',
+    'job_state': '''CREATE TABLE job_state (
+    name VARCHAR NOT NULL,
+    watermark DATETIME,
+    last_started_at DATETIME,
+    last_finished_at DATETIME,
+    last_stats TEXT,
+    PRIMARY KEY (name)
+)''',
+}
+
+INDEXES = {
+    'ix_uploaded_documents_updated_at': 'CREATE INDEX ix_uploaded_documents_updated_at ON uploaded_documents (updated_at)',
+    'ix_credential_expirations_id': 'CREATE INDEX ix_credential_expirations_id ON credential_expirations (id)',
+    'ix_credential_expirations_uploaded_document_id': 'CREATE INDEX ix_credential_expirations_uploaded_document_id ON credential_expirations (uploaded_document_id)',
+    'ix_credential_expirations_form_id': 'CREATE INDEX ix_credential_expirations_form_id ON credential_expirations (form_id)',
+    'ix_credential_expirations_date': 'CREATE INDEX ix_credential_expirations_date ON credential_expirations (expires_on, credential)',
+}
+
+
+def exists(cur, kind, name):
+    cur.execute("SELECT name FROM sqlite_master WHERE type=? AND name=?", (kind, name))
+    return cur.fetchone() is not None
+
+
+def column_exists(cur, table, column):
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(r[1] == column for r in cur.fetchall())
+
+
+def migrate():
+    if not DB.exists():
+        print('DB not found')
+        return
+    conn=sqlite3.connect(DB)
+    cur=conn.cursor()
+    if not column_exists(cur,'uploaded_documents','updated_at'):
+        cur.execute('ALTER TABLE uploaded_documents ADD COLUMN updated_at DATETIME')
+        cur.execute("UPDATE uploaded_documents SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'")
+        print(f'Added uploaded_documents.updated_at; stamped {cur.rowcount} rows.')
+    else:
+        print('uploaded_documents.updated_at already exists.')
+    for kind, items in (('table', TABLES), ('trigger', TRIGGERS), ('index', INDEXES)):
+        for name, ddl in items.items():
+            if not exists(cur, kind, name):
+                cur.execute(ddl)
+                print(f'Created {kind} {name}.')
+            else:
+                print(f'{kind} {name} already exists.')
+    conn.commit()
+    conn.close()
+
+if __name__=='__main__':
+    migrate()
@@ -0,0 +1,56 @@
+import sqlite3
+from pathlib import Path
+
+DB=Path('credential.db')
+
+# Creates current_documents, the (form_id, file_type) -> uploaded_document_id pointer
+# that read paths join through instead of filtering status != 'Replaced', and points
+# each pair at its newest non-Replaced document. Re-running only fills missing pairs.
+
+DDL='''CREATE TABLE current_documents (
+    form_id VARCHAR NOT NULL,
+    file_type VARCHAR NOT NULL,
+    uploaded_document_id INTEGER NOT NULL,
+    updated_at DATETIME,
+    PRIMARY KEY (form_id, file_type),
+    UNIQUE (uploaded_document_id),
+    FOREIGN KEY(uploaded_document_id) REFERENCES uploaded_documents (id)
+);'''
+
+BACKFILL='''INSERT OR IGNORE INTO current_documents (form_id, file_type, uploaded_document_id, updated_at)
+SELECT form_id, file_type, MAX(id), CURRENT_TIMESTAMP
+FROM uploaded_documents
+WHERE form_id IS NOT NULL AND file_type IS NOT NULL AND COALESCE(status, '') != 'Replaced'
+GROUP BY form_id, file_type'''
+
+
+def table_exists(cur, name):
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,))
+    return cur.fetchone() is not None
+
+
+def migrate():
+    if not DB.exists():
+        print('DB not found')
+        return
+    conn=sqlite3.connect(DB)
+    cur=conn.cursor()
+    if not table_exists(cur,'current_documents'):
+        cur.execute(DDL)
+        print('Created current_documents table.')
+    else:
+        print('current_documents already exists.')
+    # Superseded by the pointer table for latest-per-type lookups
+    cur.execute('DROP INDEX IF EXISTS ix_uploaded_documents_form_type_status_id')
+    cur.execute(BACKFILL)
+    print(f'Pointed {cur.rowcount} (form_id, file_type) pairs at their newest document.')
+    # Older non-Replaced rows for a pair are history now; report them rather than rewriting statuses
+    cur.execute('''SELECT COUNT(1) FROM uploaded_documents d
+                   WHERE COALESCE(d.status, '') != 'Replaced'
+                   AND NOT EXISTS (SELECT 1 FROM current_documents c WHERE c.uploaded_document_id = d.id)''')
+    print(f'Non-Replaced documents not current (superseded duplicates): {cur.fetchone()[0]}')
+    conn.commit()
+    conn.close()
+
+if __name__=='__main__':
+    migrate()
@@ -0,0 +1,53 @@
+import sqlite3
+from pathlib import Path
+
+DB=Path('credential.db')
+
+# Adds the entity_matches table written by app/services/entity_resolution.EntityResolver
+# (ingest scripts) and scripts/realign_documents_to_applications.py.
+
+TABLES = {
+    'entity_matches': '''CREATE TABLE entity_matches (
+    id INTEGER NOT NULL,
+    source VARCHAR NOT NULL,
+    source_key VARCHAR NOT NULL,
+    form_id VARCHAR,
+    application_id VARCHAR,
+    method VARCHAR NOT NULL,
+    score FLOAT,
+    candidates INTEGER,
+    matched_at DATETIME,
+    PRIMARY KEY (id)
+)''',
+}
+
+INDEXES = {
+    'ix_entity_matches_id': 'CREATE INDEX ix_entity_matches_id ON entity_matches (id)',
+    'ix_entity_matches_form_id': 'CREATE INDEX ix_entity_matches_form_id ON entity_matches (form_id)',
+    'ux_entity_matches_source_key': 'CREATE UNIQUE INDEX ux_entity_matches_source_key ON entity_matches (source, source_key)',
+}
+
+
+def exists(cur, kind, name):
+    cur.execute("SELECT name FROM sqlite_master WHERE type=? AND name=?", (kind, name))
+    return cur.fetchone() is not None
+
+
+def migrate():
+    if not DB.exists():
+        print('DB not found')
+        return
+    conn=sqlite3.connect(DB)
+    cur=conn.cursor()
+    for kind, items in (('table', TABLES), ('index', INDEXES)):
+        for name, ddl in items.items():
+            if not exists(cur, kind, name):
+                cur.execute(ddl)
+                print(f'Created {kind} {name}.')
+            else:
+                print(f'{kind} {name} already exists.')
+    conn.commit()
+    conn.close()
+
+if __name__=='__main__':
+    migrate()
@@ -0,0 +1,54 @@
+import sqlite3
+from pathlib import Path
+
+DB=Path('credential.db')
+
+# Adds the ingestion_ledger table used by app/services/ingestion_ledger.Ledger
+# (scripts/ingest_*_from_excel.py and scripts/ingest_ocr_verification_data.py).
+
+TABLES = {
+    'ingestion_ledger': '''CREATE TABLE ingestion_ledger (
+    id INTEGER NOT NULL,
+    source VARCHAR NOT NULL,
+    sheet VARCHAR NOT NULL,
+    row_key VARCHAR NOT NULL,
+    content_hash VARCHAR NOT NULL,
+    form_id VARCHAR,
+    uploaded_document_id INTEGER,
+    ingested_at DATETIME,
+    vanished_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(uploaded_document_id) REFERENCES uploaded_documents (id)
+)''',
+}
+
+INDEXES = {
+    'ix_ingestion_ledger_id': 'CREATE INDEX ix_ingestion_ledger_id ON ingestion_ledger (id)',
+    'ix_ingestion_ledger_form_id': 'CREATE INDEX ix_ingestion_ledger_form_id ON ingestion_ledger (form_id)',
+    'ux_ingestion_ledger_row': 'CREATE UNIQUE INDEX ux_ingestion_ledger_row ON ingestion_ledger (source, sheet, row_key)',
+}
+
+
+def exists(cur, kind, name):
+    cur.execute("SELECT name FROM sqlite_master WHERE type=? AND name=?", (kind, name))
+    return cur.fetchone() is not None
+
+
+def migrate():
+    if not DB.exists():
+        print('DB not found')
+        return
+    conn=sqlite3.connect(DB)
+    cur=conn.cursor()
+    for kind, items in (('table', TABLES), ('index', INDEXES)):
+        for name, ddl in items.items():
+            if not exists(cur, kind, name):
+                cur.execute(ddl)
+                print(f'Created {kind} {name}.')
+            else:
+                print(f'{kind} {name} already exists.')
+    conn.commit()
+    conn.close()
+
+if __name__=='__main__':
+    migrate()
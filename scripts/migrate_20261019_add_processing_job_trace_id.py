@@ -0,0 +1,29 @@
+import sqlite3
+from pathlib import Path
+
+DB=Path('credential.db')
+
+# Adds processing_jobs.trace_id: the trace of the request that queued the job, so the
+# worker's spans (app/tracing.py) join it.
+
+def column_exists(cur, table, col):
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(r[1]==col for r in cur.fetchall())
+
+
+def migrate():
+    if not DB.exists():
+        print('DB not found')
+        return
+    conn=sqlite3.connect(DB)
+    cur=conn.cursor()
+    if not column_exists(cur,'processing_jobs','trace_id'):
+        cur.execute("ALTER TABLE processing_jobs ADD COLUMN trace_id VARCHAR")
+        print('Added trace_id column.')
+    else:
+        print('trace_id already exists.')
+    conn.commit()
+    conn.close()
+
+if __name__=='__main__':
+    migrate()
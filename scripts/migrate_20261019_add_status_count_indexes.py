@@ -0,0 +1,34 @@
+import sqlite3
+from pathlib import Path
+
+DB=Path('credential.db')
+
+# Covering indexes for the per-application status GROUP BYs (app/services/status_counts.py).
+INDEXES = {
+    'ix_uploaded_documents_form_status': 'CREATE INDEX ix_uploaded_documents_form_status ON uploaded_documents (form_id, status)',
+    'ix_email_records_application_status': 'CREATE INDEX ix_email_records_application_status ON email_records (application_id, status)',
+}
+
+
+def index_exists(cur, name):
+    cur.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (name,))
+    return cur.fetchone() is not None
+
+
+def migrate():
+    if not DB.exists():
+        print('DB not found')
+        return
+    conn=sqlite3.connect(DB)
+    cur=conn.cursor()
+    for name, ddl in INDEXES.items():
+        if not index_exists(cur, name):
+            cur.execute(ddl)
+            print(f'Created {name}.')
+        else:
+            print(f'{name} already exists.')
+    conn.commit()
+    conn.close()
+
+if __name__=='__main__':
+    migrate()
@@ -0,0 +1,83 @@
+import ast
+import sqlite3
+import sys
+from pathlib import Path
+
+import orjson
+
+DB = Path('credential.db')
+TABLE = 'uploaded_documents'
+COLUMNS = ('ocr_output', 'pdf_match', 'json_match', 'verification_data')
+BATCH = 1000
+
+# Rewrites every stored value in the JSON columns above as canonical strict JSON
+# (the encoding app.json_text.JSONText writes):
+#   valid JSON          -> re-encoded with orjson (only updated if the text changes)
+#   Python literal repr -> parsed with ast.literal_eval once, then encoded as JSON
+#   empty string        -> NULL
+#   anything else       -> kept as a JSON string so no content is lost
+# Pass --dry-run to only report counts.
+
+
+def canonicalize(raw):
+    """Return (kind, new_value) for one stored value."""
+    if raw is None:
+        return 'null', None
+    text = raw.decode('utf-8', 'replace') if isinstance(raw, bytes) else str(raw)
+    if not text.strip():
+        return 'emptied', None
+    try:
+        return 'json', orjson.dumps(orjson.loads(text)).decode('utf-8')
+    except orjson.JSONDecodeError:
+        pass
+    try:
+        return 'literal', orjson.dumps(ast.literal_eval(text)).decode('utf-8')
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError, orjson.JSONEncodeError):
+        return 'wrapped', orjson.dumps(text).decode('utf-8')
+
+
+def migrate(dry_run=False):
+    if not DB.exists():
+        print('DB not found')
+        return
+    conn = sqlite3.connect(DB)
+    read = conn.cursor()
+    write = conn.cursor()
+    counts = {'null': 0, 'json': 0, 'literal': 0, 'emptied': 0, 'wrapped': 0}
+    rewritten = 0
+    updates = []
+
+    read.execute(f"SELECT id, {', '.join(COLUMNS)} FROM {TABLE}")
+    while True:
+        rows = read.fetchmany(BATCH)
+        if not rows:
+            break
+        for row in rows:
+            doc_id, values = row[0], row[1:]
+            new_values = []
+            for raw in values:
+                kind, new = canonicalize(raw)
+                counts[kind] += 1
+                new_values.append(new)
+            if list(values) != new_values:
+                rewritten += 1
+                updates.append((*new_values, doc_id))
+        if updates and not dry_run:
+            write.executemany(
+                f"UPDATE {TABLE} SET {', '.join(f'{c}=?' for c in COLUMNS)} WHERE id=?",
+                updates,
+            )
+        updates = []
+
+    if not dry_run:
+        conn.commit()
+    conn.close()
+    print(
+        f"{'[dry-run] ' if dry_run else ''}JSON canonicalization complete. rows_rewritten={rewritten} "
+        f"json={counts['json']} literal_converted={counts['literal']} text_wrapped={counts['wrapped']} "
+        f"emptied={counts['emptied']} null={counts['null']}"
+    )
+
+
+if __name__ == '__main__':
+    migrate(dry_run='--dry-run' in sys.argv[1:])
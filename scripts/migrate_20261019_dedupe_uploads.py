@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.blob_store import hash_file, place_blob
+
+DB = Path('credential.db')
+UPLOADS = Path('uploads')
+BLOB_DIR = UPLOADS / 'blobs'
+
+# Moves every file in uploads/ that a document points at into the content-addressed
+# store (uploads/blobs), keeping one copy per sha256, links uploaded_documents.blob_sha256
+# and sets file_blobs.ref_count from the references in both uploaded_documents and
+# saved_files. Each file is committed before its original is removed, so the script can
+# be stopped and re-run. Files no document references are left in uploads/ and reported. Pass --dry-run to only report what would be reclaimed.
+
+DDL = '''CREATE TABLE file_blobs (
+    sha256 VARCHAR NOT NULL PRIMARY KEY,
+    size INTEGER NOT NULL,
+    ref_count INTEGER NOT NULL,
+    created_at DATETIME
+);'''
+
+
+def table_exists(cur, name):
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,))
+    return cur.fetchone() is not None
+
+
+def column_exists(cur, table, col):
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(r[1] == col for r in cur.fetchall())
+
+
+def blob_refs(cur, sha, count_saved_files):
+    """References to a blob from both tables that share file_blobs (uploaded_documents and saved_files)."""
+    cur.execute("SELECT COUNT(1) FROM uploaded_documents WHERE blob_sha256=?", (sha,))
+    refs = cur.fetchone()[0]
+    if count_saved_files:
+        cur.execute("SELECT COUNT(1) FROM saved_files WHERE blob_sha256=?", (sha,))
+        refs += cur.fetchone()[0]
+    return refs
+
+
+def stored_name_candidates(filename, form_id):
+    """Names a document's bytes may have on disk: {base}__{form_id}.{ext}, or the filename itself."""
+    names = set()
+    if not filename:
+        return names
+    if '__' in filename:
+        names.add(filename)
+    if form_id:
+        base = ".".join(filename.split(".")[:-1])
+        ext = filename.split(".")[-1]
+        names.add(f"{base}__{form_id}.{ext}")
+    return names
+
+
+def migrate(dry_run=False):
+    if not DB.exists():
+        print('DB not found')
+        return
+    if not UPLOADS.exists():
+        print('uploads/ not found')
+        return
+
+    conn = sqlite3.connect(DB)
+    cur = conn.cursor()
+    if not dry_run:
+        if not table_exists(cur, 'file_blobs'):
+            cur.execute(DDL)
+            print('Created file_blobs table.')
+        if not column_exists(cur, 'uploaded_documents', 'blob_sha256'):
+            cur.execute("ALTER TABLE uploaded_documents ADD COLUMN blob_sha256 VARCHAR REFERENCES file_blobs (sha256)")
+            print('Added uploaded_documents.blob_sha256 column.')
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_uploaded_documents_blob_sha256 ON uploaded_documents (blob_sha256)")
+
+    # Index documents by every on-disk name they could be stored under
+    docs_by_name = {}
+    link_filter = "WHERE blob_sha256 IS NULL" if column_exists(cur, 'uploaded_documents', 'blob_sha256') else ""
+    cur.execute(f"SELECT id, form_id, filename FROM uploaded_documents {link_filter}")
+    for doc_id, form_id, filename in cur.fetchall():
+        for name in stored_name_candidates(filename, form_id):
+            docs_by_name.setdefault(name, []).append(doc_id)
+
+    # saved_files may already point at the same blobs (zip screenshots); they count too
+    count_saved_files = table_exists(cur, 'saved_files') and column_exists(cur, 'saved_files', 'blob_sha256')
+
+    files = sorted(p for p in UPLOADS.iterdir() if p.is_file())
+    total_bytes = 0
+    unique = {}
+    linked = 0
+    unreferenced = 0
+    for p in files:
+        sha, size = hash_file(str(p))
+        doc_ids = docs_by_name.get(p.name, [])
+        if not doc_ids:
+            # No document points at this file: leave it where it is rather than
+            # parking bytes in the store that nothing would ever release
+            unreferenced += 1
+            continue
+        total_bytes += size
+        unique.setdefault(sha, size)
+        linked += len(doc_ids)
+        if dry_run:
+            continue
+        # Copy into the store, commit the links, and only then drop the original, so a
+        # crash at any point leaves every document_path() resolvable (re-run to finish)
+        place_blob(str(p), sha, move=False, blob_dir=str(BLOB_DIR))
+        cur.executemany(
+            "UPDATE uploaded_documents SET blob_sha256=? WHERE id=?",
+            [(sha, doc_id) for doc_id in doc_ids],
+        )
+        refs = blob_refs(cur, sha, count_saved_files)
+        cur.execute(
+            '''INSERT INTO file_blobs (sha256, size, ref_count, created_at)
+               VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+               ON CONFLICT(sha256) DO UPDATE SET ref_count=excluded.ref_count''',
+            (sha, size, refs),
+        )
+        conn.commit()
+        os.remove(p)
+    conn.commit()
+    conn.close()
+
+    unique_bytes = sum(unique.values())
+    print(
+        f"{'[dry-run] ' if dry_run else ''}Dedupe complete. files={len(files)} unique_blobs={len(unique)} "
+        f"duplicates={len(files) - unreferenced - len(unique)} documents_linked={linked} unreferenced_files_left={unreferenced}"
+    )
+    print(f"Space reclaimed: {total_bytes - unique_bytes} bytes ({total_bytes} -> {unique_bytes})")
+
+
+if __name__ == '__main__':
+    migrate(dry_run='--dry-run' in sys.argv[1:])
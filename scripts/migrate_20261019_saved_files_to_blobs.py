@@ -0,0 +1,105 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import uuid
+from pathlib import Path
+
+# Ensure project root is on sys.path when running directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.blob_store import place_blob
+from app.services.upload_service import PARTIAL_DIR
+
+DB = Path('credential.db')
+
+# saved_files rows now point at the content-addressed store (saved_files.blob_sha256)
+# instead of carrying the image inline. Rebuilds saved_files with a nullable file_data
+# and the blob_sha256 column, then moves every inline file_data into uploads/blobs and
+# takes a file_blobs reference for it. Pass --dry-run to only report.
+
+DDL = '''CREATE TABLE saved_files_new (
+    id INTEGER NOT NULL,
+    filename VARCHAR NOT NULL,
+    file_type VARCHAR NOT NULL,
+    attribute VARCHAR,
+    file_data BLOB,
+    blob_sha256 VARCHAR,
+    created_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(blob_sha256) REFERENCES file_blobs (sha256)
+)'''
+
+BLOB_REF = '''INSERT INTO file_blobs (sha256, size, ref_count, created_at) VALUES (?, ?, 1, CURRENT_TIMESTAMP)
+ON CONFLICT(sha256) DO UPDATE SET ref_count = ref_count + 1'''
+
+
+def table_exists(cur, name):
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,))
+    return cur.fetchone() is not None
+
+
+def columns(cur, table):
+    cur.execute(f"PRAGMA table_info({table})")
+    return {r[1]: r for r in cur.fetchall()}
+
+
+def rebuild(cur):
+    cols = columns(cur, 'saved_files')
+    if 'blob_sha256' in cols and not cols['file_data'][3]:  # notnull flag
+        print('saved_files already rebuilt.')
+        return
+    cur.execute(DDL)
+    cur.execute('''INSERT INTO saved_files_new (id, filename, file_type, attribute, file_data, created_at)
+                   SELECT id, filename, file_type, attribute, file_data, created_at FROM saved_files''')
+    cur.execute('DROP TABLE saved_files')
+    cur.execute('ALTER TABLE saved_files_new RENAME TO saved_files')
+    cur.execute('CREATE INDEX IF NOT EXISTS ix_saved_files_blob_sha256 ON saved_files (blob_sha256)')
+    print('Rebuilt saved_files with blob_sha256.')
+
+
+def migrate(dry_run=False):
+    if not DB.exists():
+        print('DB not found')
+        return
+    conn = sqlite3.connect(DB)
+    cur = conn.cursor()
+    if not table_exists(cur, 'saved_files'):
+        print('saved_files not found')
+        return
+    if not table_exists(cur, 'file_blobs'):
+        print('file_blobs not found; run scripts/migrate_20261019_dedupe_uploads.py first')
+        return
+    if dry_run:
+        cur.execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(file_data)), 0) FROM saved_files WHERE file_data IS NOT NULL')
+        rows, size = cur.fetchone()
+        print(f'Would move {rows} inline files ({size / 1e6:.1f} MB) into uploads/blobs.')
+        return
+
+    rebuild(cur)
+    conn.commit()
+
+    # One row at a time so the images never all sit in memory
+    cur.execute('SELECT id FROM saved_files WHERE file_data IS NOT NULL')
+    ids = [r[0] for r in cur.fetchall()]
+    new_blobs = 0
+    for row_id in ids:
+        cur.execute('SELECT file_data FROM saved_files WHERE id=?', (row_id,))
+        data = cur.fetchone()[0]
+        sha256 = hashlib.sha256(data).hexdigest()
+        tmp = os.path.join(PARTIAL_DIR, f'{uuid.uuid4()}.upload')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        new_blobs += place_blob(tmp, sha256)
+        cur.execute(BLOB_REF, (sha256, len(data)))
+        cur.execute('UPDATE saved_files SET blob_sha256=?, file_data=NULL WHERE id=?', (sha256, row_id))
+        conn.commit()
+    print(f'Moved {len(ids)} inline files into the blob store ({new_blobs} new blobs). Run VACUUM to reclaim space.')
+    conn.close()
+
+
+if __name__ == '__main__':
+    migrate(dry_run='--dry-run' in sys.argv[1:])
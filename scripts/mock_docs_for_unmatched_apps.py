@@ -1,9 +1,17 @@
-import csv, json
+import csv, json, sys
 import sqlite3
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.models import refresh_document_fields  # noqa
+from app.services.upload_service import current_documents_upsert_sql  # noqa
+
 DB = Path('credential.db')
 CSV = Path('data/ocrDataAndVerificationSectionData.csv')
+CURRENT_DOC_UPSERT = current_documents_upsert_sql()
 
 
 def fetchall_dict(cur):
@@ -49,14 +57,18 @@ def ensure_form(cur, app):
 
 
 def create_doc(cur, form_id, file_type, filename, ext, status, ocr_payload, verification):
-    cur.execute('SELECT id FROM uploaded_documents WHERE form_id=? AND file_type=?', (form_id, file_type))
+    cur.execute('SELECT uploaded_document_id FROM current_documents WHERE form_id=? AND file_type=?', (form_id, file_type))
     row = cur.fetchone()
     if row:
         cur.execute('UPDATE uploaded_documents SET status=?, ocr_output=?, verification_data=? WHERE id=?',
                     (status, json.dumps(ocr_payload) if ocr_payload else None, json.dumps(verification) if verification else None, row[0]))
+        doc_id = row[0]
     else:
         cur.execute('INSERT INTO uploaded_documents(form_id, filename, file_extension, file_type, status, ocr_output, verification_data) VALUES (?,?,?,?,?,?,?)',
                     (form_id, filename, ext, file_type, status, json.dumps(ocr_payload) if ocr_payload else None, json.dumps(verification) if verification else None))
+        doc_id = cur.lastrowid
+        cur.execute(CURRENT_DOC_UPSERT, (form_id, file_type, doc_id))
+    refresh_document_fields(cur, [doc_id])
 
 
 def run():
@@ -1,8 +1,26 @@
-import sqlite3, csv, json
+import sqlite3, csv, json, sys
+from collections import Counter
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.entity_resolution import Provider, ProviderIndex, normalize_name, normalize_npi  # noqa
+from app.date_normalizer import normalize_date  # noqa
+from app.models import refresh_document_fields  # noqa
+from app.services.upload_service import current_documents_upsert_sql  # noqa
+
 DB = Path('credential.db')
 CSV = Path('data/ocrDataAndVerificationSectionData.csv')
+CURRENT_DOC_UPSERT = current_documents_upsert_sql()
+# One entity_matches row per merged-away form (see app/services/entity_resolution.py)
+ENTITY_MATCH_UPSERT = (
+    "INSERT INTO entity_matches (source, source_key, form_id, application_id, method, score, candidates, matched_at) "
+    "VALUES ('realign',?,?,?,?,?,1,CURRENT_TIMESTAMP) "
+    'ON CONFLICT(source, source_key) DO UPDATE SET form_id=excluded.form_id, application_id=excluded.application_id, '
+    'method=excluded.method, score=excluded.score, matched_at=excluded.matched_at'
+)
 
 
 def fetchall_dict(cur):
@@ -55,6 +73,9 @@ def row_to_struct(row):
 def create_doc(cur, form_id, file_type, filename, ext, status, ocr_payload, verification):
     cur.execute('INSERT INTO uploaded_documents(form_id, filename, file_extension, file_type, status, ocr_output, verification_data) VALUES (?,?,?,?,?,?,?)',
                 (form_id, filename, ext, file_type, status, json.dumps(ocr_payload) if ocr_payload else None, json.dumps(verification) if verification else None))
+    doc_id = cur.lastrowid
+    cur.execute(CURRENT_DOC_UPSERT, (form_id, file_type, doc_id))
+    refresh_document_fields(cur, [doc_id])
 
 
 def run():
@@ -73,17 +94,18 @@ def run():
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
 
-    # Index form_data by NPI and by name
+    # Blocking index over form_data: NPI, normalized name, (Soundex, birth year)
     cur.execute('SELECT * FROM form_data')
     forms = fetchall_dict(cur)
-    forms_by_npi = {}
-    forms_by_name = {}
-    for f in forms:
-        npi = (f.get('npi') or '').strip()
-        if npi:
-            forms_by_npi.setdefault(npi, []).append(f)
-        key = ((f.get('provider_name') or '').strip().lower(), (f.get('provider_last_name') or '').strip().lower())
-        forms_by_name.setdefault(key, []).append(f)
+    dob_by_form = {f['form_id']: normalize_date(f.get('dob')) for f in forms}
+    index = ProviderIndex(
+        Provider(
+            f['form_id'], None, normalize_name(f.get('provider_name')), normalize_name(f.get('provider_last_name')),
+            {n for n in (normalize_npi(f.get('npi')),) if n}, dob_by_form[f['form_id']],
+        )
+        for f in forms if f.get('form_id')
+    )
+    methods = Counter()
 
     # Load applications
     cur.execute('SELECT * FROM applications')
@@ -96,21 +118,21 @@ def run():
     for app in apps:
         fid = ensure_form_for_app(cur, app)
         ensured_forms += 1
-        # Gather candidate forms to pull docs from
-        candidates = []
-        npi = (app.get('npi') or '').strip()
-        if npi and npi in forms_by_npi:
-            candidates.extend(forms_by_npi[npi])
-        key = ((app.get('name') or '').strip().lower(), (app.get('last_name') or '').strip().lower())
-        if key in forms_by_name:
-            candidates.extend(forms_by_name[key])
+        # Other forms for the same provider: same NPI, same normalized name, or a close name with the same DOB
+        candidates = index.matches(npi=app.get('npi'), first=app.get('name'), last=app.get('last_name'), dob=dob_by_form.get(fid))
         # Reassign any docs from candidate form_ids to this app's form_id
         for c in candidates:
-            src_fid = c.get('form_id')
+            src_fid = c.form_id
             if not src_fid or src_fid == fid:
                 continue
+            methods[c.method] += 1
+            cur.execute(ENTITY_MATCH_UPSERT, (src_fid, fid, app['id'], c.method, c.score))
             cur.execute('UPDATE uploaded_documents SET form_id=? WHERE form_id=?', (fid, src_fid))
             reassigned += cur.rowcount
+            cur.execute('UPDATE document_fields SET form_id=? WHERE form_id=?', (fid, src_fid))
+            # Move current-document pointers too; an existing pointer on the target form wins
+            cur.execute('UPDATE OR IGNORE current_documents SET form_id=? WHERE form_id=?', (fid, src_fid))
+            cur.execute('DELETE FROM current_documents WHERE form_id=?', (src_fid,))
         # Ensure at least one document exists
         cur.execute('SELECT COUNT(1) FROM uploaded_documents WHERE form_id=?', (fid,))
         count = cur.fetchone()[0]
@@ -130,6 +152,7 @@ def run():
     conn.commit()
     conn.close()
     print(f'Ensured forms={ensured_forms} Reassigned docs={reassigned} Created docs={created_docs}')
+    print('Merged forms by match method: ' + (' '.join(f'{m}={n}' for m, n in sorted(methods.items())) or 'none'))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,35 @@
+import os
+import sys
+
+# Ensure project root is on sys.path when running directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.database import Base, SessionLocal, engine
+from app.services.expiration_service import scan_expirations
+
+# Nightly refresh of credential_expirations. Only current documents whose updated_at is
+# at or after the previous run's start are re-scanned.
+# Usage: python scripts/run_expiration_scan.py [--full]
+#   --full  ignore the last-run watermark and rebuild from every current document
+# e.g. cron: 15 2 * * * cd /srv/cred-backend && python scripts/run_expiration_scan.py
+
+
+def main():
+    full = "--full" in sys.argv[1:]
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        stats = scan_expirations(db, full=full)
+    finally:
+        db.close()
+    print(
+        f"Expiration scan complete. full={stats['full']} since={stats['since']} documents={stats['documents']} "
+        f"expirations={stats['expirations']} unparsed={stats['unparsed']} pruned={stats['pruned']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+
+# Ensure project root is on sys.path when running directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.database import Base, SessionLocal, engine
+from app.services.document_processor import run_next_job
+
+# Drains processing_jobs in lane order (expedited -> new -> backfill).
+# Usage: python scripts/run_processing_worker.py [--once] [poll_seconds]
+#   --once  process everything currently queued, then exit
+
+
+def main():
+    args = sys.argv[1:]
+    once = "--once" in args
+    rest = [a for a in args if a != "--once"]
+    poll_seconds = float(rest[0]) if rest else 10
+
+    Base.metadata.create_all(bind=engine)
+    processed = 0
+    while True:
+        db = SessionLocal()
+        try:
+            while run_next_job(db):
+                processed += 1
+        finally:
+            db.close()
+        if once:
+            break
+        time.sleep(poll_seconds)
+    print(f"Worker finished. jobs_processed={processed}")
+
+
+if __name__ == "__main__":
+    main()
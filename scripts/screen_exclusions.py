@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+
+# Ensure project root is on sys.path when running directly
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.database import Base, SessionLocal, engine
+from app.services.exclusion_screening import LIST_COLUMNS, load_exclusion_list, screen_all_providers
+
+# Loads exclusion lists and re-screens every provider against them in one pass.
+# Usage: python scripts/screen_exclusions.py [--leie UPDATED.csv] [--sam SAM_Exclusions_Public_Extract.csv]
+#   Each list given replaces that source's previous rows; with no list the stored lists are
+#   re-screened (e.g. after new applications arrive).
+
+
+def parse_args(args):
+    lists = {}
+    i = 0
+    while i < len(args):
+        source = args[i].lstrip("-").upper()
+        if source not in LIST_COLUMNS or i + 1 >= len(args):
+            print("Usage: python scripts/screen_exclusions.py [--leie FILE] [--sam FILE]")
+            sys.exit(1)
+        lists[source] = args[i + 1]
+        i += 2
+    return lists
+
+
+def main():
+    lists = parse_args(sys.argv[1:])
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for source, path in lists.items():
+            started = time.perf_counter()
+            count = load_exclusion_list(db, source, path)
+            db.commit()
+            print(f"Loaded {source}: {count} records in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        stats = screen_all_providers(db)
+        db.commit()
+        print(
+            f"Screening complete in {time.perf_counter() - started:.1f}s. "
+            + " ".join(f"{k}={v}" for k, v in stats.items())
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models import FormData, FormFileUpload
-import json
+from app.models import CurrentDocument, FormData, UploadedDocument
+from app.services.upload_service import current_documents_query, set_current_documents
 
 FORM_ID = "685b2c97-fb64-4ae8-934f-da3058256fd5"
 
@@ -86,25 +86,26 @@ def main():
 
         for rec in psv_records:
             exists = (
-                db.query(FormFileUpload)
-                .filter(FormFileUpload.form_id == FORM_ID)
-                .filter(FormFileUpload.file_type == rec["file_type"])
+                current_documents_query(db, FORM_ID)
+                .filter(CurrentDocument.file_type == rec["file_type"])
                 .first()
             )
             if exists:
                 continue
 
-            row = FormFileUpload(
+            row = UploadedDocument(
                 form_id=FORM_ID,
                 filename=rec["filename"],
                 file_extension=rec["file_extension"],
                 file_type=rec["file_type"],
                 status=rec["status"],
-                ocr_output=json.dumps(rec["ocr_output"]) if rec.get("ocr_output") else None,
+                ocr_output=rec.get("ocr_output") or None,
                 pdf_match=None,
                 json_match=None,
             )
             db.add(row)
+            db.flush()
+            set_current_documents(db, [row])
         db.commit()
         print("PSV records seeded.")
     finally:
@@ -2,9 +2,17 @@ import os
 import re
 import shutil
 import sqlite3
+import sys
+import time
 from glob import glob
 
-ROOT = os.path.dirname(os.path.dirname(__file__))
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from app.models import refresh_document_fields  # noqa: E402
+from app.services.upload_service import current_documents_upsert_sql  # noqa: E402
+
 TARGET_DB = os.path.join(ROOT, 'credential.db')
 INITIAL_DB = os.path.join(ROOT, 'intial_cred.db.db')
 UPLOADS_DIR = os.path.join(ROOT, 'uploads')
@@ -18,6 +26,11 @@ TYPE_MAP = {
     'npi_2': 'npi',
 }
 
+# The initial DB is ATTACHed as ``src`` and every table is synced with one set-based
+# statement over the temp table ``sync_files`` (one row per upload file found on disk),
+# all inside a single transaction. Columns are the intersection of both schemas, read once
+# per table, so an initial DB from before the column renames still syncs.
+
 
 def ensure_backup(path: str):
     bak = path + '.bak'
@@ -28,113 +41,17 @@ def ensure_backup(path: str):
         print(f"Backup exists: {bak}")
 
 
-def get_conn(db_path: str):
-    return sqlite3.connect(db_path)
-
-
-def columns(cur, table: str):
-    cur.execute(f"PRAGMA table_info({table})")
+def columns(cur, schema: str, table: str):
+    cur.execute(f"PRAGMA {schema}.table_info({table})")
     return [r[1] for r in cur.fetchall()]
 
 
-def upsert_application(src_cur, dst_cur, form_id: str):
-    src_cur.execute("SELECT * FROM applications WHERE form_id=?", (form_id,))
-    row = src_cur.fetchone()
-    if not row:
-        return None
-    colnames = [d[0] for d in src_cur.description]
-    data = dict(zip(colnames, row))
-    dst_cur.execute("SELECT id FROM applications WHERE id=?", (data['id'],))
-    exists = dst_cur.fetchone() is not None
-    cols = [
-        'id','provider_id','form_id','name','last_name','email','phone','status','progress','assignee','source','market','specialty','address','npi','create_dt','last_updt_dt'
-    ]
-    placeholders = ",".join([":"+c for c in cols])
-    insert_sql = f"INSERT OR REPLACE INTO applications ({','.join(cols)}) VALUES ({placeholders})"
-    dst_cur.execute(insert_sql, {c: data.get(c) for c in cols})
-    print(f"{'Updated' if exists else 'Inserted'} application {data['id']} for form {form_id}")
-    return data['id']
-
-
-def upsert_form_data(src_cur, dst_cur, form_id: str):
-    src_cur.execute("SELECT * FROM form_data WHERE form_id=?", (form_id,))
-    row = src_cur.fetchone()
-    if not row:
-        return None
-    colnames = [d[0] for d in src_cur.description]
-    data = dict(zip(colnames, row))
-    # Build upsert without copying numeric primary key id
-    cols = [c for c in colnames if c != 'id']
-    placeholders = ",".join([":"+c for c in cols])
-    # Try REPLACE based on form_id uniqueness
-    dst_cur.execute("SELECT id FROM form_data WHERE form_id=?", (form_id,))
-    exists = dst_cur.fetchone() is not None
-    if exists:
-        set_clause = ",".join([f"{c}=:{c}" for c in cols if c != 'form_id'])
-        sql = f"UPDATE form_data SET {set_clause} WHERE form_id=:form_id"
-        dst_cur.execute(sql, {c: data.get(c) for c in cols})
-        print(f"Updated form_data for {form_id}")
-    else:
-        sql = f"INSERT INTO form_data ({','.join(cols)}) VALUES ({placeholders})"
-        dst_cur.execute(sql, {c: data.get(c) for c in cols})
-        print(f"Inserted form_data for {form_id}")
-    # Return current row id
-    dst_cur.execute("SELECT id FROM form_data WHERE form_id=?", (form_id,))
-    rid = dst_cur.fetchone()
-    return rid[0] if rid else None
-
-
-def pick_initial_upload(src_cur, form_id: str, ftype: str):
-    src_cur.execute(
-        "SELECT * FROM form_file_uploads WHERE form_id=? AND LOWER(file_type)=? ORDER BY id DESC",
-        (form_id, ftype.lower()),
-    )
-    row = src_cur.fetchone()
-    if not row:
-        return None
-    colnames = [d[0] for d in src_cur.description]
-    return dict(zip(colnames, row))
-
-
-def insert_upload(dst_cur, form_id: str, filename: str, ftype: str, initial: dict | None):
-    cols = ['form_id','filename','file_extension','file_type','status','ocr_output','pdf_match','json_match']
-    payload = {
-        'form_id': form_id,
-        'filename': filename,
-        'file_extension': 'pdf',
-        'file_type': ftype,
-        'status': (initial.get('status') if initial else 'New') if initial is not None else 'New',
-        'ocr_output': (initial.get('ocr_output') if initial else None),
-        'pdf_match': (initial.get('pdf_match') if initial else None),
-        'json_match': (initial.get('json_match') if initial else None),
-    }
-    placeholders = ",".join([":"+c for c in cols])
-    sql = f"INSERT INTO form_file_uploads ({','.join(cols)}) VALUES ({placeholders})"
-    dst_cur.execute(sql, payload)
-    dst_cur.execute("SELECT last_insert_rowid()")
-    uid = dst_cur.fetchone()[0]
-    print(f"Inserted upload id={uid} type={ftype} file={filename}")
-    return uid
-
-
-def update_form_link(dst_cur, form_id: str, ftype: str, upload_id: int):
-    col = f"{ftype}_upload_id"
-    # Ensure column exists
-    dst_cur.execute("PRAGMA table_info(form_data)")
-    cols = [r[1] for r in dst_cur.fetchall()]
-    if col not in cols:
-        print(f"Warning: column {col} not in form_data; skipping link update")
-        return
-    sql = f"UPDATE form_data SET {col}=? WHERE form_id=?"
-    dst_cur.execute(sql, (upload_id, form_id))
-
+def table_exists(cur, schema: str, table: str) -> bool:
+    cur.execute(f"SELECT 1 FROM {schema}.sqlite_master WHERE type='table' AND name=?", (table,))
+    return cur.fetchone() is not None
 
-def main():
-    if not os.path.exists(TARGET_DB):
-        raise SystemExit(f"Target DB not found: {TARGET_DB}")
-    if not os.path.exists(INITIAL_DB):
-        raise SystemExit(f"Initial DB not found: {INITIAL_DB}")
 
+def parse_upload_files():
     files = [os.path.basename(p) for p in glob(os.path.join(UPLOADS_DIR, '*.pdf'))]
     parsed = []
     for fn in files:
@@ -143,7 +60,7 @@ def main():
             print(f"Skip (no form id): {fn}")
             continue
         base = m.group('base').lower()
-        
+
         # derive type key from base prefix
         tkey = None
         for k in TYPE_MAP:
@@ -154,35 +71,139 @@ def main():
             print(f"Skip (unknown type): {fn}")
             continue
         parsed.append((fn, tkey, m.group('form')))
+    return parsed
+
+
+def upsert_sql(table: str, cols, conflict: str) -> str:
+    """Copy ``cols`` of the synced forms that are new to the target, updating rows that collide on ``conflict``."""
+    col_list = ",".join(cols)
+    updates = ",".join(f"{c}=excluded.{c}" for c in cols if c != conflict)
+    return (
+        f"INSERT INTO main.{table} ({col_list}) SELECT {col_list} FROM src.{table} "
+        "WHERE form_id IN (SELECT form_id FROM new_forms) "
+        f"ON CONFLICT({conflict}) DO UPDATE SET {updates}"
+    )
+
+
+def sync(con, parsed):
+    cur = con.cursor()
+    counts = {}
+
+    def step(name, sql, params=()):
+        cur.execute(sql, params)
+        counts[name] = cur.rowcount
+
+    cur.execute("CREATE TEMP TABLE sync_files (filename TEXT, file_type TEXT, form_id TEXT)")
+    cur.executemany("INSERT INTO sync_files VALUES (?, ?, ?)", parsed)
+    cur.execute("CREATE INDEX temp.ix_sync_files_form ON sync_files (form_id, file_type)")
+    # Forms not in the target yet get their application and form_data copied over
+    cur.execute(
+        "CREATE TEMP TABLE new_forms AS SELECT DISTINCT form_id FROM sync_files "
+        "WHERE form_id NOT IN (SELECT form_id FROM main.form_data WHERE form_id IS NOT NULL)"
+    )
+
+    app_cols = [c for c in columns(cur, 'main', 'applications') if c in set(columns(cur, 'src', 'applications'))]
+    step('applications', upsert_sql('applications', app_cols, 'id'))
+    # Upload ids of the initial DB mean nothing here; links are set from the new uploads below
+    form_cols = [
+        c for c in columns(cur, 'main', 'form_data')
+        if c in set(columns(cur, 'src', 'form_data')) and c != 'id' and not c.endswith('_upload_id')
+    ]
+    step('form_data', upsert_sql('form_data', form_cols, 'form_id'))
+
+    src_uploads = 'form_file_uploads' if table_exists(cur, 'src', 'form_file_uploads') else 'uploaded_documents'
+    cur.execute("SELECT COALESCE(MAX(id), 0) FROM main.uploaded_documents")
+    before = cur.fetchone()[0]
+    # Latest initial upload of the same form/type supplies status and OCR/match output.
+    # Resolved in one grouped pass: the initial DB has no index to serve a per-row lookup.
+    cur.execute(f"""
+        CREATE TEMP TABLE src_latest AS
+        SELECT form_id, LOWER(file_type) AS file_type, MAX(id) AS id FROM src.{src_uploads}
+        WHERE form_id IN (SELECT form_id FROM sync_files) GROUP BY form_id, LOWER(file_type)
+    """)
+    cur.execute("CREATE INDEX temp.ix_src_latest ON src_latest (form_id, file_type)")
+    step('uploaded_documents', f"""
+        INSERT INTO main.uploaded_documents
+            (form_id, filename, file_extension, file_type, status, ocr_output, pdf_match, json_match)
+        SELECT f.form_id, f.filename, 'pdf', f.file_type,
+               CASE WHEN u.id IS NULL THEN 'New' ELSE u.status END, u.ocr_output, u.pdf_match, u.json_match
+        FROM sync_files f
+        LEFT JOIN src_latest l ON l.form_id = f.form_id AND l.file_type = f.file_type
+        LEFT JOIN src.{src_uploads} u ON u.id = l.id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM main.uploaded_documents d WHERE d.form_id = f.form_id AND d.filename = f.filename
+        )
+    """)
+    cur.execute(
+        "CREATE TEMP TABLE new_uploads AS SELECT form_id, file_type, MAX(id) AS id "
+        "FROM main.uploaded_documents WHERE id > ? GROUP BY form_id, file_type",
+        (before,),
+    )
+    cur.execute("CREATE INDEX temp.ix_new_uploads ON new_uploads (form_id, file_type)")
+    step('replaced', """
+        UPDATE main.uploaded_documents SET status = 'Replaced'
+        WHERE id IN (
+            SELECT c.uploaded_document_id FROM main.current_documents c
+            JOIN new_uploads n ON n.form_id = c.form_id AND n.file_type = c.file_type
+        )
+    """)
+    step('current_documents', current_documents_upsert_sql(
+        "SELECT form_id, file_type, id FROM new_uploads", table='main.current_documents'
+    ))
+
+    form_cols = set(columns(cur, 'main', 'form_data'))
+    links = 0
+    for ftype in sorted(set(TYPE_MAP.values())):
+        col = f"{ftype}_upload_id"
+        if col not in form_cols:
+            print(f"Warning: column {col} not in form_data; skipping link update")
+            continue
+        cur.execute(
+            f"UPDATE main.form_data SET {col} = (SELECT n.id FROM new_uploads n "
+            "WHERE n.form_id = form_data.form_id AND n.file_type = ?) "
+            "WHERE form_id IN (SELECT form_id FROM new_uploads WHERE file_type = ?)",
+            (ftype, ftype),
+        )
+        links += cur.rowcount
+    counts['form_links'] = links
+    # The inserts above bypass the ORM listeners that keep promoted fields in sync
+    cur.execute("SELECT id FROM main.uploaded_documents WHERE id > ?", (before,))
+    counts['document_fields'] = refresh_document_fields(cur, [r[0] for r in cur.fetchall()])
+    return counts
+
 
+def main():
+    if not os.path.exists(TARGET_DB):
+        raise SystemExit(f"Target DB not found: {TARGET_DB}")
+    if not os.path.exists(INITIAL_DB):
+        raise SystemExit(f"Initial DB not found: {INITIAL_DB}")
+
+    parsed = parse_upload_files()
     if not parsed:
         print("No matching upload files found.")
         return
 
     ensure_backup(TARGET_DB)
 
-    with get_conn(INITIAL_DB) as src_con, get_conn(TARGET_DB) as dst_con:
-        src_cur = src_con.cursor()
-        dst_cur = dst_con.cursor()
-
-        # Cache existing form_ids to avoid redundant work
-        dst_cur.execute("SELECT form_id FROM form_data")
-        existing_forms = {r[0] for r in dst_cur.fetchall() if r[0]}
-
-        for fn, ftype, form_id in parsed:
-            print(f"\nProcessing {fn} -> type={ftype}, form={form_id}")
-            if form_id not in existing_forms:
-                app_id = upsert_application(src_cur, dst_cur, form_id)
-                upsert_form_data(src_cur, dst_cur, form_id)
-                # refresh cache
-                existing_forms.add(form_id)
-            # copy initial upload metadata if available
-            init_upload = pick_initial_upload(src_cur, form_id, ftype)
-            uid = insert_upload(dst_cur, form_id, fn, ftype, init_upload)
-            update_form_link(dst_cur, form_id, ftype, uid)
-
-        dst_con.commit()
-        print("\n✅ Sync complete.")
+    started = time.perf_counter()
+    # Autocommit mode: ATTACH is not allowed inside a transaction, so BEGIN/COMMIT are explicit
+    con = sqlite3.connect(TARGET_DB, isolation_level=None)
+    try:
+        con.execute("ATTACH DATABASE ? AS src", (INITIAL_DB,))
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            counts = sync(con, parsed)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+    finally:
+        con.close()
+
+    for name, n in counts.items():
+        print(f"{name:<20} {n:>8} rows")
+    print(f"\n✅ Sync complete: {len(parsed)} files in {time.perf_counter() - started:.2f}s.")
+
 
 if __name__ == '__main__':
     main()
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models import FormData, FormFileUpload
-import json
+from app.models import CurrentDocument, FormData, UploadedDocument
+from app.services.upload_service import current_documents_query, set_current_documents
 
 FORM_ID = "685b2c97-fb64-4ae8-934f-da3058256fd5"
 
@@ -69,30 +69,31 @@ psv_specs = [
 
 def upsert_file(db: Session, form_id: str, spec: dict):
     row = (
-        db.query(FormFileUpload)
-        .filter(FormFileUpload.form_id == form_id)
-        .filter(FormFileUpload.file_type == spec["file_type"])
+        current_documents_query(db, form_id)
+        .filter(CurrentDocument.file_type == spec["file_type"])
         .first()
     )
     if row:
         row.filename = spec["filename"]
         row.file_extension = spec["file_extension"]
         row.status = spec["status"]
-        row.ocr_output = json.dumps(spec["ocr_output"]) if spec.get("ocr_output") else None
+        row.ocr_output = spec["ocr_output"] or None
         row.pdf_match = row.pdf_match or None
         row.json_match = row.json_match or None
     else:
-        row = FormFileUpload(
+        row = UploadedDocument(
             form_id=form_id,
             filename=spec["filename"],
             file_extension=spec["file_extension"],
             file_type=spec["file_type"],
             status=spec["status"],
-            ocr_output=json.dumps(spec["ocr_output"]) if spec.get("ocr_output") else None,
+            ocr_output=spec["ocr_output"] or None,
             pdf_match=None,
             json_match=None,
         )
         db.add(row)
+        db.flush()
+        set_current_documents(db, [row])
 
 
 def main():